@@ -0,0 +1,269 @@
+"""Round-trip latency and throughput of TcpClient and AsyncTcpClient against the local EchoServer.
+
+Every connection sends a message, waits for its echo and sends the next one.
+The results are written as JSON, so runs of different versions can be compared with --compare.
+
+Examples::
+
+    python benchmarks/echo_benchmark.py --output before.json
+    python benchmarks/echo_benchmark.py --sizes 16,4096 --connections 1,100 --compare before.json
+"""
+import argparse
+import asyncio
+import json
+import platform
+import sys
+import threading
+import time
+
+import pyTCP
+from pyTCP import AsyncTcpClient, EchoServer, SocketOptions, TcpClient
+
+DELIMITER = b'\n'
+RECEIVE_BYTES = 2 ** 16
+# larger messages are sent while the echo is received, otherwise client and server block each other
+# as soon as the socket buffers are full
+CONCURRENT_SEND_SIZE = 2 ** 16
+
+
+def percentile(sorted_values, fraction):
+    """ Returns the value below which the given fraction of the sorted values lies.
+    """
+    if not sorted_values:
+        return 0.0
+    index = min(int(fraction * len(sorted_values)), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def summarize(case, latencies, elapsed, size):
+    """ Creates the result of a benchmark case from the round-trip times of all connections.
+    """
+    latencies.sort()
+    messages = len(latencies)
+    return dict(case,
+                messages=messages,
+                seconds=elapsed,
+                latency_us={
+                    "p50": percentile(latencies, 0.5) * 1e6,
+                    "p99": percentile(latencies, 0.99) * 1e6,
+                    "p999": percentile(latencies, 0.999) * 1e6,
+                    "mean": sum(latencies) / messages * 1e6 if messages else 0.0,
+                },
+                msgs_per_s=messages / elapsed if elapsed else 0.0,
+                mb_per_s=messages * size / elapsed / 1e6 if elapsed else 0.0)
+
+
+def make_message(size, receive):
+    if receive == "delimiter":
+        return b'x' * (size - len(DELIMITER)) + DELIMITER
+    return b'x' * size
+
+
+def run_sync(host, port, size, receive, connections, messages, timeout):
+    message = make_message(size, receive)
+    latencies = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(connections + 1)
+
+    def connection():
+        client = TcpClient(host, port, auto_reconnect=False)
+        client.connect()
+        own = []
+        barrier.wait()
+        try:
+            for _ in range(messages):
+                start = time.perf_counter()
+                sender = None
+                if size > CONCURRENT_SEND_SIZE:
+                    sender = threading.Thread(target=client.send, args=(message,))
+                    sender.start()
+                else:
+                    client.send(message)
+                if receive == "delimiter":
+                    client.receive_until(RECEIVE_BYTES, DELIMITER, timeout)
+                else:
+                    client.receive_exactly(size, timeout)
+                if sender is not None:
+                    sender.join()
+                own.append(time.perf_counter() - start)
+        finally:
+            client.close()
+            with lock:
+                latencies.extend(own)
+
+    threads = [threading.Thread(target=connection) for _ in range(connections)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return latencies, time.perf_counter() - start
+
+
+async def run_async(host, port, size, receive, connections, messages, timeout):
+    message = make_message(size, receive)
+    latencies = []
+    clients = [AsyncTcpClient(host, port, auto_reconnect=False) for _ in range(connections)]
+    await asyncio.gather(*(client.connect() for client in clients))
+
+    async def connection(client):
+        for _ in range(messages):
+            start = time.perf_counter()
+            sender = None
+            if size > CONCURRENT_SEND_SIZE:
+                sender = asyncio.ensure_future(client.send(message))
+            else:
+                await client.send(message)
+            if receive == "delimiter":
+                await client.receive_until(RECEIVE_BYTES, DELIMITER, timeout)
+            else:
+                await client.receive_exactly(size, timeout)
+            if sender is not None:
+                await sender
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(connection(client) for client in clients))
+    finally:
+        for client in clients:
+            client.close()
+    return latencies, time.perf_counter() - start
+
+
+def messages_per_connection(args, size, connections):
+    # large messages and many connections get fewer round trips, so every case takes a similar time.
+    # 0 if even min_messages round trips on every connection would send more than max_bytes, the case is skipped
+    budget = args.max_bytes // (size * connections)
+    if budget < args.min_messages:
+        return 0
+    return min(args.messages, budget)
+
+
+def run(args):
+    if args.event_loop == "uvloop" and not pyTCP.use_uvloop():
+        raise SystemExit("uvloop is not installed")
+    server = EchoServer(args.host, args.port, receive_bytes=RECEIVE_BYTES, mode=args.server_mode, history_size=0,
+                        socket_options=SocketOptions(backlog=1024))
+    server.start_server()
+    results = []
+    skipped = []
+    try:
+        for client in args.clients:
+            for receive in args.receive:
+                for size in args.sizes:
+                    for connections in args.connections:
+                        messages = messages_per_connection(args, size, connections)
+                        case = {"client": client, "receive": receive, "size": size, "connections": connections}
+                        if not messages:
+                            skipped.append(case)
+                            print("{client:5} {receive:9} {size:>9} B {connections:>5} conn  skipped, "
+                                  "exceeds --max-bytes".format(**case), file=sys.stderr)
+                            continue
+                        if client == "sync":
+                            latencies, elapsed = run_sync(args.host, args.port, size, receive, connections, messages,
+                                                          args.timeout)
+                        else:
+                            latencies, elapsed = asyncio.run(run_async(args.host, args.port, size, receive,
+                                                                       connections, messages, args.timeout))
+                        result = summarize(case, latencies, elapsed, size)
+                        results.append(result)
+                        print(format_result(result), file=sys.stderr)
+    finally:
+        server.stop_server()
+    return {
+        "version": pyTCP.__version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "server_mode": args.server_mode,
+        "event_loop": args.event_loop,
+        "results": results,
+        "skipped": skipped,
+    }
+
+
+def format_result(result):
+    return ("{client:5} {receive:9} {size:>9} B {connections:>5} conn  p50 {p50:10.1f} us  p99 {p99:10.1f} us  "
+            "p999 {p999:10.1f} us  {msgs_per_s:10.0f} msg/s  {mb_per_s:9.2f} MB/s").format(
+        p50=result["latency_us"]["p50"], p99=result["latency_us"]["p99"], p999=result["latency_us"]["p999"],
+        **result)
+
+
+def compare(baseline, current):
+    """ Prints the change of the median latency and the throughput of every case found in both runs.
+    """
+    def key(result):
+        return result["client"], result["receive"], result["size"], result["connections"]
+
+    old = {key(result): result for result in baseline["results"]}
+    print("{} -> {}".format(baseline.get("version"), current.get("version")), file=sys.stderr)
+    for result in current["results"]:
+        before = old.get(key(result))
+        if before is None:
+            continue
+        print("{:5} {:9} {:>9} B {:>5} conn  p50 {:+7.1f} %  msg/s {:+7.1f} %".format(
+            *key(result),
+            relative_change(before["latency_us"]["p50"], result["latency_us"]["p50"]),
+            relative_change(before["msgs_per_s"], result["msgs_per_s"])), file=sys.stderr)
+
+
+def relative_change(before, after):
+    return (after - before) / before * 100 if before else 0.0
+
+
+def int_list(value):
+    return [int(item) for item in value.split(",")]
+
+
+def str_list(choices):
+    def parse(value):
+        items = value.split(",")
+        for item in items:
+            if item not in choices:
+                raise argparse.ArgumentTypeError("{} is not one of {}".format(item, ", ".join(choices)))
+        return items
+    return parse
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=12345)
+    parser.add_argument("--server-mode", choices=("threaded", "selector"), default="threaded")
+    parser.add_argument("--event-loop", choices=("asyncio", "uvloop"), default="asyncio",
+                        help="event loop of the async clients")
+    parser.add_argument("--clients", type=str_list(("sync", "async")), default=["sync", "async"])
+    parser.add_argument("--receive", type=str_list(("raw", "delimiter")), default=["raw", "delimiter"],
+                        help="raw uses receive_exactly, delimiter uses receive_until")
+    parser.add_argument("--sizes", type=int_list, default=[16, 256, 4096, 65536, 2 ** 20, 2 ** 24],
+                        help="comma separated message sizes in bytes")
+    parser.add_argument("--connections", type=int_list, default=[1, 10, 100, 1000],
+                        help="comma separated numbers of concurrent connections")
+    parser.add_argument("--messages", type=int, default=1000, help="maximum round trips per connection")
+    parser.add_argument("--min-messages", type=int, default=10,
+                        help="minimum round trips per connection, cases which would exceed --max-bytes are skipped")
+    parser.add_argument("--max-bytes", type=int, default=2 ** 28,
+                        help="maximum bytes sent per case, limits the round trips of large messages")
+    parser.add_argument("--timeout", type=float, default=30.0, help="timeout of a single round trip")
+    parser.add_argument("--output", help="write the JSON results to this file instead of stdout")
+    parser.add_argument("--compare", help="JSON results of an earlier run to compare with")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = run(args)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Import time of the pyTCP package, measured in fresh interpreters.
+
+Every run starts a new Python process which times the statement with time.perf_counter and lists
+the modules it imported. The results are written as JSON like echo_benchmark.py.
+
+Examples::
+
+    python benchmarks/import_benchmark.py
+    python benchmarks/import_benchmark.py --statement "import pyTCP; pyTCP.EchoServer" --runs 50
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+
+STATEMENTS = [
+    "import pyTCP",
+    "from pyTCP import TcpClient",
+    "from pyTCP import AsyncTcpClient",
+    "from pyTCP import EchoServer",
+]
+
+
+def measure(statement, runs):
+    """ Returns the wall time of the statement and the modules it imported, measured in new processes.
+    """
+    times = []
+    modules = None
+    script = ("import sys, time\n"
+              "before = set(sys.modules)\n"
+              "start = time.perf_counter()\n"
+              "{}\n"
+              "print(time.perf_counter() - start)\n"
+              "print(' '.join(sorted(set(sys.modules) - before)))\n").format(statement)
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", script], check=True, stdout=subprocess.PIPE,
+                                universal_newlines=True).stdout.splitlines()
+        times.append(float(output[0]))
+        modules = output[1].split()
+    times.sort()
+    return {
+        "statement": statement,
+        "runs": runs,
+        "median_ms": statistics.median(times) * 1e3,
+        "min_ms": times[0] * 1e3,
+        "modules": len(modules),
+        "asyncio": "asyncio" in modules,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--statement", action="append", help="statement to measure, can be given several times")
+    parser.add_argument("--runs", type=int, default=20, help="number of processes per statement")
+    parser.add_argument("--output", help="write the JSON results to this file instead of stdout")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = []
+    for statement in args.statement or STATEMENTS:
+        result = measure(statement, args.runs)
+        results.append(result)
+        print("{statement:40} median {median_ms:7.1f} ms  min {min_ms:7.1f} ms  {modules:4} modules  "
+              "asyncio {asyncio}".format(**result), file=sys.stderr)
+    report = {"python": platform.python_version(), "platform": platform.platform(), "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
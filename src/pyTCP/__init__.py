@@ -1,15 +1,66 @@
 # -*- coding: utf-8 -*-
-from pkg_resources import get_distribution, DistributionNotFound
-from pyTCP.async_client import AsyncTcpClient
-from pyTCP.client import TcpClient
-from pyTCP.client_errors import ClientTimeoutError, ClientError, ClientSocketError, ClientProtocolError
-from pyTCP.server import EchoServer
+"""The public names are imported on first access, so importing the package for the TcpClient
+does not import asyncio and the other modules which are only needed by the async clients and the servers.
+"""
+import importlib
+import sys
 
-try:
+_exports = {
+    "AsyncTcpClient": "pyTCP.async_client",
+    "AsyncTcpClientPool": "pyTCP.async_pool",
+    "AsyncEchoServer": "pyTCP.async_server",
+    "TcpClient": "pyTCP.client",
+    "ClientTimeoutError": "pyTCP.client_errors",
+    "ClientError": "pyTCP.client_errors",
+    "ClientSocketError": "pyTCP.client_errors",
+    "ClientProtocolError": "pyTCP.client_errors",
+    "ClientMetrics": "pyTCP.metrics",
+    "Codec": "pyTCP.compression",
+    "ZlibCodec": "pyTCP.compression",
+    "TcpClientPool": "pyTCP.pool",
+    "ReconnectPolicy": "pyTCP.reconnect",
+    "EchoServer": "pyTCP.server",
+    "SocketOptions": "pyTCP.socket_options",
+    "use_uvloop": "pyTCP.event_loop",
+}
+
+__all__ = sorted(_exports) + ["__version__"]
+
+
+def _get_version():
     # Change here if project is renamed and does not equal the package name
     dist_name = __name__
-    __version__ = get_distribution(dist_name).version
-except DistributionNotFound:
-    __version__ = 'unknown'
-finally:
-    del get_distribution, DistributionNotFound
+    try:
+        from importlib.metadata import PackageNotFoundError, version
+    except ImportError:
+        # Python < 3.8
+        from pkg_resources import DistributionNotFound as PackageNotFoundError, get_distribution
+
+        def version(name):
+            return get_distribution(name).version
+    try:
+        return version(dist_name)
+    except PackageNotFoundError:
+        return 'unknown'
+
+
+def __getattr__(name):
+    if name == "__version__":
+        value = _get_version()
+    elif name in _exports:
+        value = getattr(importlib.import_module(_exports[name]), name)
+    else:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+if sys.version_info < (3, 7):
+    # module __getattr__ is not supported before Python 3.7
+    for _name in __all__:
+        __getattr__(_name)
+    del _name
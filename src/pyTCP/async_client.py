@@ -1,10 +1,21 @@
 import asyncio
 import logging
+import ssl
 import time
+from typing import IO, Iterable
 
-import async_timeout
+from . import event_loop
+from .client_errors import ClientProtocolError, ClientSocketError, ClientTimeoutError
+from .compression import Codec
+from .framing import (CORRELATION_ID, HEADER, MAX_FRAME_SIZE, decode_header, decode_payload, encode_frame,
+                      encode_header, is_compressed, read_delimited, read_messages)
+from .metrics import ClientMetrics
+from .receive_buffer import ReceiveBuffer
+from .reconnect import ReconnectPolicy
+from .socket_options import SocketOptions
 
-from .client_errors import ClientTimeoutError
+# the size of the chunks a file is written in if the event loop does not implement sendfile
+_FILE_CHUNK_SIZE = 2 ** 16
 
 
 class AsyncTcpClient:
@@ -22,13 +33,54 @@ class AsyncTcpClient:
         Instance of the StreamWriter
     auto_reconnect : bool
         If true, a reconnect will be made on connection loss.
+    reconnect_policy : :obj:`ReconnectPolicy`
+        The waiting times between the attempts to connect.
+    socket_options : :obj:`SocketOptions`
+        The options which are set on the socket of every new connection.
+    metrics : :obj:`ClientMetrics`
+        The counters and histograms of the client or None.
+    ssl_context : :obj:`ssl.SSLContext`
+        The context the connections are encrypted with or None.
+    server_hostname : str
+        The host name the certificate of the server is checked against.
+    codec : :obj:`Codec`
+        Compresses the payloads of frames or None.
     logger : :obj:
         An instance of the logging module.
-    buffer : bool, default=True
-        The split part of the msg which was not returned.
+    buffer : :obj:`ReceiveBuffer`
+        The received data which was not returned yet.
+    limit : int
+        The buffer limit of the StreamReader.
+    high_water : int
+        The size of the write buffer of the transport above which send waits until it is drained.
+    low_water : int
+        The size of the write buffer of the transport below which send continues.
+    coalesce : bool
+        If true, small messages are collected and written together.
+    coalesce_size : int
+        The number of collected bytes which are written immediately in coalesce mode.
+    on_send : callable
+        Called as ``on_send(size, duration)`` after bytes were written, with the time until the write buffer
+        was drained below the high water mark.
+    on_receive : callable
+        Called as ``on_receive(size, duration)`` when a receive method returns data,
+        with the time spent in the receive method.
+    on_connect : callable
+        Called as ``on_connect(duration, attempts)`` when a connection was established.
+    on_reconnect : callable
+        Called as ``on_reconnect(error)`` with the exception which caused a reconnect.
+    on_timeout : callable
+        Called as ``on_timeout(operation, duration)`` with the name of the receive method before it raises
+        a ClientTimeoutError.
+
+    The hooks are None by default, the timing is only measured for hooks which are set.
     """
 
-    def __init__(self, host: str = "127.0.0.1", port: int = 8080, auto_reconnect: bool = True):
+    def __init__(self, host: str = "127.0.0.1", port: int = 8080, auto_reconnect: bool = True, limit: int = 2 ** 16,
+                 high_water: int = None, low_water: int = None, coalesce: bool = False, coalesce_size: int = 2 ** 16,
+                 reconnect_policy: ReconnectPolicy = None, socket_options: SocketOptions = None,
+                 metrics: ClientMetrics = None, ssl_context: ssl.SSLContext = None, server_hostname: str = None,
+                 codec: Codec = None):
         """The constructor.
 
         Parameters
@@ -41,6 +93,32 @@ class AsyncTcpClient:
             The port of the tcp server.
         auto_reconnect : bool, default=True
             If true, a reconnect will be made on connection loss.
+        limit : int, default 65536
+            The buffer limit of the StreamReader. Messages longer than the limit are read in several parts.
+        high_water : int, default None
+            The size of the write buffer of the transport above which send waits until it is drained.
+            The default of the transport is used if None.
+        low_water : int, default None
+            The size of the write buffer of the transport below which send continues.
+            The default of the transport is used if None.
+        coalesce : bool, default False
+            If true, the messages passed to send are collected and written together once per loop iteration.
+        coalesce_size : int, default 65536
+            The number of collected bytes which are written immediately in coalesce mode.
+        reconnect_policy : :obj:`ReconnectPolicy`, default None
+            The waiting times between the attempts to connect. Exponential backoff with jitter if None.
+        socket_options : :obj:`SocketOptions`, default None
+            The options which are set on the socket of the transport after it was connected.
+        metrics : :obj:`ClientMetrics`, default None
+            Collects counters and histograms of the client. Nothing is measured if None.
+        ssl_context : :obj:`ssl.SSLContext`, default None
+            If given, the connections are encrypted with TLS. Unlike TcpClient, a reconnect does a full handshake,
+            because asyncio does not support resuming TLS sessions.
+        server_hostname : str, default None
+            The host name the certificate of the server is checked against. The host if None.
+        codec : :obj:`Codec`, default None
+            Compresses the payloads of the frames sent with send_frame which reach the threshold of the codec,
+            e.g. a ZlibCodec. Compressed frames are flagged in the header and decompressed by receive_frame.
         """
         self.host = host
         self.port = port
@@ -50,17 +128,53 @@ class AsyncTcpClient:
 
         self._connected = False
         self.auto_reconnect = auto_reconnect
+        self.reconnect_policy = reconnect_policy or ReconnectPolicy()
+        self.socket_options = socket_options
+        self.metrics = metrics
+        self.ssl_context = ssl_context
+        self.server_hostname = server_hostname
+        self.codec = codec
+        self.on_send = None
+        self.on_receive = None
+        self.on_connect = None
+        self.on_reconnect = None
+        self.on_timeout = None
+
+        self.limit = limit
+        self.high_water = high_water
+        self.low_water = low_water
+        self.coalesce = coalesce
+        self.coalesce_size = coalesce_size
+        self._pending = []
+        self._pending_size = 0
+        self._flush_handle = None
+        self._requests = {}
+        self._next_request_id = 0
+        self._dispatcher = None
 
         self.logger = logging.getLogger(__name__)
-        self.buffer = []
+        self.buffer = ReceiveBuffer()
 
     @property
     def is_connected(self):
         """bool: Returns True if connected."""
         return self._connected
 
+    def stats(self) -> dict:
+        """ Returns a snapshot of the metrics.
+
+        Returns
+        -------
+        dict
+            The snapshot of the ClientMetrics or an empty dict if the client has no metrics.
+        """
+        if self.metrics is None:
+            return {}
+        return self.metrics.snapshot()
+
     async def connect(self, timeout: float = 10.0):
-        """ Tries to connect to the given host. Waits 0.5 seconds until another try will be made.
+        """ Tries to connect to the given host. The waiting time until another try will be made
+        is given by the reconnect policy.
 
         Parameters
         ----------
@@ -71,43 +185,240 @@ class AsyncTcpClient:
         ------
         ClientTimeoutError
             If no connection could be established in the given time a ClientTimeoutError is raised.
+        ClientSocketError
+            If the maximum number of attempts of the reconnect policy failed
+            or the certificate of the server could not be verified.
         """
-        timeout_start = time.time()
-        while not self._connected and time.time() < timeout_start + timeout:
+        start = time.monotonic()
+        deadline = start + timeout
+        attempt = 0
+        while not self._connected:
             try:
-                with async_timeout.timeout(timeout):
-                    self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
-                    self._connected = True
-                    return
-            except ConnectionRefusedError:
+                async with event_loop.timeout(max(deadline - time.monotonic(), 0)):
+                    self.reader, self.writer = await asyncio.open_connection(self.host, self.port, limit=self.limit,
+                                                                             **self._tls_arguments())
+                self._connected = True
+                self.buffer.clear()
+                self._discard_pending()
+                if self.high_water is not None or self.low_water is not None:
+                    self.writer.transport.set_write_buffer_limits(high=self.high_water, low=self.low_water)
+                if self.socket_options is not None:
+                    self.socket_options.apply(self.writer.get_extra_info('socket'))
+                if self.metrics is not None:
+                    self.metrics.connects += 1
+                    self.metrics.connect_time.record(time.monotonic() - start)
+                if self.on_connect is not None:
+                    self.on_connect(time.monotonic() - start, attempt + 1)
+                return
+            except asyncio.TimeoutError:
+                break
+            except ssl.CertificateError as e:
+                raise ClientSocketError("certificate verification failed: {}".format(e))
+            except OSError:
                 self.logger.error("error creating a connection, trying again ... ")
-                await asyncio.sleep(0.5)
-                continue
+            attempt += 1
+            if not self.reconnect_policy.should_retry(attempt):
+                raise ClientSocketError("could not connect after {} attempts".format(attempt))
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            await asyncio.sleep(min(self.reconnect_policy.delay(attempt), remaining))
         raise ClientTimeoutError("timeout while connecting")
 
+    def _tls_arguments(self) -> dict:
+        if self.ssl_context is None:
+            return {}
+        return {"ssl": self.ssl_context, "server_hostname": self.server_hostname or self.host}
+
     async def send(self, data: bytes):
         """ Send a message to the socket. If an socket.error is raised and auto_connect is enabled,
         a reconnect will be executed.
 
+        Waits until the write buffer of the transport is below the low water mark if it exceeded the high water mark,
+        so a fast producer cannot fill the memory if the peer is slow.
+
         Parameters
         ----------
         data : bytes
             Sends the given bytes to the socket.
         """
+        if not self._connected:
+            return
+        start = time.monotonic() if self.on_send is not None else 0.0
+        try:
+            if self.coalesce:
+                self._add_pending((data,))
+            else:
+                self.writer.write(data)
+            if self.metrics is not None:
+                # in coalesce mode the write is counted when the pending messages are flushed
+                self.metrics.sent(len(data), calls=0 if self.coalesce else 1)
+            await self.writer.drain()
+            if self.on_send is not None:
+                self.on_send(len(data), time.monotonic() - start)
+        except ConnectionError as e:
+            self._connected = False
+            self._discard_pending()
+            self.logger.error("error send data")
+            if self.auto_reconnect:
+                await self._reconnect(e)
+
+    async def send_many(self, buffers: Iterable[bytes], messages: int = None):
+        """ Send several messages to the socket without joining them. If an socket.error is raised
+        and auto_connect is enabled, a reconnect will be executed.
+
+        The buffers are handed to StreamWriter.writelines, so the transport can send them together.
+        Like send, it waits while the write buffer of the transport is above the high water mark.
+
+        Parameters
+        ----------
+        buffers : iterable of bytes-like
+            The bytes, bytearray or memoryview objects to send in the given order.
+        messages : int, default None
+            The number of messages the buffers form, which is counted by the metrics.
+            Every buffer is counted as a message if None.
+        """
+        if not self._connected:
+            return
+        start = time.monotonic() if self.on_send is not None else 0.0
+        size = 0
+        try:
+            if self.metrics is not None or self.on_send is not None:
+                buffers = list(buffers)
+                size = sum(len(memoryview(buffer).cast('B')) for buffer in buffers)
+            if self.metrics is not None:
+                self.metrics.sent(size, len(buffers) if messages is None else messages,
+                                  calls=1 if buffers and not self.coalesce else 0)
+            if self.coalesce:
+                self._add_pending(buffers)
+            else:
+                self.writer.writelines(buffers)
+            await self.writer.drain()
+            if self.on_send is not None and size:
+                self.on_send(size, time.monotonic() - start)
+        except ConnectionError as e:
+            self._connected = False
+            self._discard_pending()
+            self.logger.error("error send data")
+            if self.auto_reconnect:
+                await self._reconnect(e)
+
+    async def send_file(self, fileobj: IO[bytes], offset: int = 0, count: int = None) -> int:
+        """ Sends the content of a file to the socket. If an socket.error is raised and auto_connect is enabled,
+        a reconnect will be executed.
+
+        The file is sent with loop.sendfile after the data written before was drained, which copies it
+        in the kernel with os.sendfile without reading it into memory. Where os.sendfile cannot be used,
+        e.g. with TLS or an event loop without sendfile like uvloop, it is read and written in chunks.
+
+        Parameters
+        ----------
+        fileobj : file object
+            A regular file opened in binary mode.
+        offset : int, default 0
+            The position in the file to start from.
+        count : int, default None
+            The number of bytes to send. Until the end of the file if None.
+
+        Returns
+        -------
+        int
+            The number of sent bytes, fewer than requested if the connection was lost during the transfer.
+            The file position is set after the last sent byte.
+        """
+        if not self._connected:
+            return 0
+        start = time.monotonic() if self.on_send is not None else 0.0
+        started = False
+        try:
+            self._flush_pending()
+            await self.writer.drain()
+            # loop.sendfile only moves the file position once bytes were sent
+            fileobj.seek(offset)
+            started = True
+            try:
+                sent = await event_loop.get_running_loop().sendfile(self.writer.transport, fileobj, offset, count,
+                                                                    fallback=True)
+            except NotImplementedError:
+                # e.g. uvloop
+                sent = await self._write_file(fileobj, offset, count)
+            if self.metrics is not None:
+                self.metrics.sent(sent)
+            if self.on_send is not None:
+                self.on_send(sent, time.monotonic() - start)
+            return sent
+        except ConnectionError as e:
+            # both loop.sendfile and _write_file leave the file position after the last sent byte
+            sent = fileobj.tell() - offset if started else 0
+            self._connected = False
+            self._discard_pending()
+            self.logger.error("error send data")
+            if self.auto_reconnect:
+                await self._reconnect(e)
+            return sent
+
+    async def _write_file(self, fileobj: IO[bytes], offset: int, count: int = None) -> int:
+        fileobj.seek(offset)
+        sent = 0
+        while count is None or sent < count:
+            chunk = fileobj.read(_FILE_CHUNK_SIZE if count is None else min(_FILE_CHUNK_SIZE, count - sent))
+            if not chunk:
+                break
+            try:
+                self.writer.write(chunk)
+                await self.writer.drain()
+            except ConnectionError:
+                fileobj.seek(offset + sent)
+                raise
+            sent += len(chunk)
+        return sent
+
+    async def flush(self):
+        """ Writes the messages collected in coalesce mode and waits until the write buffer is drained
+        below the high water mark.
+        """
         if not self._connected:
             return
         try:
-            self.writer.write(data)
-        except ConnectionRefusedError:
+            self._flush_pending()
+            await self.writer.drain()
+        except ConnectionError as e:
             self._connected = False
             self.logger.error("error send data")
             if self.auto_reconnect:
-                self.logger.error("reconnecting ...")
-                await self.connect()
+                await self._reconnect(e)
+
+    def _add_pending(self, buffers: Iterable[bytes]):
+        for buffer in buffers:
+            # the caller may reuse a bytearray or memoryview before the pending buffers are written
+            if not isinstance(buffer, bytes):
+                buffer = bytes(buffer)
+            self._pending.append(buffer)
+            self._pending_size += len(buffer)
+        if self._pending_size >= self.coalesce_size:
+            self._flush_pending()
+        elif self._pending and self._flush_handle is None:
+            self._flush_handle = event_loop.get_running_loop().call_soon(self._flush_pending)
+
+    def _flush_pending(self):
+        pending = self._pending
+        self._discard_pending()
+        if pending:
+            self.writer.writelines(pending)
+            if self.metrics is not None:
+                self.metrics.send_calls += 1
+
+    def _discard_pending(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        self._pending = []
+        self._pending_size = 0
 
     async def receive(self, bytes_to_receive: int = 4096) -> bytes:
         """ Receives messages from the socket. If an socket.error is raised and auto_connect is enabled,
         a reconnect will be executed, otherwise an empty byte string will be returned.
+        Data left in the buffer by receive_until is returned first.
 
         Parameters
         ----------
@@ -121,31 +432,31 @@ class AsyncTcpClient:
         """
         if not self._connected:
             return b''
-        try:
-            data = await self.reader.read(bytes_to_receive)
-            return data
-        except ConnectionRefusedError:
-            self._connected = False
-            self.logger.error("error receiving data")
-            if self.auto_reconnect:
-                self.logger.error("reconnecting ...")
-                await self.connect()
-            return b''
+        start = time.monotonic() if self.on_receive is not None else 0.0
+        if self.buffer:
+            data = self.buffer.read(bytes_to_receive)
+        else:
+            data = await self._read(bytes_to_receive)
+        if data:
+            # a chunk of the stream is not a message, it is only counted in bytes_received
+            self._received(data, start, messages=0)
+        return data
 
-    async def receive_until(self, bytes_to_receive: int = 4096, delimiter: bytes = '\n', timeout: float = 1.0) -> bytes:
+    async def receive_until(self, bytes_to_receive: int = 4096, delimiter: bytes = b'\n',
+                            timeout: float = 1.0) -> bytes:
         """ Receives messages from the socket until the given delimiter is recognized.
 
         The data will be split at the delimiter. The delimiter will be removed from the message and returned.
-        If the received message contains a message after the delimiter, it will be stored in a buffer
-        and prepended to the next message.
+        The data is read with StreamReader.readuntil, so messages following the delimiter stay buffered
+        in the StreamReader and are returned in order by the next calls.
         If an socket.error is raised and auto_connect is enabled,
         a reconnect will be executed, otherwise an empty byte string will be returned.
 
         Parameters
         ----------
         bytes_to_receive : int, default 4096
-            Reads the number bytes from the socket. Returns fewer bytes than bytes_to_receive if fewer are available.
-        delimiter : bytes, default '\\n'
+            Unused, the StreamReader reads as many bytes as needed. Kept for compatibility with TcpClient.
+        delimiter : bytes, default b'\\n'
             Splits the read data at the delimiter
         timeout : float, default 1.0
             The maximum time this function will wait until a ClientTimeoutError is raised.
@@ -161,26 +472,364 @@ class AsyncTcpClient:
             Raises if no data was read or no delimiter was found withing the given time.
 
         """
-        timeout_start = time.time()
-        while time.time() < timeout_start + timeout:
-            chunk = await self.receive(bytes_to_receive)
-            if not chunk:
-                break
-            if delimiter not in chunk:
-                self.buffer.append(chunk)
-                continue
-            data_list = chunk.split(delimiter)
-            self.buffer.append(data_list[0])
-            ret = self.buffer.copy()
-            self.buffer = [data_list[1]]
-            return b''.join(ret)
+        start = time.monotonic() if self.metrics is not None or self.on_receive is not None \
+            or self.on_timeout is not None else 0.0
+        data = None
+        try:
+            async with event_loop.timeout(timeout):
+                while True:
+                    data = read_delimited(self.buffer, delimiter)
+                    if data is not None:
+                        break
+                    chunk = await self._read_until(delimiter)
+                    if not chunk:
+                        break
+                    if not self.buffer and chunk.endswith(delimiter):
+                        data = chunk[:-len(delimiter)]
+                        break
+                    self._extend_buffer(chunk)
+        except asyncio.TimeoutError:
+            pass
 
+        if data is not None:
+            if self.metrics is not None:
+                self.metrics.receive_wait.record(time.monotonic() - start)
+            self._received(data, start)
+            return data
+        self._timed_out("receive_until", start)
         raise ClientTimeoutError("timeout while receiving data")
 
+    async def receive_many(self, bytes_to_receive: int = 4096, delimiter: bytes = b'\n', max_frames: int = None,
+                           max_wait: float = 1.0) -> list:
+        """ Returns all complete messages which are buffered.
+
+        The StreamReader is only read if no complete message is buffered yet. All messages which arrived
+        with the same read are returned together, so a burst of small messages is handled with one call.
+
+        Parameters
+        ----------
+        bytes_to_receive : int, default 4096
+            Reads the number bytes from the socket. Returns fewer bytes than bytes_to_receive if fewer are available.
+        delimiter : bytes, default b'\\n'
+            Splits the read data at the delimiter. If None, the messages are length-prefixed frames.
+        max_frames : int, default None
+            The maximum number of messages to return. The remaining messages stay buffered.
+        max_wait : float, default 1.0
+            The maximum time this function will wait for a complete message until a ClientTimeoutError is raised.
+
+        Returns
+        -------
+        list of bytes
+            The received messages in the order they were sent.
+
+        Raises
+        ------
+        ClientTimeoutError
+            Raises if no complete message was received within the given time.
+        """
+        start = time.monotonic() if self.on_receive is not None or self.on_timeout is not None else 0.0
+        try:
+            async with event_loop.timeout(max_wait):
+                while True:
+                    messages = read_messages(self.buffer, delimiter, max_frames, codec=self.codec)
+                    if messages:
+                        if self.metrics is not None:
+                            self.metrics.messages_received += len(messages)
+                        if self.on_receive is not None:
+                            self.on_receive(sum(len(message) for message in messages), time.monotonic() - start)
+                        return messages
+                    chunk = await self._read(bytes_to_receive)
+                    if not chunk:
+                        break
+                    self._extend_buffer(chunk)
+        except asyncio.TimeoutError:
+            pass
+
+        self._timed_out("receive_many", start)
+        raise ClientTimeoutError("timeout while receiving data")
+
+    async def receive_exactly(self, size: int, timeout: float = 1.0) -> bytes:
+        """ Receives exactly the given number of bytes from the socket.
+
+        Parameters
+        ----------
+        size : int
+            The number of bytes to receive.
+        timeout : float, default 1.0
+            The maximum time this function will wait until a ClientTimeoutError is raised.
+
+        Returns
+        -------
+        bytes
+            The received data from the socket.
+
+        Raises
+        ------
+        ClientTimeoutError
+            Raises if the bytes were not received within the given time.
+        """
+        start = time.monotonic() if self.on_receive is not None or self.on_timeout is not None else 0.0
+        try:
+            async with event_loop.timeout(timeout):
+                if await self._receive_at_least(size):
+                    data = self.buffer.read(size)
+                    self._received(data, start)
+                    return data
+        except asyncio.TimeoutError:
+            pass
+
+        self._timed_out("receive_exactly", start)
+        raise ClientTimeoutError("timeout while receiving data")
+
+    async def send_frame(self, data: bytes):
+        """ Sends the given bytes as a frame which is prefixed by its length as a big-endian integer.
+        The payload is compressed if the client has a codec and the payload reaches its threshold.
+
+        Parameters
+        ----------
+        data : bytes
+            The payload of the frame.
+        """
+        await self.send_many(encode_frame(data, self.codec), messages=1)
+
+    async def receive_frame(self, timeout: float = 1.0, max_size: int = MAX_FRAME_SIZE) -> bytes:
+        """ Receives a frame which was sent with send_frame.
+
+        The length header is read first, the payload is then read with StreamReader.readexactly
+        without searching the data for a delimiter.
+
+        Parameters
+        ----------
+        timeout : float, default 1.0
+            The maximum time this function will wait until a ClientTimeoutError is raised.
+        max_size : int, default MAX_FRAME_SIZE
+            The maximum accepted payload length, which also limits the length of a decompressed payload.
+
+        Returns
+        -------
+        bytes
+            The payload of the frame, decompressed if it was flagged as compressed.
+
+        Raises
+        ------
+        ClientTimeoutError
+            Raises if no complete frame was received within the given time.
+        ClientProtocolError
+            Raises if the payload is longer than max_size or a compressed payload cannot be decompressed.
+        """
+        start = time.monotonic() if self.on_receive is not None or self.on_timeout is not None else 0.0
+        try:
+            async with event_loop.timeout(timeout):
+                data = await self._read_frame(max_size)
+                if data is not None:
+                    self._received(data, start)
+                    return data
+        except asyncio.TimeoutError:
+            pass
+
+        self._timed_out("receive_frame", start)
+        raise ClientTimeoutError("timeout while receiving data")
+
+    async def _read_frame(self, max_size: int):
+        # returns None if the connection was closed or lost before the frame was complete
+        if not await self._receive_at_least(HEADER.size):
+            return None
+        header = self.buffer.peek(HEADER.size)
+        length = decode_header(header)
+        compressed = is_compressed(header)
+        if length > max_size:
+            raise ClientProtocolError("frame too large")
+        if len(self.buffer) == HEADER.size:
+            # only the header is buffered, hand the payload over without copying it into the buffer
+            data = await self._read_exactly(length)
+            if data is None:
+                return None
+            self.buffer.clear()
+        elif await self._receive_at_least(HEADER.size + length):
+            self.buffer.skip(HEADER.size)
+            data = self.buffer.read(length)
+        else:
+            return None
+        return decode_payload(data, compressed, self.codec, max_size)
+
+    async def request(self, data: bytes, timeout: float = 1.0) -> bytes:
+        """ Sends a request frame and waits for the response frame with the same correlation id.
+
+        The payload of request and response frames starts with a 4 byte big-endian correlation id.
+        A background task reads the responses and hands them to the waiting requests, so many requests
+        can be in flight on the connection at the same time and responses may arrive in any order.
+        While requests are pending, the other receive methods must not be used.
+
+        Parameters
+        ----------
+        data : bytes
+            The payload of the request.
+        timeout : float, default 1.0
+            The maximum time this function will wait for the response until a ClientTimeoutError is raised.
+
+        Returns
+        -------
+        bytes
+            The payload of the response without the correlation id.
+
+        Raises
+        ------
+        ClientTimeoutError
+            Raises if no response was received within the given time.
+        ClientSocketError
+            Raises if the client is not connected or the connection was lost before the response was received.
+        """
+        if not self._connected:
+            raise ClientSocketError("not connected")
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.ensure_future(self._dispatch_responses())
+        request_id = self._next_request_id
+        self._next_request_id = (request_id + 1) % 2 ** (8 * CORRELATION_ID.size)
+        response = event_loop.get_running_loop().create_future()
+        self._requests[request_id] = response
+        try:
+            header = encode_header(CORRELATION_ID.size + len(data))
+            await self.send_many((header, CORRELATION_ID.pack(request_id), data), messages=1)
+            if not self._connected:
+                raise ClientSocketError("connection lost while sending the request")
+            return await asyncio.wait_for(response, timeout)
+        except asyncio.TimeoutError:
+            raise ClientTimeoutError("timeout while waiting for the response")
+        finally:
+            self._requests.pop(request_id, None)
+
+    async def _dispatch_responses(self):
+        try:
+            while self._connected:
+                start = time.monotonic() if self.on_receive is not None else 0.0
+                frame = await self._read_frame(MAX_FRAME_SIZE)
+                if frame is None:
+                    self.logger.error("connection closed while waiting for responses")
+                    break
+                self._received(frame, start)
+                if len(frame) < CORRELATION_ID.size:
+                    self.logger.error("dropping response without correlation id")
+                    continue
+                request_id, = CORRELATION_ID.unpack_from(frame)
+                response = self._requests.pop(request_id, None)
+                if response is not None and not response.done():
+                    response.set_result(frame[CORRELATION_ID.size:])
+        except ClientProtocolError:
+            self.logger.error("error receiving responses")
+        finally:
+            self._fail_requests()
+
+    def _fail_requests(self):
+        requests = self._requests
+        self._requests = {}
+        for response in requests.values():
+            if not response.done():
+                response.set_exception(ClientSocketError("connection lost"))
+
+    async def _receive_at_least(self, size: int) -> bool:
+        missing = size - len(self.buffer)
+        if missing > 0:
+            data = await self._read_exactly(missing)
+            if data is None:
+                return False
+            self._extend_buffer(data)
+        return True
+
+    def _extend_buffer(self, data: bytes):
+        self.buffer.extend(data)
+        if self.metrics is not None:
+            self.metrics.buffered(len(self.buffer))
+
+    def _received(self, data: bytes, start: float, messages: int = 1):
+        if self.metrics is not None:
+            self.metrics.messages_received += messages
+        if self.on_receive is not None:
+            self.on_receive(len(data), time.monotonic() - start)
+
+    def _timed_out(self, operation: str, start: float):
+        if self.metrics is not None:
+            self.metrics.timeouts += 1
+        if self.on_timeout is not None:
+            self.on_timeout(operation, time.monotonic() - start)
+
+    async def _reconnect(self, error: Exception = None):
+        self.logger.error("reconnecting ...")
+        if self.metrics is not None:
+            self.metrics.reconnects += 1
+        if self.on_reconnect is not None:
+            self.on_reconnect(error)
+        # the dispatcher itself reconnects when it lost the connection while reading, it keeps running then
+        if self._dispatcher is not None and self._dispatcher is not event_loop.current_task():
+            self._dispatcher.cancel()
+            self._dispatcher = None
+        if self.writer is not None:
+            self.writer.close()
+        await self.connect()
+
+    async def _read(self, bytes_to_receive: int) -> bytes:
+        if not self._connected:
+            return b''
+        try:
+            data = await self.reader.read(bytes_to_receive)
+            if self.metrics is not None:
+                self.metrics.received(len(data))
+            return data
+        except ConnectionError as e:
+            self._connected = False
+            self.logger.error("error receiving data")
+            if self.auto_reconnect:
+                await self._reconnect(e)
+            return b''
+
+    async def _read_exactly(self, size: int):
+        if not self._connected:
+            return None
+        try:
+            data = await self.reader.readexactly(size)
+            if self.metrics is not None:
+                self.metrics.received(size)
+            return data
+        except asyncio.IncompleteReadError as e:
+            self.buffer.extend(e.partial)
+            return None
+        except ConnectionError as e:
+            self._connected = False
+            self.logger.error("error receiving data")
+            if self.auto_reconnect:
+                await self._reconnect(e)
+            return None
+
+    async def _read_until(self, delimiter: bytes) -> bytes:
+        if not self._connected:
+            return b''
+        try:
+            data = await self.reader.readuntil(delimiter)
+        except asyncio.LimitOverrunError as e:
+            # the message is longer than the limit, return the part without the delimiter
+            data = await self.reader.read(e.consumed)
+        except asyncio.IncompleteReadError as e:
+            return e.partial
+        except ConnectionError as e:
+            self._connected = False
+            self.logger.error("error receiving data")
+            if self.auto_reconnect:
+                await self._reconnect(e)
+            return b''
+        if self.metrics is not None:
+            self.metrics.received(len(data))
+        return data
+
     def close(self):
         """ Closes the socket connection if it open
         """
         if not self._connected:
             return
+        self._flush_pending()
         self._connected = False
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            self._dispatcher = None
+        self._fail_requests()
         self.writer.close()
+        if self.metrics is not None:
+            self.metrics.export()
@@ -0,0 +1,247 @@
+import asyncio
+import logging
+import time
+from collections import deque
+
+from . import event_loop
+from .async_client import AsyncTcpClient
+from .client_errors import ClientError, ClientTimeoutError
+
+
+class _Acquire:
+    """Awaitable and asynchronous context manager returned by AsyncTcpClientPool.acquire."""
+
+    def __init__(self, pool, timeout):
+        self._pool = pool
+        self._timeout = timeout
+        self._client = None
+
+    def __await__(self):
+        return self._pool._acquire(self._timeout).__await__()
+
+    async def __aenter__(self):
+        self._client = await self._pool._acquire(self._timeout)
+        return self._client
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self._pool.release(self._client)
+
+
+class AsyncTcpClientPool:
+    """A pool of connected asynchronous tcp clients
+
+    Clients are connected on demand up to max_size and are reused after they were released.
+    A client whose connection was closed is dropped and replaced by a new one.
+
+    Attributes
+    ----------
+    host : str
+        The ip address of the tcp server.
+    port : int
+        The port of the tcp server.
+    min_size : int
+        The number of connections opened by start.
+    max_size : int
+        The maximum number of open connections.
+    logger : :obj:
+        An instance of the logging module.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8080, min_size: int = 1, max_size: int = 10,
+                 connect_timeout: float = 10.0, **client_kwargs):
+        """The constructor.
+
+        Parameters
+        ----------
+        host : str, default="127.0.0.1"
+            The ip address of the tcp server.
+        port : int, default=8080
+            The port of the tcp server.
+        min_size : int, default 1
+            The number of connections opened by start.
+        max_size : int, default 10
+            The maximum number of open connections.
+        connect_timeout : float, default 10.0
+            The timeout passed to AsyncTcpClient.connect.
+        **client_kwargs
+            Passed to the constructor of AsyncTcpClient.
+        """
+        if min_size > max_size:
+            raise ValueError("min_size must not be greater than max_size")
+        self.host = host
+        self.port = port
+        self.min_size = min_size
+        self.max_size = max_size
+        self.connect_timeout = connect_timeout
+        self._client_kwargs = client_kwargs
+
+        self._idle = deque()
+        self._waiters = deque()
+        self._size = 0
+        self._closed = False
+
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def size(self):
+        """int: Returns the number of open connections including the checked out ones."""
+        return self._size
+
+    @property
+    def idle(self):
+        """int: Returns the number of connections which are ready to be checked out."""
+        return len(self._idle)
+
+    async def start(self):
+        """ Opens min_size connections concurrently.
+
+        Raises
+        ------
+        ClientTimeoutError
+            If a connection could not be established in connect_timeout.
+        """
+        missing = self.min_size - self._size
+        if missing <= 0:
+            return
+        self._size += missing
+        results = await asyncio.gather(*(self._connect() for _ in range(missing)), return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                self._size -= 1
+            else:
+                self._put(result)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+    def acquire(self, timeout: float = None):
+        """ Checks out a connected client.
+
+        The result can be awaited or used with async with, which releases the client at the end of the block.
+        An idle client is reused if its connection is still open, otherwise a new client is connected
+        as long as fewer than max_size connections are open. Otherwise it waits for a released client.
+
+        Parameters
+        ----------
+        timeout : float, default None
+            The maximum time to wait for a client. Waits forever if None.
+
+        Returns
+        -------
+        awaitable
+            Returns an AsyncTcpClient when awaited. Clients acquired with await have to be given back with release.
+
+        Raises
+        ------
+        ClientTimeoutError
+            If no client was available in the given time.
+        ClientError
+            If the pool is closed.
+        """
+        return _Acquire(self, timeout)
+
+    def release(self, client: AsyncTcpClient):
+        """ Gives a client back to the pool.
+
+        The client is closed if its connection was lost or the pool is closed.
+
+        Parameters
+        ----------
+        client : AsyncTcpClient
+            The client returned by acquire.
+        """
+        if self._closed or not self._is_healthy(client):
+            self._discard(client)
+            self._wake_up(None)
+        else:
+            self._put(client)
+
+    def close(self):
+        """ Closes all idle connections. Checked out connections are closed when they are released.
+        """
+        self._closed = True
+        while self._idle:
+            self._discard(self._idle.pop())
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_exception(ClientError("pool is closed"))
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    async def _acquire(self, timeout: float = None) -> AsyncTcpClient:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            if self._closed:
+                raise ClientError("pool is closed")
+            while self._idle:
+                client = self._idle.pop()
+                if self._is_healthy(client):
+                    return client
+                self.logger.error("dropping broken connection ...")
+                self._discard(client)
+            if self._size < self.max_size:
+                self._size += 1
+                try:
+                    return await self._connect()
+                except BaseException:
+                    self._size -= 1
+                    self._wake_up(None)
+                    raise
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                raise ClientTimeoutError("timeout while waiting for a connection")
+            waiter = event_loop.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                client = await asyncio.wait_for(waiter, remaining)
+            except asyncio.TimeoutError:
+                raise ClientTimeoutError("timeout while waiting for a connection")
+            except asyncio.CancelledError:
+                # do not lose a client which was handed over while the task was cancelled
+                if waiter.done() and not waiter.cancelled() and waiter.exception() is None:
+                    if waiter.result() is None:
+                        self._wake_up(None)
+                    else:
+                        self.release(waiter.result())
+                raise
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+            if client is not None:
+                return client
+
+    async def _connect(self) -> AsyncTcpClient:
+        client = AsyncTcpClient(self.host, self.port, **self._client_kwargs)
+        await client.connect(self.connect_timeout)
+        return client
+
+    def _put(self, client: AsyncTcpClient):
+        # hand the client directly to the longest waiting task
+        if not self._wake_up(client):
+            self._idle.append(client)
+
+    def _wake_up(self, client) -> bool:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(client)
+                return True
+        return False
+
+    def _discard(self, client: AsyncTcpClient):
+        self._size -= 1
+        if client.is_connected:
+            client.close()
+        elif client.writer is not None:
+            # close is a no-op for clients which already lost their connection, the transport is still open
+            client.writer.close()
+
+    @staticmethod
+    def _is_healthy(client: AsyncTcpClient) -> bool:
+        return client.is_connected and not client.writer.is_closing() and not client.reader.at_eof()
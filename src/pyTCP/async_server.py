@@ -0,0 +1,178 @@
+import asyncio
+import threading
+import time
+
+from .client_errors import ClientProtocolError
+from .compression import Codec
+from .framing import encode_frame, read_frame
+from .history import MessageHistory
+from .receive_buffer import ReceiveBuffer
+from .socket_options import SocketOptions
+
+
+class _EchoProtocol(asyncio.Protocol):
+    """Sends the received data back to the client."""
+
+    def __init__(self, instance):
+        self.instance = instance
+        self.transport = None
+        self.buffer = ReceiveBuffer() if instance.framed else None
+        self.address = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.address = transport.get_extra_info("peername")
+        if self.instance.socket_options is not None:
+            self.instance.socket_options.apply(transport.get_extra_info("socket"))
+        self.instance._connections.add(transport)
+        if self.instance.on_connect is not None:
+            self.instance.on_connect(self.address)
+
+    def connection_lost(self, exc):
+        self.instance._connections.discard(self.transport)
+
+    def data_received(self, data):
+        if self.buffer is None:
+            self._echo(data, (data,))
+            return
+        self.buffer.extend(data)
+        codec = self.instance.codec
+        try:
+            frame = read_frame(self.buffer, codec=codec)
+            while frame is not None:
+                self._echo(frame, encode_frame(frame, codec))
+                frame = read_frame(self.buffer, codec=codec)
+        except ClientProtocolError:
+            self.transport.close()
+
+    def _echo(self, message, buffers):
+        instance = self.instance
+        if instance.on_receive is not None:
+            instance.on_receive(len(message), self.address)
+        start = time.monotonic() if instance.on_send is not None else 0.0
+        self.transport.writelines(buffers)
+        if instance.on_send is not None:
+            instance.on_send(sum(len(buffer) for buffer in buffers), time.monotonic() - start, self.address)
+        instance._add(message, self.address)
+
+    def pause_writing(self):
+        # stop reading from a client which does not read its echo
+        self.transport.pause_reading()
+
+    def resume_writing(self):
+        self.transport.resume_reading()
+
+
+class AsyncEchoServer:
+    """An asyncio tcp server
+
+    All connections are served by one event loop without a thread per connection.
+    The server runs in its own thread with start_server and stop_server,
+    or in the running event loop with start and stop.
+
+    Attributes
+    ----------
+    ip : str
+        The ip address of the tcp server.
+    port : int
+        The port of the tcp server.
+    framed : bool, default False
+        If true, the messages are length-prefixed frames as sent by send_frame of the clients.
+    history : :obj:`MessageHistory`
+        The recently received messages, tagged with the client address. None if recording is disabled.
+    last_received_timeout : float, default 5.0
+        The seconds last_received waits for a new message. None waits without a limit.
+    socket_options : :obj:`SocketOptions`
+        The options which are set on every accepted connection. Only the backlog applies to the listening socket.
+    ssl_context : :obj:`ssl.SSLContext`, default None
+        If given, the connections are encrypted with TLS.
+    codec : :obj:`Codec`, default None
+        In framed mode, decompresses the received frames which are flagged as compressed and compresses
+        the echoed frames which reach the threshold of the codec.
+    on_connect : callable, default None
+        Called as ``on_connect(address)`` when a client connected.
+    on_receive : callable, default None
+        Called as ``on_receive(size, address)`` with every received chunk or frame.
+    on_send : callable, default None
+        Called as ``on_send(size, duration, address)`` after the echo was passed to the transport.
+    """
+    def __init__(self, ip, port, framed=False, history_size=1, socket_options: SocketOptions = None,
+                 ssl_context=None, codec: Codec = None):
+        self.ip = ip
+        self.port = port
+        self.framed = framed
+        self.socket_options = socket_options
+        self.ssl_context = ssl_context
+        self.codec = codec
+        self.on_connect = None
+        self.on_receive = None
+        self.on_send = None
+        self.server = None
+        self.keep_alive = False
+        self._loop = None
+        self._thread = None
+        self._connections = set()
+        # a history size of 0 disables recording
+        self.history = MessageHistory(history_size) if history_size else None
+        self.last_received_timeout = 5.0
+
+    @property
+    def last_received(self):
+        """bytes: Waits up to last_received_timeout seconds for a message which was not returned before
+        and returns the last received message. None if recording is disabled or no message arrived in time."""
+        if self.history is None:
+            return None
+        message = self.history.get(self.last_received_timeout)
+        return None if message is None else message.data
+
+    async def start(self):
+        """ Starts the tcp server in the running event loop.
+        """
+        loop = asyncio.get_event_loop()
+        backlog = 100
+        if self.socket_options is not None and self.socket_options.backlog is not None:
+            backlog = self.socket_options.backlog
+        self.server = await loop.create_server(lambda: _EchoProtocol(self), self.ip, self.port, reuse_address=True,
+                                               backlog=backlog, ssl=self.ssl_context)
+        self.keep_alive = True
+
+    async def stop(self):
+        """ Stops the tcp server which was started with start and closes all connections.
+        """
+        self.keep_alive = False
+        self.server.close()
+        for transport in list(self._connections):
+            transport.close()
+        await self.server.wait_closed()
+
+    def start_server(self):
+        """ Starts the tcp server in a new thread with its own event loop.
+
+        Raises
+        ------
+        OSError
+            If the port could not be bound. The thread and the event loop are stopped then.
+        """
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        try:
+            asyncio.run_coroutine_threadsafe(self.start(), self._loop).result()
+        except BaseException:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+            raise
+
+    def stop_server(self):
+        """ Stops the tcp server which was started with start_server.
+        """
+        asyncio.run_coroutine_threadsafe(self.stop(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def _add(self, message, connection=None):
+        if self.history is not None:
+            self.history.append(message, connection)
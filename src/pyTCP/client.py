@@ -1,8 +1,33 @@
 import logging
+import os
 import socket
 import time
+from typing import IO, TYPE_CHECKING, Iterable
 
-from .client_errors import ClientTimeoutError
+from .client_errors import ClientProtocolError, ClientSocketError, ClientTimeoutError
+from .compression import Codec
+from .framing import (HEADER, MAX_FRAME_SIZE, decode_header, encode_frame, read_delimited, read_frame,
+                      read_messages)
+from .metrics import ClientMetrics
+from .receive_buffer import ReceiveBuffer
+from .reconnect import ReconnectPolicy
+from .socket_options import SocketOptions
+
+if TYPE_CHECKING:
+    # the ssl module is only loaded by clients which use TLS
+    import ssl
+
+
+def _iov_max() -> int:
+    # the maximum number of buffers the kernel accepts in one sendmsg call
+    try:
+        value = os.sysconf("SC_IOV_MAX")
+    except (AttributeError, ValueError, OSError):
+        return 1024
+    return value if value > 0 else 1024
+
+
+_IOV_MAX = _iov_max()
 
 
 class TcpClient:
@@ -16,13 +41,42 @@ class TcpClient:
         The port of the tcp server.
     auto_reconnect : bool
         If true, a reconnect will be made on connection loss.
+    reconnect_policy : :obj:`ReconnectPolicy`
+        The waiting times between the attempts to connect.
+    socket_options : :obj:`SocketOptions`
+        The options which are set on every new socket.
+    metrics : :obj:`ClientMetrics`
+        The counters and histograms of the client or None.
+    ssl_context : :obj:`ssl.SSLContext`
+        The context the connections are encrypted with or None.
+    server_hostname : str
+        The host name the certificate of the server is checked against.
+    codec : :obj:`Codec`
+        Compresses the payloads of frames or None.
     logger : :obj:
         An instance of the logging module.
-    buffer : bool, default=True
-        The split part of the msg which was not returned.
+    buffer : :obj:`ReceiveBuffer`
+        The received data which was not returned yet.
+    on_send : callable
+        Called as ``on_send(size, duration)`` after bytes were sent, with the time the send call took.
+    on_receive : callable
+        Called as ``on_receive(size, duration)`` when a receive method returns data,
+        with the time spent in the receive method.
+    on_connect : callable
+        Called as ``on_connect(duration, attempts)`` when a connection was established.
+    on_reconnect : callable
+        Called as ``on_reconnect(error)`` with the exception which caused a reconnect.
+    on_timeout : callable
+        Called as ``on_timeout(operation, duration)`` with the name of the receive method before it raises
+        a ClientTimeoutError.
+
+    The hooks are None by default, the timing is only measured for hooks which are set.
     """
 
-    def __init__(self, host: str = "127.0.0.1", port: int = 8080, auto_reconnect: bool = True):
+    def __init__(self, host: str = "127.0.0.1", port: int = 8080, auto_reconnect: bool = True,
+                 reconnect_policy: ReconnectPolicy = None, socket_options: SocketOptions = None,
+                 metrics: ClientMetrics = None, ssl_context: "ssl.SSLContext" = None, server_hostname: str = None,
+                 codec: Codec = None):
         """The constructor.
 
         Parameters
@@ -33,23 +87,68 @@ class TcpClient:
             The port of the tcp server.
         auto_reconnect : bool, default=True
             If true, a reconnect will be made on connection loss.
+        reconnect_policy : :obj:`ReconnectPolicy`, default None
+            The waiting times between the attempts to connect. Exponential backoff with jitter if None.
+        socket_options : :obj:`SocketOptions`, default None
+            The options which are set on every new socket before it is connected.
+        metrics : :obj:`ClientMetrics`, default None
+            Collects counters and histograms of the client. Nothing is measured if None.
+        ssl_context : :obj:`ssl.SSLContext`, default None
+            If given, the connections are encrypted with TLS, e.g. with a context of ssl.create_default_context().
+            On a reconnect the TLS session of the lost connection is resumed,
+            so no full handshake is needed if the server supports session resumption.
+        server_hostname : str, default None
+            The host name the certificate of the server is checked against. The host if None.
+        codec : :obj:`Codec`, default None
+            Compresses the payloads of the frames sent with send_frame which reach the threshold of the codec,
+            e.g. a ZlibCodec. Compressed frames are flagged in the header and decompressed by receive_frame.
         """
-        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.socket_options = socket_options
+        self.sock = self._create_socket()
         self.host = host
         self.port = port
         self._connected = False
         self.auto_reconnect = auto_reconnect
+        self.reconnect_policy = reconnect_policy or ReconnectPolicy()
+        self.metrics = metrics
+        self.ssl_context = ssl_context
+        self.server_hostname = server_hostname
+        self.codec = codec
+        self._tls_session = None
+        self.on_send = None
+        self.on_receive = None
+        self.on_connect = None
+        self.on_reconnect = None
+        self.on_timeout = None
 
         self.logger = logging.getLogger(__name__)
-        self.buffer = []
+        self.buffer = ReceiveBuffer()
 
     @property
     def is_connected(self):
         """bool: Returns True if connected."""
         return self._connected
 
+    @property
+    def session_reused(self):
+        """bool: Returns True if the TLS session of the previous connection was resumed."""
+        return self.ssl_context is not None and self._connected and self.sock.session_reused
+
+    def stats(self) -> dict:
+        """ Returns a snapshot of the metrics.
+
+        Returns
+        -------
+        dict
+            The snapshot of the ClientMetrics or an empty dict if the client has no metrics.
+        """
+        if self.metrics is None:
+            return {}
+        return self.metrics.snapshot()
+
     def connect(self, timeout: float = 10.0):
-        """ Tries to connect to the given host. Waits 0.5 seconds until another try will be made.
+        """ Tries to connect to the given host. The waiting time until another try will be made
+        is given by the reconnect policy.
 
         Parameters
         ----------
@@ -60,17 +159,38 @@ class TcpClient:
         ------
         ClientTimeoutError
             If no connection could be established in the given time a ClientTimeoutError is raised.
+        ClientSocketError
+            If the maximum number of attempts of the reconnect policy failed
+            or the certificate of the server could not be verified.
         """
-        timeout_start = time.time()
-        while not self._connected and time.time() < timeout_start + timeout:
+        start = time.monotonic()
+        deadline = start + timeout
+        attempt = 0
+        while not self._connected:
             try:
                 self.sock.connect((self.host, self.port))
+                if self.ssl_context is not None:
+                    self._wrap_socket()
                 self._connected = True
+                self.buffer.clear()
+                if self.metrics is not None:
+                    self.metrics.connects += 1
+                    self.metrics.connect_time.record(time.monotonic() - start)
+                if self.on_connect is not None:
+                    self.on_connect(time.monotonic() - start, attempt + 1)
                 return
             except socket.error:
                 self.logger.error("error creating a connection, trying again ... ")
-                time.sleep(0.5)
-                continue
+                # the state of a socket is unspecified after a failed connect
+                self.sock.close()
+                self.sock = self._create_socket()
+            attempt += 1
+            if not self.reconnect_policy.should_retry(attempt):
+                raise ClientSocketError("could not connect after {} attempts".format(attempt))
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            time.sleep(min(self.reconnect_policy.delay(attempt), remaining))
         raise ClientTimeoutError("timeout while connecting")
 
     def send(self, data: bytes):
@@ -84,18 +204,117 @@ class TcpClient:
         """
         if not self._connected:
             return
+        start = time.monotonic() if self.on_send is not None else 0.0
         try:
             self.sock.sendall(data)
-        except socket.error:
+            if self.metrics is not None:
+                self.metrics.sent(len(data))
+            if self.on_send is not None:
+                self.on_send(len(data), time.monotonic() - start)
+        except socket.error as e:
+            self._connected = False
+            self.logger.error("error send data")
+            if self.auto_reconnect:
+                self._reconnect(e)
+
+    def send_many(self, buffers: Iterable[bytes], messages: int = None):
+        """ Send several messages to the socket without joining them. If an socket.error is raised
+        and auto_connect is enabled, a reconnect will be executed.
+
+        The buffers are passed to socket.sendmsg, so many small messages or a header and a body are sent
+        with a single system call. Partial writes are continued until all bytes are sent.
+
+        Parameters
+        ----------
+        buffers : iterable of bytes-like
+            The bytes, bytearray or memoryview objects to send in the given order.
+        messages : int, default None
+            The number of messages the buffers form, which is counted by the metrics.
+            Every buffer is counted as a message if None.
+        """
+        if not self._connected:
+            return
+        start = time.monotonic() if self.on_send is not None else 0.0
+        try:
+            views = [memoryview(buffer).cast('B') for buffer in buffers]
+            measured = self.metrics is not None or self.on_send is not None
+            size = sum(len(view) for view in views) if measured else 0
+            # SSLSocket does not support sendmsg
+            if hasattr(self.sock, 'sendmsg') and self.ssl_context is None:
+                calls = self._sendmsg_all(views)
+            else:
+                self.sock.sendall(b''.join(views))
+                calls = 1
+            if self.metrics is not None:
+                self.metrics.sent(size, len(views) if messages is None else messages, calls)
+            if self.on_send is not None:
+                self.on_send(size, time.monotonic() - start)
+        except socket.error as e:
             self._connected = False
             self.logger.error("error send data")
             if self.auto_reconnect:
-                self.logger.error("reconnecting ...")
-                self.connect()
+                self._reconnect(e)
+
+    def _sendmsg_all(self, views: list) -> int:
+        index = 0
+        calls = 0
+        while index < len(views):
+            sent = self.sock.sendmsg(views[index:index + _IOV_MAX])
+            calls += 1
+            while index < len(views) and sent >= len(views[index]):
+                sent -= len(views[index])
+                index += 1
+            if sent:
+                views[index] = views[index][sent:]
+        return calls
+
+    def send_file(self, fileobj: IO[bytes], offset: int = 0, count: int = None) -> int:
+        """ Sends the content of a file to the socket. If an socket.error is raised and auto_connect is enabled,
+        a reconnect will be executed.
+
+        The file is sent with socket.sendfile, which copies it in the kernel with os.sendfile without
+        reading it into memory. Where os.sendfile cannot be used, e.g. with TLS, it is read and sent in chunks.
+
+        Parameters
+        ----------
+        fileobj : file object
+            A regular file opened in binary mode.
+        offset : int, default 0
+            The position in the file to start from.
+        count : int, default None
+            The number of bytes to send. Until the end of the file if None.
+
+        Returns
+        -------
+        int
+            The number of sent bytes, fewer than requested if the connection was lost during the transfer.
+            The file position is set after the last sent byte.
+        """
+        if not self._connected:
+            return 0
+        start = time.monotonic() if self.on_send is not None else 0.0
+        # socket.sendfile only moves the file position once bytes were sent
+        fileobj.seek(offset)
+        try:
+            sent = self.sock.sendfile(fileobj, offset, count)
+            if self.metrics is not None:
+                self.metrics.sent(sent)
+            if self.on_send is not None:
+                self.on_send(sent, time.monotonic() - start)
+            return sent
+        except socket.error as e:
+            # socket.sendfile leaves the file position after the last sent byte
+            sent = fileobj.tell() - offset
+            self._connected = False
+            self.logger.error("error send data")
+            if self.auto_reconnect:
+                self._reconnect(e)
+            return sent
 
     def receive(self, bytes_to_receive: int = 4096) -> bytes:
         """ Receives messages from the socket. If an socket.error is raised and auto_connect is enabled,
         a reconnect will be executed, otherwise an empty byte string will be returned.
+        Data left in the buffer by receive_until is returned first.
 
         Parameters
         ----------
@@ -109,23 +328,32 @@ class TcpClient:
         """
         if not self._connected:
             return b''
+        start = time.monotonic() if self.on_receive is not None else 0.0
+        if self.buffer:
+            data = self.buffer.read(bytes_to_receive)
+            self._received(data, start, messages=0)
+            return data
         try:
             data = self.sock.recv(bytes_to_receive)
+            if self.metrics is not None:
+                self.metrics.received(len(data))
+            if data:
+                # a chunk of the stream is not a message, it is only counted in bytes_received
+                self._received(data, start, messages=0)
             return data
-        except socket.error:
+        except socket.error as e:
             self._connected = False
             self.logger.error("error receiving data")
             if self.auto_reconnect:
-                self.logger.error("reconnecting ...")
-                self.connect()
+                self._reconnect(e)
             return b''
 
-    def receive_until(self, bytes_to_receive: int = 4096, delimiter: bytes = '\n', timeout: float = 1.0) -> bytes:
+    def receive_until(self, bytes_to_receive: int = 4096, delimiter: bytes = b'\n', timeout: float = 1.0) -> bytes:
         """ Receives messages from the socket until the given delimiter is recognized.
 
        The data will be split at the delimiter. The delimiter will be removed from the message and returned.
-       If the received message contains a message after the delimiter, it will be stored in a buffer
-       and prepended to the next message.
+       If the received message contains a message after the delimiter, it will be kept in the buffer
+       and returned by the next call.
        If an socket.error is raised and auto_connect is enabled,
        a reconnect will be executed, otherwise an empty byte string will be returned.
 
@@ -133,7 +361,7 @@ class TcpClient:
         ----------
         bytes_to_receive : int, default 4096
             Reads the number bytes from the socket. Returns fewer bytes than bytes_to_receive if fewer are available.
-        delimiter : bytes, default '\\n'
+        delimiter : bytes, default b'\\n'
             Splits the read data at the delimiter
         timeout : float, default 1.0
             The maximum time this function will wait until a ClientTimeoutError is raised.
@@ -148,27 +376,221 @@ class TcpClient:
         ClientTimeoutError
             Raises if no data was read or no delimiter was found withing the given time.
         """
-        timeout_start = time.time()
-        while time.time() < timeout_start + timeout:
-            chunk = self.receive(bytes_to_receive)
-            if not chunk:
+        timeout_start = time.monotonic()
+        while True:
+            data = read_delimited(self.buffer, delimiter)
+            if data is not None:
+                if self.metrics is not None:
+                    self.metrics.receive_wait.record(time.monotonic() - timeout_start)
+                self._received(data, timeout_start)
+                return data
+            if time.monotonic() >= timeout_start + timeout or not self._receive_into(bytes_to_receive):
                 break
-            if delimiter not in chunk:
-                self.buffer.append(chunk)
-                continue
-            data = chunk.split(delimiter, maxsplit=1)
-            self.buffer.append(data[0])
-            ret = self.buffer.copy()
-            self.buffer = [data[1]]
 
-            return b''.join(ret)
+        self._timed_out("receive_until", timeout_start)
+        raise ClientTimeoutError("timeout while receiving data")
+
+    def receive_many(self, bytes_to_receive: int = 4096, delimiter: bytes = b'\n', max_frames: int = None,
+                     max_wait: float = 1.0) -> list:
+        """ Returns all complete messages which are buffered.
 
+        The socket is only read if no complete message is buffered yet. All messages which arrived
+        with the same read are returned together, so a burst of small messages is handled with one call.
+
+        Parameters
+        ----------
+        bytes_to_receive : int, default 4096
+            Reads the number bytes from the socket. Returns fewer bytes than bytes_to_receive if fewer are available.
+        delimiter : bytes, default b'\\n'
+            Splits the read data at the delimiter. If None, the messages are length-prefixed frames.
+        max_frames : int, default None
+            The maximum number of messages to return. The remaining messages stay buffered.
+        max_wait : float, default 1.0
+            The maximum time this function will wait for a complete message until a ClientTimeoutError is raised.
+
+        Returns
+        -------
+        list of bytes
+            The received messages in the order they were sent.
+
+        Raises
+        ------
+        ClientTimeoutError
+            Raises if no complete message was received within the given time.
+        """
+        timeout_start = time.monotonic()
+        while True:
+            messages = read_messages(self.buffer, delimiter, max_frames, codec=self.codec)
+            if messages:
+                if self.metrics is not None:
+                    self.metrics.messages_received += len(messages)
+                if self.on_receive is not None:
+                    self.on_receive(sum(len(message) for message in messages), time.monotonic() - timeout_start)
+                return messages
+            if time.monotonic() >= timeout_start + max_wait or not self._receive_into(bytes_to_receive):
+                break
+
+        self._timed_out("receive_many", timeout_start)
+        raise ClientTimeoutError("timeout while receiving data")
+
+    def receive_exactly(self, size: int, timeout: float = 1.0) -> bytes:
+        """ Receives exactly the given number of bytes from the socket.
+
+        The buffer is sized up front, so the bytes are received with as few calls as possible.
+
+        Parameters
+        ----------
+        size : int
+            The number of bytes to receive.
+        timeout : float, default 1.0
+            The maximum time this function will wait until a ClientTimeoutError is raised.
+
+        Returns
+        -------
+        bytes
+            The received data from the socket.
+
+        Raises
+        ------
+        ClientTimeoutError
+            Raises if the bytes were not received within the given time.
+        """
+        start = time.monotonic()
+        if self._receive_at_least(size, size, start + timeout):
+            data = self.buffer.read(size)
+            self._received(data, start)
+            return data
+        self._timed_out("receive_exactly", start)
+        raise ClientTimeoutError("timeout while receiving data")
+
+    def send_frame(self, data: bytes):
+        """ Sends the given bytes as a frame which is prefixed by its length as a big-endian integer.
+        The payload is compressed if the client has a codec and the payload reaches its threshold.
+
+        Parameters
+        ----------
+        data : bytes
+            The payload of the frame.
+        """
+        self.send_many(encode_frame(data, self.codec), messages=1)
+
+    def receive_frame(self, bytes_to_receive: int = 4096, timeout: float = 1.0,
+                      max_size: int = MAX_FRAME_SIZE) -> bytes:
+        """ Receives a frame which was sent with send_frame.
+
+        The length header is read first, the payload is then received into a buffer of the announced size
+        without searching the data for a delimiter.
+
+        Parameters
+        ----------
+        bytes_to_receive : int, default 4096
+            The minimum number of bytes read from the socket at once.
+        timeout : float, default 1.0
+            The maximum time this function will wait until a ClientTimeoutError is raised.
+        max_size : int, default MAX_FRAME_SIZE
+            The maximum accepted payload length, which also limits the length of a decompressed payload.
+
+        Returns
+        -------
+        bytes
+            The payload of the frame, decompressed if it was flagged as compressed.
+
+        Raises
+        ------
+        ClientTimeoutError
+            Raises if no complete frame was received within the given time.
+        ClientProtocolError
+            Raises if the payload is longer than max_size or a compressed payload cannot be decompressed.
+        """
+        start = time.monotonic()
+        deadline = start + timeout
+        if self._receive_at_least(HEADER.size, bytes_to_receive, deadline):
+            length = decode_header(self.buffer.peek(HEADER.size))
+            if length > max_size:
+                raise ClientProtocolError("frame too large")
+            if self._receive_at_least(HEADER.size + length, bytes_to_receive, deadline):
+                data = read_frame(self.buffer, max_size, self.codec)
+                self._received(data, start)
+                return data
+        self._timed_out("receive_frame", start)
         raise ClientTimeoutError("timeout while receiving data")
 
+    def _receive_at_least(self, size: int, bytes_to_receive: int, deadline: float) -> bool:
+        while len(self.buffer) < size:
+            if time.monotonic() >= deadline or not self._receive_into(max(size - len(self.buffer), bytes_to_receive)):
+                return False
+        return True
+
+    def _receive_into(self, bytes_to_receive: int) -> int:
+        if not self._connected:
+            return 0
+        try:
+            received = self.sock.recv_into(self.buffer.reserve(bytes_to_receive), bytes_to_receive)
+            self.buffer.commit(received)
+            if self.metrics is not None:
+                self.metrics.received(received)
+                self.metrics.buffered(len(self.buffer))
+            return received
+        except socket.error as e:
+            self._connected = False
+            self.logger.error("error receiving data")
+            if self.auto_reconnect:
+                self._reconnect(e)
+            return 0
+
+    def _received(self, data: bytes, start: float, messages: int = 1):
+        if self.metrics is not None:
+            self.metrics.messages_received += messages
+        if self.on_receive is not None:
+            self.on_receive(len(data), time.monotonic() - start)
+
+    def _timed_out(self, operation: str, start: float):
+        if self.metrics is not None:
+            self.metrics.timeouts += 1
+        if self.on_timeout is not None:
+            self.on_timeout(operation, time.monotonic() - start)
+
+    def _reconnect(self, error: Exception = None):
+        self.logger.error("reconnecting ...")
+        if self.metrics is not None:
+            self.metrics.reconnects += 1
+        if self.on_reconnect is not None:
+            self.on_reconnect(error)
+        self._save_tls_session()
+        # a socket can not be connected again
+        self.sock.close()
+        self.sock = self._create_socket()
+        self.connect()
+
+    def _wrap_socket(self):
+        import ssl
+        try:
+            self.sock = self.ssl_context.wrap_socket(self.sock, server_hostname=self.server_hostname or self.host,
+                                                     session=self._tls_session)
+        except ssl.CertificateError as e:
+            self.sock.close()
+            self.sock = self._create_socket()
+            raise ClientSocketError("certificate verification failed: {}".format(e))
+
+    def _save_tls_session(self):
+        # with TLS 1.3 the session ticket is sent after the handshake, so the session is taken when the socket is closed
+        session = getattr(self.sock, "session", None)
+        if session is not None:
+            self._tls_session = session
+
+    def _create_socket(self) -> socket.socket:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        if self.socket_options is not None:
+            self.socket_options.apply(sock)
+        return sock
+
     def close(self):
         """ Closes the socket connection if it open
         """
         if not self._connected:
             return
+        self._save_tls_session()
         self._connected = False
         self.sock.close()
+        if self.metrics is not None:
+            self.metrics.export()
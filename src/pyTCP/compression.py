@@ -0,0 +1,129 @@
+import abc
+import zlib
+from typing import Tuple
+
+from .client_errors import ClientProtocolError
+
+
+class Codec(abc.ABC):
+    """The base class of the compression codecs of frames
+
+    Subclasses implement compress and decompress. Frames shorter than the threshold are sent uncompressed,
+    as are frames which do not get smaller. Compressed frames are flagged in their header,
+    so the receiver only needs the same codec, not the same threshold.
+
+    Attributes
+    ----------
+    threshold : int
+        The payload length from which frames are compressed.
+    """
+
+    def __init__(self, threshold: int = 1024):
+        """The constructor.
+
+        Parameters
+        ----------
+        threshold : int, default 1024
+            The payload length from which frames are compressed.
+        """
+        self.threshold = threshold
+
+    @abc.abstractmethod
+    def compress(self, data: bytes) -> bytes:
+        """ Compresses a payload.
+
+        Parameters
+        ----------
+        data : bytes-like
+            The payload.
+
+        Returns
+        -------
+        bytes
+            The compressed payload.
+        """
+
+    @abc.abstractmethod
+    def decompress(self, data: bytes, max_length: int) -> bytes:
+        """ Decompresses a payload without creating more than max_length bytes.
+
+        Parameters
+        ----------
+        data : bytes-like
+            The compressed payload.
+        max_length : int
+            The maximum accepted length of the decompressed payload.
+
+        Returns
+        -------
+        bytes
+            The decompressed payload.
+
+        Raises
+        ------
+        ClientProtocolError
+            If the decompressed payload is longer than max_length or the data is not valid.
+        """
+
+    def encode(self, data: bytes) -> Tuple[bool, bytes]:
+        """ Compresses a payload if it is at least threshold bytes long and gets smaller.
+
+        Parameters
+        ----------
+        data : bytes-like
+            The payload.
+
+        Returns
+        -------
+        tuple of bool and bytes
+            True and the compressed payload or False and the unchanged payload.
+        """
+        if len(data) < self.threshold:
+            return False, data
+        compressed = self.compress(data)
+        if len(compressed) >= len(data):
+            return False, data
+        return True, compressed
+
+
+class ZlibCodec(Codec):
+    """Compresses frames with zlib
+
+    Attributes
+    ----------
+    threshold : int
+        The payload length from which frames are compressed.
+    level : int
+        The zlib compression level from 0 to 9.
+    """
+
+    def __init__(self, threshold: int = 1024, level: int = 6):
+        """The constructor.
+
+        Parameters
+        ----------
+        threshold : int, default 1024
+            The payload length from which frames are compressed.
+        level : int, default 6
+            The zlib compression level from 0 to 9. Low levels are faster, high levels compress better.
+        """
+        super().__init__(threshold)
+        self.level = level
+
+    def compress(self, data: bytes) -> bytes:
+        return zlib.compress(data, self.level)
+
+    def decompress(self, data: bytes, max_length: int) -> bytes:
+        decompressor = zlib.decompressobj()
+        try:
+            # the output is limited, so a small frame cannot expand into a huge allocation
+            result = decompressor.decompress(data, max_length + 1)
+        except zlib.error as e:
+            raise ClientProtocolError("invalid compressed frame: {}".format(e))
+        if len(result) > max_length:
+            raise ClientProtocolError("frame too large")
+        if not decompressor.eof:
+            raise ClientProtocolError("truncated compressed frame")
+        if decompressor.unused_data:
+            raise ClientProtocolError("trailing data after the compressed frame")
+        return result
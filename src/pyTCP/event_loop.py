@@ -0,0 +1,61 @@
+import asyncio
+
+# Python 3.6 only has Task.current_task
+current_task = getattr(asyncio, "current_task", None) or asyncio.Task.current_task
+# Python 3.6 has no get_running_loop, get_event_loop returns the running loop inside coroutines
+get_running_loop = getattr(asyncio, "get_running_loop", None) or asyncio.get_event_loop
+
+
+def use_uvloop() -> bool:
+    """ Installs the event loop policy of uvloop if it is installed.
+
+    The policy applies to all event loops created afterwards, including the loops of the AsyncTcpClient users,
+    the AsyncEchoServer and the coroutine handlers of the EchoServer. It should be called once at start-up,
+    before any event loop is created. Other policies can be installed with asyncio.set_event_loop_policy.
+
+    Returns
+    -------
+    bool
+        True if uvloop is used, False if it is not installed and the default event loop is kept.
+    """
+    try:
+        import uvloop
+    except ImportError:
+        return False
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return True
+
+
+class _Timeout:
+    """Cancels the current task when the delay expired and raises asyncio.TimeoutError instead
+
+    Used before Python 3.11, which added asyncio.timeout.
+    """
+
+    def __init__(self, delay):
+        self._delay = delay
+        self._task = None
+        self._handle = None
+        self._expired = False
+
+    async def __aenter__(self):
+        if self._delay is not None:
+            loop = asyncio.get_event_loop()
+            self._task = current_task(loop)
+            self._handle = loop.call_later(self._delay, self._expire)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if self._handle is not None:
+            self._handle.cancel()
+        if exc_type is asyncio.CancelledError and self._expired:
+            raise asyncio.TimeoutError from None
+        return False
+
+    def _expire(self):
+        self._expired = True
+        self._task.cancel()
+
+
+# timeout(delay) is used as ``async with timeout(delay):`` and raises asyncio.TimeoutError when the delay expired
+timeout = getattr(asyncio, "timeout", _Timeout)
@@ -0,0 +1,217 @@
+import struct
+from typing import List, Optional, Tuple
+
+from .client_errors import ClientProtocolError
+from .receive_buffer import ReceiveBuffer
+
+HEADER = struct.Struct("!I")
+# the top bit of the header flags a compressed payload, the remaining bits are the length
+COMPRESSED = 1 << (8 * HEADER.size - 1)
+MAX_FRAME_SIZE = COMPRESSED - 1
+CORRELATION_ID = struct.Struct("!I")
+
+
+def encode_header(length: int, compressed: bool = False) -> bytes:
+    """ Creates the big-endian length header of a frame.
+
+    Parameters
+    ----------
+    length : int
+        The length of the payload.
+    compressed : bool, default False
+        If true, the header flags the payload as compressed.
+
+    Returns
+    -------
+    bytes
+        The header which has to be sent before the payload.
+
+    Raises
+    ------
+    ClientProtocolError
+        If the length does not fit into the header.
+    """
+    if length > MAX_FRAME_SIZE:
+        raise ClientProtocolError("frame too large")
+    return HEADER.pack(length | COMPRESSED if compressed else length)
+
+
+def decode_header(data) -> int:
+    """ Reads the payload length from a frame header.
+
+    Parameters
+    ----------
+    data : bytes-like
+        At least HEADER.size bytes starting with the header.
+
+    Returns
+    -------
+    int
+        The length of the payload.
+    """
+    return HEADER.unpack_from(data)[0] & MAX_FRAME_SIZE
+
+
+def is_compressed(data) -> bool:
+    """ Returns if a frame header flags the payload as compressed.
+
+    Parameters
+    ----------
+    data : bytes-like
+        At least HEADER.size bytes starting with the header.
+
+    Returns
+    -------
+    bool
+        True if the payload is compressed.
+    """
+    return bool(HEADER.unpack_from(data)[0] & COMPRESSED)
+
+
+def encode_frame(data: bytes, codec=None) -> Tuple[bytes, bytes]:
+    """ Creates the header and the payload of a frame.
+
+    Parameters
+    ----------
+    data : bytes-like
+        The payload.
+    codec : :obj:`Codec`, default None
+        Compresses the payload if it is at least as long as the threshold of the codec.
+
+    Returns
+    -------
+    tuple of bytes
+        The header and the payload which has to be sent after it.
+
+    Raises
+    ------
+    ClientProtocolError
+        If the length does not fit into the header.
+    """
+    compressed = False
+    if codec is not None:
+        compressed, data = codec.encode(data)
+    return encode_header(len(data), compressed), data
+
+
+def decode_payload(data: bytes, compressed: bool, codec=None, max_size: int = MAX_FRAME_SIZE) -> bytes:
+    """ Decompresses the payload of a frame if its header flagged it as compressed.
+
+    Parameters
+    ----------
+    data : bytes-like
+        The payload as received.
+    compressed : bool
+        If the header flagged the payload as compressed.
+    codec : :obj:`Codec`, default None
+        The codec the payload was compressed with.
+    max_size : int, default MAX_FRAME_SIZE
+        The maximum accepted length of the decompressed payload.
+
+    Returns
+    -------
+    bytes
+        The payload.
+
+    Raises
+    ------
+    ClientProtocolError
+        If the payload is compressed but no codec is given, or it cannot be decompressed within max_size.
+    """
+    if not compressed:
+        return data
+    if codec is None:
+        raise ClientProtocolError("compressed frame received without a codec")
+    return codec.decompress(data, max_size)
+
+
+def read_frame(buffer: ReceiveBuffer, max_size: int = MAX_FRAME_SIZE, codec=None) -> Optional[bytes]:
+    """ Consumes the next frame from the buffer if it is complete.
+
+    Parameters
+    ----------
+    buffer : :obj:`ReceiveBuffer`
+        The buffer holding the received data.
+    max_size : int, default MAX_FRAME_SIZE
+        The maximum accepted payload length, before and after decompression.
+    codec : :obj:`Codec`, default None
+        Decompresses payloads which are flagged as compressed.
+
+    Returns
+    -------
+    bytes or None
+        The payload of the frame or None if the frame is not completely buffered.
+
+    Raises
+    ------
+    ClientProtocolError
+        If the payload is longer than max_size or a compressed payload cannot be decompressed.
+    """
+    if len(buffer) < HEADER.size:
+        return None
+    header = buffer.peek(HEADER.size)
+    length = decode_header(header)
+    if length > max_size:
+        raise ClientProtocolError("frame too large")
+    if len(buffer) < HEADER.size + length:
+        return None
+    compressed = is_compressed(header)
+    buffer.skip(HEADER.size)
+    return decode_payload(buffer.read(length), compressed, codec, max_size)
+
+
+def read_delimited(buffer: ReceiveBuffer, delimiter: bytes) -> Optional[bytes]:
+    """ Consumes the next message from the buffer if its delimiter was received.
+
+    Parameters
+    ----------
+    buffer : :obj:`ReceiveBuffer`
+        The buffer holding the received data.
+    delimiter : bytes
+        The delimiter which terminates the message. It is removed from the message.
+
+    Returns
+    -------
+    bytes or None
+        The message or None if the delimiter is not buffered.
+    """
+    index = buffer.find(delimiter)
+    if index < 0:
+        return None
+    data = buffer.read(index)
+    buffer.skip(len(delimiter))
+    return data
+
+
+def read_messages(buffer: ReceiveBuffer, delimiter: Optional[bytes] = None, max_messages: Optional[int] = None,
+                  max_size: int = MAX_FRAME_SIZE, codec=None) -> List[bytes]:
+    """ Consumes all complete messages from the buffer.
+
+    Parameters
+    ----------
+    buffer : :obj:`ReceiveBuffer`
+        The buffer holding the received data.
+    delimiter : bytes, default None
+        The delimiter which terminates the messages. If None, the messages are length-prefixed frames.
+    max_messages : int, default None
+        The maximum number of messages to consume. All complete messages are consumed if None.
+    max_size : int, default MAX_FRAME_SIZE
+        The maximum accepted payload length of a frame.
+    codec : :obj:`Codec`, default None
+        Decompresses frames which are flagged as compressed.
+
+    Returns
+    -------
+    list of bytes
+        The messages in the order they were received.
+    """
+    messages = []
+    while max_messages is None or len(messages) < max_messages:
+        if delimiter is None:
+            message = read_frame(buffer, max_size, codec)
+        else:
+            message = read_delimited(buffer, delimiter)
+        if message is None:
+            break
+        messages.append(message)
+    return messages
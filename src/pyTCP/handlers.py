@@ -0,0 +1,141 @@
+import inspect
+import logging
+import threading
+import concurrent.futures
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable
+
+
+class HandlerPool:
+    """Runs request handlers on a bounded pool of threads or processes
+
+    A handler is called as ``handler(message, address)`` with a received message and the address of the client.
+    It returns the response which is sent back to the client or None if nothing has to be sent.
+    Coroutine functions are run on an event loop in a separate thread.
+
+    At most queue_depth messages are queued or processed at the same time.
+    Further messages are dropped and counted as shed until the queue has room again.
+
+    Attributes
+    ----------
+    handler : callable
+        The request handler.
+    queue_depth : int
+        The maximum number of messages which are queued or processed.
+    shed : int
+        The number of messages which were dropped because the queue was full.
+    logger : :obj:
+        An instance of the logging module.
+    """
+
+    def __init__(self, handler: Callable, pool_size: int = 8, pool: str = "thread", queue_depth: int = 128):
+        """The constructor.
+
+        Parameters
+        ----------
+        handler : callable
+            The request handler, a function or a coroutine function.
+        pool_size : int, default 8
+            The number of threads or processes which run the handler.
+        pool : str, default "thread"
+            "thread" runs the handler in a ThreadPoolExecutor.
+            "process" runs the handler in a ProcessPoolExecutor, the handler has to be picklable.
+        queue_depth : int, default 128
+            The maximum number of messages which are queued or processed.
+
+        Raises
+        ------
+        ValueError
+            If the pool is unknown or a coroutine function should be run in a process pool.
+        """
+        if pool not in ("thread", "process"):
+            raise ValueError("unknown pool {}".format(pool))
+        self.handler = handler
+        self.queue_depth = queue_depth
+        self.shed = 0
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._loop = None
+        self._loop_thread = None
+        # the futures of the coroutines which are still running, shutdown waits for them
+        self._futures = set()
+        self._executor = None
+        if inspect.iscoroutinefunction(handler):
+            if pool == "process":
+                raise ValueError("coroutine functions can not be run in a process pool")
+            # asyncio is only loaded by servers with a coroutine handler
+            import asyncio
+            self._loop = asyncio.new_event_loop()
+            self._loop_thread = threading.Thread(target=self._loop.run_forever)
+            self._loop_thread.daemon = True
+            self._loop_thread.start()
+        elif pool == "process":
+            self._executor = ProcessPoolExecutor(pool_size)
+        else:
+            self._executor = ThreadPoolExecutor(pool_size)
+
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def pending(self):
+        """int: Returns the number of messages which are queued or processed."""
+        return self._pending
+
+    def submit(self, message: bytes, address, callback: Callable[[bytes], None]) -> bool:
+        """ Queues a message for the handler.
+
+        Parameters
+        ----------
+        message : bytes
+            The received message.
+        address : tuple
+            The address of the client.
+        callback : callable
+            Called with the response of the handler if it is not None.
+            It is called in a thread of the pool, not in the calling thread.
+
+        Returns
+        -------
+        bool
+            False if the message was dropped because the queue is full.
+        """
+        with self._lock:
+            if self._pending >= self.queue_depth:
+                self.shed += 1
+                return False
+            self._pending += 1
+        if self._loop is not None:
+            import asyncio
+            future = asyncio.run_coroutine_threadsafe(self.handler(message, address), self._loop)
+            with self._lock:
+                self._futures.add(future)
+        else:
+            future = self._executor.submit(self.handler, message, address)
+        future.add_done_callback(lambda f: self._done(f, callback))
+        return True
+
+    def shutdown(self):
+        """ Stops the pool after the queued messages were processed.
+        """
+        if self._executor is not None:
+            self._executor.shutdown()
+        if self._loop is not None:
+            with self._lock:
+                futures = list(self._futures)
+            concurrent.futures.wait(futures)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop_thread.join()
+            self._loop.close()
+
+    def _done(self, future, callback):
+        with self._lock:
+            self._pending -= 1
+            self._futures.discard(future)
+        if future.cancelled():
+            return
+        if future.exception() is not None:
+            self.logger.error("error in request handler ...", exc_info=future.exception())
+            return
+        response = future.result()
+        if response is not None:
+            callback(response)
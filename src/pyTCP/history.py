@@ -0,0 +1,139 @@
+import threading
+import time
+from collections import namedtuple
+from typing import List, Optional, Tuple
+
+RecordedMessage = namedtuple("RecordedMessage", ["data", "connection", "timestamp"])
+
+
+class MessageHistory:
+    """A ring buffer of the recently received messages
+
+    The slots are preallocated and the oldest message is overwritten once the history is full.
+
+    Attributes
+    ----------
+    capacity : int
+        The number of messages which are kept.
+    """
+
+    def __init__(self, capacity: int = 1):
+        """The constructor.
+
+        Parameters
+        ----------
+        capacity : int, default 1
+            The number of messages which are kept.
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self._slots = [None] * capacity
+        self._count = 0
+        self._consumed = 0
+        self._waiters = 0
+        self._condition = threading.Condition()
+
+    def __len__(self):
+        return min(self._count, len(self._slots))
+
+    @property
+    def capacity(self):
+        """int: Returns the number of messages which are kept."""
+        return len(self._slots)
+
+    @property
+    def count(self):
+        """int: Returns the number of messages which were recorded since the history was created or cleared,
+        including the overwritten ones."""
+        return self._count
+
+    def append(self, data: bytes, connection=None, timestamp: float = None):
+        """ Records a message. It can be called from any thread.
+
+        Parameters
+        ----------
+        data : bytes
+            The received message.
+        connection : default None
+            A tag of the connection the message was received from, e.g. the address of the client.
+        timestamp : float, default None
+            The time the message was received. The current time.time() if None.
+        """
+        message = RecordedMessage(data, connection, time.time() if timestamp is None else timestamp)
+        with self._condition:
+            self._slots[self._count % len(self._slots)] = message
+            self._count += 1
+            if self._waiters:
+                self._condition.notify_all()
+
+    def latest(self) -> Optional[RecordedMessage]:
+        """ Returns the last recorded message without waiting.
+
+        Returns
+        -------
+        RecordedMessage or None
+            The last message or None if nothing was recorded.
+        """
+        count = self._count
+        if not count:
+            return None
+        return self._slots[(count - 1) % len(self._slots)]
+
+    def get(self, timeout: float = None) -> Optional[RecordedMessage]:
+        """ Returns the last recorded message once a message was recorded which was not returned by get before.
+
+        Parameters
+        ----------
+        timeout : float, default None
+            The maximum time to wait for a new message. Waits forever if None.
+
+        Returns
+        -------
+        RecordedMessage or None
+            The last message or None if no new message was recorded in the given time.
+        """
+        with self._condition:
+            self._waiters += 1
+            try:
+                if not self._condition.wait_for(lambda: self._count > self._consumed, timeout):
+                    return None
+            finally:
+                self._waiters -= 1
+            self._consumed = self._count
+            return self._slots[(self._count - 1) % len(self._slots)]
+
+    def messages(self) -> List[RecordedMessage]:
+        """ Returns the recorded messages.
+
+        Returns
+        -------
+        list of RecordedMessage
+            The messages from the oldest to the newest.
+        """
+        return self.messages_since(0)[0]
+
+    def messages_since(self, start: int) -> Tuple[List[RecordedMessage], int]:
+        """ Returns the messages which were recorded after the first start messages.
+
+        Parameters
+        ----------
+        start : int
+            The number of messages to skip, e.g. the count returned by an earlier call.
+
+        Returns
+        -------
+        tuple of list of RecordedMessage and int
+            The messages from the oldest to the newest, without the overwritten ones,
+            and the count at the time they were taken, which is the start of the next call.
+        """
+        with self._condition:
+            count = self._count
+            first = max(count - len(self._slots), start, 0)
+            return [self._slots[index % len(self._slots)] for index in range(first, count)], count
+
+    def clear(self):
+        """ Drops all recorded messages.
+        """
+        with self._condition:
+            self._slots = [None] * len(self._slots)
+            self._count = self._consumed = 0
@@ -0,0 +1,212 @@
+from typing import Callable
+
+
+class Histogram:
+    """A histogram of durations with power-of-two buckets
+
+    A duration of d microseconds is counted in the bucket whose upper bound is the next power of two >= d,
+    so recording a value is a single integer operation and the memory use is fixed.
+
+    Attributes
+    ----------
+    count : int
+        The number of recorded values.
+    total : float
+        The sum of the recorded values in seconds.
+    max : float
+        The largest recorded value in seconds.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._buckets = [0] * 64
+
+    def record(self, seconds: float):
+        """ Counts a duration.
+
+        Parameters
+        ----------
+        seconds : float
+            The duration in seconds.
+        """
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self._buckets[min(int(seconds * 1e6).bit_length(), 63)] += 1
+
+    def percentile(self, fraction: float) -> float:
+        """ Returns the upper bound of the bucket which contains the given fraction of the values.
+
+        Parameters
+        ----------
+        fraction : float
+            The fraction between 0 and 1, e.g. 0.99 for the 99th percentile.
+
+        Returns
+        -------
+        float
+            The upper bound of the bucket in seconds, at most max. 0.0 if nothing was recorded.
+        """
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self._buckets):
+            seen += count
+            if seen >= rank and count:
+                return min(((1 << index) - 1) / 1e6, self.max)
+        return self.max
+
+    def snapshot(self) -> dict:
+        """ Returns the recorded values as a dict.
+
+        Returns
+        -------
+        dict
+            The count, the sum, the mean, the maximum and the p50 and p99 in seconds
+            and the bucket counts by their upper bound in microseconds.
+        """
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "mean": self.total / self.count if self.count else 0.0,
+            "max": self.max,
+            "p50": self.percentile(0.5),
+            "p99": self.percentile(0.99),
+            "buckets": {(1 << index) - 1: count for index, count in enumerate(self._buckets) if count},
+        }
+
+
+class ClientMetrics:
+    """Counters and histograms of a client
+
+    A ClientMetrics instance is passed to the metrics argument of TcpClient or AsyncTcpClient.
+    Clients without metrics skip the instrumentation. Like the clients, it is not thread-safe,
+    every client needs its own instance.
+
+    For the AsyncTcpClient the send and receive calls count the calls into the transport and the StreamReader,
+    which do not map one to one to system calls.
+
+    Attributes
+    ----------
+    bytes_sent : int
+        The number of bytes passed to the socket.
+    bytes_received : int
+        The number of bytes read from the socket.
+    messages_sent : int
+        The number of messages or frames sent.
+    messages_received : int
+        The number of messages or frames returned by the receive methods. The chunks returned by receive
+        are not counted, they are only counted in bytes_received.
+    send_calls : int
+        The number of send system calls. socket.sendall counts as one call.
+    receive_calls : int
+        The number of receive system calls.
+    connects : int
+        The number of established connections.
+    reconnects : int
+        The number of reconnects after a connection loss.
+    timeouts : int
+        The number of ClientTimeoutErrors raised by the receive methods.
+    buffer_high_water : int
+        The largest number of bytes held in the receive buffer.
+    connect_time : :obj:`Histogram`
+        The time until a connection was established, including the retries.
+    receive_wait : :obj:`Histogram`
+        The time spent waiting in receive_until.
+    exporter : callable
+        Called with the snapshot by export.
+    """
+
+    def __init__(self, exporter: Callable[[dict], None] = None):
+        """The constructor.
+
+        Parameters
+        ----------
+        exporter : callable, default None
+            Called with the snapshot by export, e.g. to forward the values to a monitoring system.
+            The clients export their metrics when they are closed.
+        """
+        self.exporter = exporter
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.messages_sent = 0
+        self.messages_received = 0
+        self.send_calls = 0
+        self.receive_calls = 0
+        self.connects = 0
+        self.reconnects = 0
+        self.timeouts = 0
+        self.buffer_high_water = 0
+        self.connect_time = Histogram()
+        self.receive_wait = Histogram()
+
+    def sent(self, size: int, messages: int = 1, calls: int = 1):
+        """ Counts sent data.
+
+        Parameters
+        ----------
+        size : int
+            The number of bytes.
+        messages : int, default 1
+            The number of messages.
+        calls : int, default 1
+            The number of send calls.
+        """
+        self.bytes_sent += size
+        self.messages_sent += messages
+        self.send_calls += calls
+
+    def received(self, size: int):
+        """ Counts one receive call.
+
+        Parameters
+        ----------
+        size : int
+            The number of bytes received by the call.
+        """
+        self.bytes_received += size
+        self.receive_calls += 1
+
+    def buffered(self, size: int):
+        """ Updates the high-water mark of the receive buffer.
+
+        Parameters
+        ----------
+        size : int
+            The number of buffered bytes.
+        """
+        if size > self.buffer_high_water:
+            self.buffer_high_water = size
+
+    def snapshot(self) -> dict:
+        """ Returns the current values.
+
+        Returns
+        -------
+        dict
+            The counters and the snapshots of the histograms by their attribute name.
+        """
+        return {
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "messages_sent": self.messages_sent,
+            "messages_received": self.messages_received,
+            "send_calls": self.send_calls,
+            "receive_calls": self.receive_calls,
+            "connects": self.connects,
+            "reconnects": self.reconnects,
+            "timeouts": self.timeouts,
+            "buffer_high_water": self.buffer_high_water,
+            "connect_time": self.connect_time.snapshot(),
+            "receive_wait": self.receive_wait.snapshot(),
+        }
+
+    def export(self):
+        """ Passes the snapshot to the exporter if one is set.
+        """
+        if self.exporter is not None:
+            self.exporter(self.snapshot())
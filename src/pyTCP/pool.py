@@ -0,0 +1,306 @@
+import contextlib
+import logging
+import select
+import threading
+import time
+from collections import deque
+from typing import Callable
+
+from .client import TcpClient
+from .client_errors import ClientError, ClientTimeoutError
+
+
+class TcpClientPool:
+    """A thread-safe pool of connected tcp clients
+
+    Clients are created on demand up to max_size and are reused after they were released.
+    A client is checked before it is handed out and replaced if its connection is broken.
+
+    Attributes
+    ----------
+    host : str
+        The ip address of the tcp server.
+    port : int
+        The port of the tcp server.
+    min_size : int
+        The number of connections which are kept open even if they are idle.
+    max_size : int
+        The maximum number of open connections.
+    idle_timeout : float
+        The time after which an idle connection is closed.
+    max_lifetime : float
+        The time after which a connection is closed when it is released.
+    logger : :obj:
+        An instance of the logging module.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8080, min_size: int = 1, max_size: int = 10,
+                 idle_timeout: float = 60.0, max_lifetime: float = None, connect_timeout: float = 10.0,
+                 health_check: Callable[[TcpClient], bool] = None, **client_kwargs):
+        """The constructor.
+
+        Parameters
+        ----------
+        host : str, default="127.0.0.1"
+            The ip address of the tcp server.
+        port : int, default=8080
+            The port of the tcp server.
+        min_size : int, default 1
+            The number of connections which are kept open even if they are idle.
+        max_size : int, default 10
+            The maximum number of open connections.
+        idle_timeout : float, default 60.0
+            The time after which an idle connection is closed. Idle connections are never closed if None.
+        max_lifetime : float, default None
+            The time after which a connection is closed when it is released. Connections are reused forever if None.
+        connect_timeout : float, default 10.0
+            The timeout passed to TcpClient.connect.
+        health_check : callable, default None
+            Called with a client before it is handed out. The client is replaced if it returns False.
+            By default a client is healthy if it is connected and no unexpected data or EOF is pending.
+        **client_kwargs
+            Passed to the constructor of TcpClient.
+        """
+        if min_size > max_size:
+            raise ValueError("min_size must not be greater than max_size")
+        self.host = host
+        self.port = port
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.max_lifetime = max_lifetime
+        self.connect_timeout = connect_timeout
+        self._health_check = health_check or self._is_healthy
+        self._client_kwargs = client_kwargs
+
+        self._condition = threading.Condition()
+        self._idle = deque()
+        self._created = {}
+        self._connecting = 0
+        self._closed = False
+
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def size(self):
+        """int: Returns the number of open connections including the checked out ones."""
+        return len(self._created) + self._connecting
+
+    @property
+    def idle(self):
+        """int: Returns the number of connections which are ready to be checked out."""
+        return len(self._idle)
+
+    def fill(self):
+        """ Opens connections until min_size connections are open.
+
+        Raises
+        ------
+        ClientTimeoutError
+            If a connection could not be established in connect_timeout.
+        """
+        while True:
+            with self._condition:
+                if self._closed or self.size >= self.min_size:
+                    return
+                self._connecting += 1
+            client = self._create()
+            with self._condition:
+                self._idle.append((client, time.monotonic()))
+                self._condition.notify()
+
+    def acquire(self, timeout: float = None) -> TcpClient:
+        """ Checks out a connected client.
+
+        An idle client is reused if it passes the health check, otherwise a new client is connected
+        as long as fewer than max_size connections are open. Otherwise it waits for a released client.
+
+        Parameters
+        ----------
+        timeout : float, default None
+            The maximum time to wait for a client. Waits forever if None.
+
+        Returns
+        -------
+        TcpClient
+            A connected client which has to be given back with release.
+
+        Raises
+        ------
+        ClientTimeoutError
+            If no client was available in the given time or the connection could not be established.
+        ClientError
+            If the pool is closed.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            # the candidate is taken under the lock, checking and closing connections happens without it
+            discarded = []
+            try:
+                with self._condition:
+                    client = self._checkout(deadline, discarded)
+            finally:
+                self._close_all(discarded)
+            if client is None:
+                return self._create()
+            if self._is_expired(client):
+                self._discard(client)
+            elif self._health_check(client):
+                return client
+            else:
+                self.logger.error("dropping broken connection ...")
+                self._discard(client)
+
+    def release(self, client: TcpClient):
+        """ Gives a client back to the pool.
+
+        The client is closed if its connection was lost, it exceeded max_lifetime or the pool is closed.
+
+        Parameters
+        ----------
+        client : TcpClient
+            The client returned by acquire.
+        """
+        with self._condition:
+            keep = not self._closed and client.is_connected and not self._is_expired(client)
+            if keep:
+                self._idle.append((client, time.monotonic()))
+                self._condition.notify()
+        if not keep:
+            self._discard(client)
+
+    @contextlib.contextmanager
+    def connection(self, timeout: float = None):
+        """ Checks out a client for the duration of a with block.
+
+        Parameters
+        ----------
+        timeout : float, default None
+            The maximum time to wait for a client. Waits forever if None.
+
+        Yields
+        ------
+        TcpClient
+            A connected client.
+        """
+        client = self.acquire(timeout)
+        try:
+            yield client
+        finally:
+            self.release(client)
+
+    def close(self):
+        """ Closes all idle connections. Checked out connections are closed when they are released.
+        """
+        with self._condition:
+            self._closed = True
+            discarded = [client for client, _ in self._idle]
+            self._idle.clear()
+            for client in discarded:
+                self._created.pop(client, None)
+            self._condition.notify_all()
+        self._close_all(discarded)
+
+    def __enter__(self):
+        self.fill()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _create(self) -> TcpClient:
+        client = TcpClient(self.host, self.port, **self._client_kwargs)
+        try:
+            client.connect(self.connect_timeout)
+        except BaseException:
+            with self._condition:
+                self._connecting -= 1
+                self._condition.notify()
+            client.sock.close()
+            raise
+        with self._condition:
+            self._connecting -= 1
+            self._created[client] = time.monotonic()
+        return client
+
+    def _checkout(self, deadline, discarded) -> TcpClient:
+        # called with the lock held, returns an idle client or None if a new connection may be created
+        while True:
+            if self._closed:
+                raise ClientError("pool is closed")
+            self._evict_idle(discarded)
+            if self._idle:
+                client, _ = self._idle.pop()
+                return client
+            if self.size < self.max_size:
+                # reserve the slot, the connection is established without holding the lock
+                self._connecting += 1
+                return None
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                raise ClientTimeoutError("timeout while waiting for a connection")
+            self._condition.wait(remaining)
+
+    def _discard(self, client: TcpClient):
+        # must be called without holding the lock
+        with self._condition:
+            self._created.pop(client, None)
+            self._condition.notify()
+        self._close_all([client])
+
+    @staticmethod
+    def _close_all(clients):
+        for client in clients:
+            client.close()
+            # close is a no-op for clients which already lost their connection, the socket is still open
+            client.sock.close()
+
+    def _evict_idle(self, discarded):
+        if self.idle_timeout is None:
+            return
+        now = time.monotonic()
+        # the oldest idle connections are at the left end
+        while self._idle and self.size > self.min_size and now - self._idle[0][1] > self.idle_timeout:
+            client, _ = self._idle.popleft()
+            self._created.pop(client, None)
+            discarded.append(client)
+
+    def _is_expired(self, client: TcpClient) -> bool:
+        if self.max_lifetime is None:
+            return False
+        return time.monotonic() - self._created.get(client, 0) > self.max_lifetime
+
+    @staticmethod
+    def _is_healthy(client: TcpClient) -> bool:
+        if not client.is_connected or client.buffer:
+            return False
+        # an idle connection is only readable if the peer closed it or sent unexpected data
+        if not TcpClientPool._is_readable(client.sock):
+            return True
+        # or if a TLS 1.3 server sent session tickets after the handshake
+        return client.ssl_context is not None and TcpClientPool._only_tls_records(client.sock)
+
+    @staticmethod
+    def _is_readable(sock) -> bool:
+        if hasattr(select, "poll"):
+            # unlike select, poll is not limited to file descriptors below FD_SETSIZE
+            poller = select.poll()
+            poller.register(sock, select.POLLIN)
+            return bool(poller.poll(0))
+        readable, _, _ = select.select([sock], [], [], 0)
+        return bool(readable)
+
+    @staticmethod
+    def _only_tls_records(sock) -> bool:
+        import ssl
+        sock.setblocking(False)
+        try:
+            sock.recv(1)
+        except ssl.SSLWantReadError:
+            return True
+        except OSError:
+            return False
+        finally:
+            sock.setblocking(True)
+        # application data or the end of the connection
+        return False
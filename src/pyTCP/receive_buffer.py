@@ -0,0 +1,173 @@
+class ReceiveBuffer:
+    """A growable byte buffer which is filled in place, e.g. by ``socket.recv_into``.
+
+    The received bytes are stored in a preallocated bytearray between a read and a write position.
+    Consumed bytes are not removed from the bytearray, only the read position is moved.
+    The free space is reclaimed once it is needed again.
+
+    Attributes
+    ----------
+    capacity : int
+        The number of bytes the buffer can hold without growing.
+    """
+
+    def __init__(self, capacity: int = 65536):
+        """The constructor.
+
+        Parameters
+        ----------
+        capacity : int, default 65536
+            The initial size of the preallocated bytearray.
+        """
+        self._data = bytearray(capacity)
+        self._view = memoryview(self._data)
+        self._start = 0
+        self._end = 0
+        self._scanned = 0
+        self._delimiter = None
+
+    def __len__(self):
+        return self._end - self._start
+
+    def __bytes__(self):
+        return bytes(self._view[self._start:self._end])
+
+    @property
+    def capacity(self):
+        """int: Returns the size of the underlying bytearray."""
+        return len(self._data)
+
+    def reserve(self, size: int) -> memoryview:
+        """ Returns a writable view of at least the given number of free bytes at the end of the buffer.
+
+        The view is only valid until the next call which changes the buffer.
+        Call commit with the number of bytes written to the view.
+
+        Parameters
+        ----------
+        size : int
+            The number of free bytes needed.
+
+        Returns
+        -------
+        memoryview
+            A view of the free space of the buffer.
+        """
+        if len(self._data) - self._end < size:
+            self._make_room(size)
+        return self._view[self._end:]
+
+    def commit(self, size: int):
+        """ Marks the given number of bytes written to the view returned by reserve as received.
+
+        Parameters
+        ----------
+        size : int
+            The number of bytes written.
+        """
+        self._end += size
+
+    def extend(self, data: bytes):
+        """ Appends the given bytes to the buffer.
+
+        Parameters
+        ----------
+        data : bytes
+            The bytes to append.
+        """
+        size = len(data)
+        self.reserve(size)[:size] = data
+        self._end += size
+
+    def find(self, delimiter: bytes) -> int:
+        """ Searches the buffered data for the delimiter.
+
+        The search continues where the last unsuccessful search for the same delimiter stopped,
+        so every received byte is scanned only once.
+
+        Parameters
+        ----------
+        delimiter : bytes
+            The delimiter to search for.
+
+        Returns
+        -------
+        int
+            The offset of the delimiter from the read position or -1 if the delimiter is not buffered.
+        """
+        if delimiter != self._delimiter:
+            self._delimiter = delimiter
+            self._scanned = self._start
+        begin = max(self._scanned - len(delimiter) + 1, self._start)
+        index = self._data.find(delimiter, begin, self._end)
+        if index < 0:
+            self._scanned = self._end
+            return -1
+        self._scanned = index
+        return index - self._start
+
+    def peek(self, size: int) -> memoryview:
+        """ Returns a view of the next bytes without consuming them.
+
+        Parameters
+        ----------
+        size : int
+            The maximum number of bytes to return.
+
+        Returns
+        -------
+        memoryview
+            A view of at most size buffered bytes. Only valid until the next call which changes the buffer.
+        """
+        return self._view[self._start:min(self._start + size, self._end)]
+
+    def read(self, size: int = -1) -> bytes:
+        """ Consumes and returns the next bytes.
+
+        Parameters
+        ----------
+        size : int, default -1
+            The maximum number of bytes to return. All buffered bytes are returned if negative.
+
+        Returns
+        -------
+        bytes
+            The consumed bytes.
+        """
+        if size < 0 or size > len(self):
+            size = len(self)
+        data = bytes(self._view[self._start:self._start + size])
+        self.skip(size)
+        return data
+
+    def skip(self, size: int):
+        """ Consumes the next bytes without returning them.
+
+        Parameters
+        ----------
+        size : int
+            The number of bytes to drop.
+        """
+        self._start = min(self._start + size, self._end)
+        if self._start == self._end:
+            self.clear()
+        elif self._scanned < self._start:
+            self._scanned = self._start
+
+    def clear(self):
+        """ Drops all buffered bytes.
+        """
+        self._start = self._end = self._scanned = 0
+
+    def _make_room(self, size: int):
+        length = len(self)
+        if len(self._data) - length >= size:
+            self._view[:length] = self._view[self._start:self._end]
+        else:
+            data = bytearray(max(2 * len(self._data), length + size))
+            data[:length] = self._view[self._start:self._end]
+            self._data = data
+            self._view = memoryview(data)
+        self._scanned -= self._start
+        self._start = 0
+        self._end = length
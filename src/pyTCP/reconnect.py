@@ -0,0 +1,87 @@
+import random
+
+
+class ReconnectPolicy:
+    """The waiting times between the attempts of a client to connect
+
+    The delay grows exponentially with every failed attempt up to max_delay.
+    With jitter, a random delay between zero and the exponential delay is used ("full jitter"),
+    so clients which lost their connection at the same time do not reconnect in lockstep.
+    A policy holds no state and can be shared by many clients.
+
+    Attributes
+    ----------
+    initial_delay : float
+        The delay after the first failed attempt.
+    max_delay : float
+        The upper bound of the delay.
+    multiplier : float
+        The factor by which the delay grows after every failed attempt.
+    max_attempts : int
+        The number of attempts after which connecting fails. Unlimited if None.
+    jitter : bool
+        If true, the delay is drawn at random between zero and the exponential delay.
+    """
+
+    def __init__(self, initial_delay: float = 0.1, max_delay: float = 5.0, multiplier: float = 2.0,
+                 max_attempts: int = None, jitter: bool = True):
+        """The constructor.
+
+        Parameters
+        ----------
+        initial_delay : float, default 0.1
+            The delay after the first failed attempt.
+        max_delay : float, default 5.0
+            The upper bound of the delay.
+        multiplier : float, default 2.0
+            The factor by which the delay grows after every failed attempt.
+        max_attempts : int, default None
+            The number of attempts after which connecting fails. Unlimited if None.
+        jitter : bool, default True
+            If true, the delay is drawn at random between zero and the exponential delay.
+        """
+        if initial_delay < 0 or max_delay < 0:
+            raise ValueError("delays must not be negative")
+        if max_attempts is not None and max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.max_attempts = max_attempts
+        self.jitter = jitter
+
+    def delay(self, attempt: int) -> float:
+        """ Returns the time to wait after a failed attempt.
+
+        Parameters
+        ----------
+        attempt : int
+            The number of failed attempts, starting at 1.
+
+        Returns
+        -------
+        float
+            The delay in seconds.
+        """
+        try:
+            delay = min(self.max_delay, self.initial_delay * self.multiplier ** (attempt - 1))
+        except OverflowError:
+            delay = self.max_delay
+        if self.jitter:
+            return random.uniform(0, delay)
+        return delay
+
+    def should_retry(self, attempt: int) -> bool:
+        """ Returns if another attempt is allowed.
+
+        Parameters
+        ----------
+        attempt : int
+            The number of failed attempts.
+
+        Returns
+        -------
+        bool
+            False if max_attempts attempts have failed.
+        """
+        return self.max_attempts is None or attempt < self.max_attempts
@@ -1,33 +1,485 @@
+import multiprocessing
+import multiprocessing.connection
 import select
+import selectors
+import socket
 import socketserver
 import threading
-from queue import Queue
+import time
+from collections import deque
+
+from .client_errors import ClientProtocolError
+from .compression import Codec
+from .framing import encode_frame, read_frame
+from .handlers import HandlerPool
+from .history import MessageHistory
+from .receive_buffer import ReceiveBuffer
+from .socket_options import SocketOptions
+
+# the time a client has to complete the TLS handshake
+TLS_HANDSHAKE_TIMEOUT = 10.0
+# the interval in which the workers pass their recorded messages to the main process
+HISTORY_FLUSH_INTERVAL = 0.05
 
 
 class ThreadedTCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
-    pass
+    """A tcp server which serves every connection in its own thread
+
+    The accept loop and the handler threads wait for their sockets and a shared wakeup socket without a timeout.
+    shutdown makes the wakeup socket readable, so all of them stop immediately.
+    With an ssl context the accepted sockets are wrapped, the handshake is done by the handler thread.
+    """
+
+    def __init__(self, server_address, handler_class, reuse_port=False, socket_options=None, ssl_context=None):
+        self.reuse_port = reuse_port
+        self.socket_options = socket_options
+        self.ssl_context = ssl_context
+        if socket_options is not None and socket_options.backlog is not None:
+            self.request_queue_size = socket_options.backlog
+        self._wakeup_receiver, self._wakeup_sender = socket.socketpair()
+        self._shutdown_request = False
+        self._is_shut_down = threading.Event()
+        self._is_shut_down.set()
+        super().__init__(server_address, handler_class)
+
+    def server_bind(self):
+        if self.reuse_port:
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        if self.socket_options is not None:
+            self.socket_options.apply(self.socket)
+        super().server_bind()
+
+    def get_request(self):
+        sock, address = super().get_request()
+        if self.socket_options is not None:
+            self.socket_options.apply(sock)
+        if self.ssl_context is not None:
+            sock = self.ssl_context.wrap_socket(sock, server_side=True, do_handshake_on_connect=False)
+        return sock, address
+
+    def serve_forever(self, poll_interval=None):
+        """ Accepts connections until shutdown is called.
+
+        Parameters
+        ----------
+        poll_interval : float, default None
+            Ignored, the loop is woken up by shutdown.
+        """
+        self._is_shut_down.clear()
+        try:
+            with selectors.DefaultSelector() as selector:
+                selector.register(self.socket, selectors.EVENT_READ)
+                selector.register(self._wakeup_receiver, selectors.EVENT_READ)
+                while not self._shutdown_request:
+                    for key, _ in selector.select():
+                        if key.fileobj is self.socket and not self._shutdown_request:
+                            self._handle_request_noblock()
+                    self.service_actions()
+        finally:
+            self._is_shut_down.set()
+
+    def shutdown(self):
+        """ Stops the serve_forever loop and all handler threads and waits until the loop has stopped.
+        """
+        self._shutdown_request = True
+        # the byte is never read, the socket stays readable for every thread waiting for it
+        self._wakeup_sender.send(b'\0')
+        self._is_shut_down.wait()
+
+    def server_close(self):
+        """ Closes the listening socket after all handler threads have stopped.
+        """
+        super().server_close()
+        self._wakeup_receiver.close()
+        self._wakeup_sender.close()
+
+    def create_poller(self, sock):
+        """ Creates a poller which waits for the socket and the shutdown of the server.
+
+        Parameters
+        ----------
+        sock : :obj:
+            The socket to wait for.
+
+        Returns
+        -------
+        :obj:`select.poll`
+            The poller to pass to wait_readable or None if poll is not supported on this platform.
+        """
+        if not hasattr(select, "poll"):
+            return None
+        # unlike select, poll is not limited to file descriptors below FD_SETSIZE
+        poller = select.poll()
+        poller.register(sock, select.POLLIN)
+        poller.register(self._wakeup_receiver, select.POLLIN)
+        return poller
+
+    def wait_readable(self, sock, poller=None) -> bool:
+        """ Waits until the socket is readable or the server is shut down.
+
+        Parameters
+        ----------
+        sock : :obj:
+            The socket to wait for.
+        poller : :obj:`select.poll`, default None
+            The poller created by create_poller for the socket. A new poller is created if None.
+
+        Returns
+        -------
+        bool
+            False if the server is shut down.
+        """
+        if poller is None:
+            poller = self.create_poller(sock)
+        if poller is not None:
+            ready_read = [fd for fd, _ in poller.poll()]
+            return not self._shutdown_request and sock.fileno() in ready_read
+        ready_read, _, _ = select.select([sock, self._wakeup_receiver], [], [])
+        return not self._shutdown_request and sock in ready_read
 
 
 class ThreadedTCPRequestHandler(socketserver.BaseRequestHandler):
     """A threaded tcp request handler
     """
 
+    def setup(self):
+        # the poller is created once and reused for every wait of the connection
+        self._poller = self.server.create_poller(self.request)
+
     def handle(self):
 
         """ The handle function.
 
-            Reads data from the client as long as the server is not requested to close.
-            Sends the read data back to the client and stores it in a queue.
+            Reads data from the client until the client closes the connection or the server is shut down.
+            Sends the read data back to the client and records it in the history unless recording is disabled.
+            In framed mode only complete frames are sent back and their payloads are recorded.
+            If the server has a request handler, the responses of the handler are sent instead.
+        """
+        buffer = ReceiveBuffer() if self.server.instance.framed else None
+        self._send_lock = threading.Lock()
+        tls = self.server.ssl_context is not None
+        if tls and not self._handshake():
+            return
+        if self.server.instance.on_connect is not None:
+            self.server.instance.on_connect(self.client_address)
+        # decrypted data can be pending in the TLS connection while the socket is not readable
+        while self.server.instance.keep_alive and (tls and self.request.pending()
+                                                   or self.server.wait_readable(self.request, self._poller)):
+            try:
+                recv_msg = self.request.recv(self.server.instance.receive_bytes)
+            except OSError:
+                return
+            if not recv_msg:
+                return
+            if buffer is None:
+                self._dispatch(recv_msg)
+                continue
+            buffer.extend(recv_msg)
+            try:
+                self._echo_frames(buffer)
+            except ClientProtocolError:
+                # a compressed frame which cannot be decompressed, the stream cannot be resynchronized
+                return
+
+    def _handshake(self) -> bool:
+        self.request.settimeout(TLS_HANDSHAKE_TIMEOUT)
+        try:
+            self.request.do_handshake()
+        except OSError:
+            return False
+        self.request.settimeout(None)
+        return True
+
+    def _echo_frames(self, buffer):
+        codec = self.server.instance.codec
+        frame = read_frame(buffer, codec=codec)
+        while frame is not None:
+            self._dispatch(frame)
+            frame = read_frame(buffer, codec=codec)
+
+    def _dispatch(self, message):
+        instance = self.server.instance
+        if instance.on_receive is not None:
+            instance.on_receive(len(message), self.client_address)
+        if instance.handler_pool is None:
+            self._respond(message)
+            instance._add(message, self.client_address)
+            return
+        instance._add(message, self.client_address)
+        if not instance.handler_pool.submit(message, self.client_address, self._respond):
+            instance._shed()
+
+    def _respond(self, response):
+        instance = self.server.instance
+        if instance.framed:
+            header, payload = encode_frame(response, instance.codec)
+            response = header + payload
+        start = time.monotonic() if instance.on_send is not None else 0.0
+        # responses of the handler pool are sent from its threads
+        with self._send_lock:
+            try:
+                self.request.sendall(response)
+            except OSError:
+                return
+        if instance.on_send is not None:
+            instance.on_send(len(response), time.monotonic() - start, self.client_address)
+
+
+class SelectorConnection:
+    """A non-blocking client connection of the SelectorTCPServer
+
+    Attributes
+    ----------
+    sock : :obj:
+        The client socket.
+    out : bytearray
+        The data which could not be sent yet.
+    """
+
+    def __init__(self, server, sock, address=None):
+        self.server = server
+        self.sock = sock
+        self.address = address
+        self.out = bytearray()
+        self.buffer = ReceiveBuffer() if server.instance.framed else None
+        self.events = selectors.EVENT_READ
+
+    def on_ready(self, events):
+        """ Sends pending data if the socket is writable and reads and echoes data if it is readable.
+
+        Parameters
+        ----------
+        events : int
+            The selector events the socket is ready for.
+        """
+        try:
+            if events & selectors.EVENT_WRITE:
+                self._flush()
+            if events & selectors.EVENT_READ and self.events & selectors.EVENT_READ:
+                self._receive()
+        except OSError:
+            self.close()
+
+    def close(self):
+        """ Unregisters and closes the socket.
+        """
+        self.server.connections.discard(self)
+        self.server.selector.unregister(self.sock)
+        self.sock.close()
+
+    def _receive(self):
+        try:
+            recv_msg = self.sock.recv(self.server.instance.receive_bytes)
+        except BlockingIOError:
+            return
+        if not recv_msg:
+            self.close()
+            return
+        if self.buffer is None:
+            self._dispatch(recv_msg)
+            return
+        self.buffer.extend(recv_msg)
+        codec = self.server.instance.codec
+        try:
+            frame = read_frame(self.buffer, codec=codec)
+            while frame is not None:
+                self._dispatch(frame)
+                frame = read_frame(self.buffer, codec=codec)
+        except ClientProtocolError:
+            self.close()
+
+    def _dispatch(self, message):
+        instance = self.server.instance
+        if instance.on_receive is not None:
+            instance.on_receive(len(message), self.address)
+        if instance.handler_pool is None:
+            self._respond(message)
+            instance._add(message, self.address)
+            return
+        instance._add(message, self.address)
+        # the response is written by the server thread which owns the socket
+        if not instance.handler_pool.submit(message, self.address,
+                                            lambda response: self.server.call_soon(self._respond, response)):
+            instance._shed()
+
+    def _respond(self, response):
+        if self not in self.server.connections:
+            return
+        instance = self.server.instance
+        start = time.monotonic() if instance.on_send is not None else 0.0
+        size = len(response)
+        try:
+            if instance.framed:
+                header, response = encode_frame(response, instance.codec)
+                self._write(header)
+                size = len(header) + len(response)
+            self._write(response)
+        except OSError:
+            self.close()
+            return
+        if instance.on_send is not None:
+            instance.on_send(size, time.monotonic() - start, self.address)
+
+    def _write(self, data):
+        if not self.out:
+            try:
+                sent = self.sock.send(data)
+            except BlockingIOError:
+                sent = 0
+            if sent == len(data):
+                return
+            data = memoryview(data)[sent:]
+        self.out += data
+        self._update_events()
+
+    def _flush(self):
+        try:
+            sent = self.sock.send(self.out)
+        except BlockingIOError:
+            return
+        del self.out[:sent]
+        self._update_events()
+
+    def _update_events(self):
+        if not self.out:
+            events = selectors.EVENT_READ
+        elif len(self.out) < self.server.max_pending:
+            events = selectors.EVENT_READ | selectors.EVENT_WRITE
+        else:
+            # stop reading from a client which does not read its echo
+            events = selectors.EVENT_WRITE
+        if events != self.events:
+            self.events = events
+            self.server.selector.modify(self.sock, events, self)
+
+
+class SelectorTCPServer:
+    """A single-threaded tcp server
+
+    All sockets are non-blocking and are served by one thread which waits for them with a selector.
+    It provides the serve_forever, shutdown and server_close methods of socketserver.TCPServer.
+
+    Attributes
+    ----------
+    socket : :obj:
+        The listening socket.
+    selector : :obj:
+        The selectors.DefaultSelector which waits for the sockets.
+    connections : set
+        The open client connections.
+    max_pending : int
+        The number of bytes which are buffered for a client before reading from it is paused.
+    """
+
+    request_queue_size = 128
+
+    def __init__(self, server_address, instance, max_pending=2 ** 20, reuse_port=False, socket_options=None):
+        self._callbacks = deque()
+        self.instance = instance
+        self.max_pending = max_pending
+        self.socket_options = socket_options
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if reuse_port:
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        backlog = self.request_queue_size
+        if socket_options is not None:
+            socket_options.apply(self.socket)
+            if socket_options.backlog is not None:
+                backlog = socket_options.backlog
+        self.socket.bind(server_address)
+        self.socket.listen(backlog)
+        self.socket.setblocking(False)
+        self.selector = selectors.DefaultSelector()
+        self.connections = set()
+        self._wakeup_receiver, self._wakeup_sender = socket.socketpair()
+        self._wakeup_receiver.setblocking(False)
+        self._wakeup_sender.setblocking(False)
+        self._shutdown_request = False
+        self._is_shut_down = threading.Event()
+        self._is_shut_down.set()
+
+    def serve_forever(self):
+        """ Accepts connections and echoes the received data until shutdown is called.
         """
-        while self.server.instance.keep_alive:
-            ready_read, ready_write, exceptional = select.select([self.request], [], [], 1)
+        self._is_shut_down.clear()
+        self.selector.register(self.socket, selectors.EVENT_READ)
+        self.selector.register(self._wakeup_receiver, selectors.EVENT_READ)
+        try:
+            while not self._shutdown_request:
+                for key, events in self.selector.select():
+                    if key.fileobj is self.socket:
+                        self._accept()
+                    elif key.fileobj is self._wakeup_receiver:
+                        self._run_callbacks()
+                    elif key.data is not None:
+                        key.data.on_ready(events)
+        finally:
+            self.selector.unregister(self.socket)
+            self.selector.unregister(self._wakeup_receiver)
+            self._is_shut_down.set()
 
-            for sock in ready_read:
-                if sock == self.request:
-                    recv_msg = sock.recv(self.server.instance.receive_bytes)
-                    if recv_msg is not None:
-                        self.request.sendall(recv_msg)
-                        self.server.instance._add(recv_msg)
+    def shutdown(self):
+        """ Stops the serve_forever loop and waits until it has stopped.
+        """
+        self._shutdown_request = True
+        self._wake_up()
+        self._is_shut_down.wait()
+
+    def call_soon(self, callback, *args):
+        """ Calls the callback in the server thread. It can be called from any thread.
+
+        Parameters
+        ----------
+        callback : callable
+            The function to call.
+        *args
+            The arguments of the callback.
+        """
+        self._callbacks.append((callback, args))
+        self._wake_up()
+
+    def server_close(self):
+        """ Closes all connections and the listening socket.
+        """
+        for connection in list(self.connections):
+            connection.close()
+        self.socket.close()
+        self.selector.close()
+        self._wakeup_receiver.close()
+        self._wakeup_sender.close()
+
+    def _accept(self):
+        while True:
+            try:
+                sock, address = self.socket.accept()
+            except BlockingIOError:
+                return
+            sock.setblocking(False)
+            if self.socket_options is not None:
+                self.socket_options.apply(sock)
+            connection = SelectorConnection(self, sock, address)
+            self.connections.add(connection)
+            self.selector.register(sock, selectors.EVENT_READ, connection)
+            if self.instance.on_connect is not None:
+                self.instance.on_connect(address)
+
+    def _wake_up(self):
+        try:
+            self._wakeup_sender.send(b'\0')
+        except OSError:
+            # the server thread is woken up by the bytes which are already pending or it has stopped
+            pass
+
+    def _run_callbacks(self):
+        try:
+            while self._wakeup_receiver.recv(4096):
+                pass
+        except BlockingIOError:
+            pass
+        while self._callbacks:
+            callback, args = self._callbacks.popleft()
+            callback(*args)
 
 
 class EchoServer:
@@ -42,38 +494,240 @@ class EchoServer:
         The port of the tcp server.
     bytes_to_receive : int, default 4096
         Reads the number bytes from the socket. Returns fewer bytes than bytes_to_receive if fewer are available.
+    framed : bool, default False
+        If true, the messages are length-prefixed frames as sent by send_frame of the clients.
+    mode : str, default "threaded"
+        "threaded" serves every connection in its own thread.
+        "selector" serves all connections with non-blocking sockets in the server thread.
+    workers : int, default 1
+        The number of processes serving the port. With more than one worker every process binds the port
+        with SO_REUSEPORT and the kernel distributes the connections between them.
+        Every worker records the received messages in its own history and passes them to this process
+        every HISTORY_FLUSH_INTERVAL seconds, the statistics are kept in shared memory.
+    handler : callable, default None
+        Called as ``handler(message, address)`` with every received message and the address of the client.
+        The returned bytes are sent back to the client, nothing is sent if it returns None.
+        Coroutine functions are supported. The messages are echoed if no handler is given.
+        See :obj:`HandlerPool` for the remaining handler options.
+    history : :obj:`MessageHistory`
+        The recently received messages, tagged with the client address. None if recording is disabled.
+    last_received_timeout : float, default 5.0
+        The seconds last_received waits for a new message. None waits without a limit.
+    socket_options : :obj:`SocketOptions`
+        The options which are set on the listening socket and on every accepted connection.
+    ssl_context : :obj:`ssl.SSLContext`, default None
+        If given, the connections are encrypted with TLS. The context needs a certificate chain and
+        issues session tickets, so the clients can resume their sessions. Not supported in selector mode.
+    codec : :obj:`Codec`, default None
+        In framed mode, decompresses the received frames which are flagged as compressed and compresses
+        the responses which reach the threshold of the codec. Connections which send compressed frames
+        to a server without a codec are closed.
+    on_connect : callable, default None
+        Called as ``on_connect(address)`` when a client connected.
+    on_receive : callable, default None
+        Called as ``on_receive(size, address)`` with every received message or frame.
+    on_send : callable, default None
+        Called as ``on_send(size, duration, address)`` after a response was passed to the socket.
+        In selector mode the duration does not include the time the response waited in the output buffer.
+
+    The hooks are called from the threads which serve the connections, with workers in the worker processes.
     """
-    def __init__(self, ip, port, receive_bytes=4096):
-        self.server = ThreadedTCPServer((ip, port), ThreadedTCPRequestHandler)
-        self.server_thread = threading.Thread(target=self.server.serve_forever)
-        self.server_thread.daemon = True
-        self.server.socket.setblocking(False)
-        self.server.instance = self
+    def __init__(self, ip, port, receive_bytes=4096, framed=False, mode="threaded", workers=1, handler=None,
+                 handler_pool_size=8, handler_pool="thread", queue_depth=128, history_size=1,
+                 socket_options: SocketOptions = None, ssl_context=None, codec: Codec = None):
+        if mode not in ("threaded", "selector"):
+            raise ValueError("unknown mode {}".format(mode))
+        if ssl_context is not None and mode == "selector":
+            raise ValueError("TLS is not supported in selector mode")
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        if workers > 1 and not hasattr(socket, "SO_REUSEPORT"):
+            raise ValueError("workers require SO_REUSEPORT which is not supported on this platform")
+        self.ip = ip
+        self.port = port
+        self.mode = mode
+        self.workers = workers
         self.keep_alive = False
         self.receive_bytes = receive_bytes
-        self._last_received = Queue(maxsize=1)
+        self.framed = framed
+        self.socket_options = socket_options
+        self.ssl_context = ssl_context
+        self.codec = codec
+        self.on_connect = None
+        self.on_receive = None
+        self.on_send = None
+        # a history size of 0 disables recording
+        self.history = MessageHistory(history_size) if history_size else None
+        self.last_received_timeout = 5.0
+        self.handler = handler
+        self.handler_pool = None
+        self._handler_options = {"pool_size": handler_pool_size, "pool": handler_pool, "queue_depth": queue_depth}
+        if handler_pool not in ("thread", "process"):
+            raise ValueError("unknown handler pool {}".format(handler_pool))
+
+        self.server = None
+        self.server_thread = None
+        if workers == 1:
+            self.server = self._create_server()
+            self.server_thread = threading.Thread(target=self.server.serve_forever)
+            self.server_thread.daemon = True
+            self._stats = [0, 0, 0]
+        else:
+            self._context = multiprocessing.get_context("fork")
+            # messages, bytes and shed messages of every worker, each worker only writes its own slots
+            self._stats = self._context.Array("Q", 3 * workers, lock=False)
+            self._stop_event = self._context.Event()
+            self._processes = []
+            self._collector = None
+        self._worker = 0
+        self._stats_lock = threading.Lock()
 
     @property
     def last_received(self):
-        """bytes: Returns the last received message."""
-        return self._last_received.get()
+        """bytes: Waits up to last_received_timeout seconds for a message which was not returned before
+        and returns the last received message. None if recording is disabled or no message arrived in time."""
+        if self.history is None:
+            return None
+        message = self.history.get(self.last_received_timeout)
+        return None if message is None else message.data
+
+    @property
+    def stats(self):
+        """dict: Returns the number of received messages and bytes and the number of messages which were
+        dropped because the handler queue was full, summed up over all workers."""
+        stats = list(self._stats)
+        return {"messages": sum(stats[0::3]), "bytes": sum(stats[1::3]), "shed": sum(stats[2::3])}
 
     def start_server(self):
         """ Starts the tcp server.
+
+        With more than one worker it returns after all workers are listening.
+
+        Raises
+        ------
+        OSError
+            If a worker could not bind the port.
         """
         self.keep_alive = True
-        self.server_thread.start()
+        if self.workers == 1:
+            self.handler_pool = self._create_handler_pool()
+            self.server_thread.start()
+            return
+        self._stop_event.clear()
+        connections = []
+        try:
+            for index in range(self.workers):
+                receiver, sender = self._context.Pipe(duplex=False)
+                process = self._context.Process(target=self._run_worker, args=(index, sender))
+                process.daemon = True
+                process.start()
+                sender.close()
+                self._processes.append(process)
+                connections.append(receiver)
+                error = receiver.recv()
+                if error is not None:
+                    raise error
+        except BaseException:
+            self._stop_workers()
+            for receiver in connections:
+                receiver.close()
+            raise
+        self._collector = threading.Thread(target=self._collect, args=(connections,))
+        self._collector.daemon = True
+        self._collector.start()
 
     def stop_server(self):
         """ Stops the tcp server.
         """
         self.keep_alive = False
+        if self.workers == 1:
+            self.server.shutdown()
+            self.server.server_close()
+            if self.handler_pool is not None:
+                self.handler_pool.shutdown()
+            return
+        self._stop_workers()
+        if self._collector is not None:
+            self._collector.join()
+            self._collector = None
+
+    def _create_server(self, reuse_port=False):
+        if self.mode == "selector":
+            return SelectorTCPServer((self.ip, self.port), self, reuse_port=reuse_port,
+                                     socket_options=self.socket_options)
+        server = ThreadedTCPServer((self.ip, self.port), ThreadedTCPRequestHandler, reuse_port=reuse_port,
+                                   socket_options=self.socket_options, ssl_context=self.ssl_context)
+        server.socket.setblocking(False)
+        server.instance = self
+        return server
+
+    def _create_handler_pool(self):
+        if self.handler is None:
+            return None
+        return HandlerPool(self.handler, **self._handler_options)
+
+    def _run_worker(self, index, connection):
+        # runs in the forked worker process
+        try:
+            self.server = self._create_server(reuse_port=True)
+        except OSError as e:
+            connection.send(e)
+            connection.close()
+            return
+        self._worker = index
+        if self.history is not None:
+            # the messages are recorded locally and passed to the main process in batches
+            self.history = MessageHistory(self.history.capacity)
+        self.handler_pool = self._create_handler_pool()
+        server_thread = threading.Thread(target=self.server.serve_forever)
+        server_thread.daemon = True
+        server_thread.start()
+        connection.send(None)
+        flushed = 0
+        while not self._stop_event.wait(HISTORY_FLUSH_INTERVAL):
+            flushed = self._flush_history(connection, flushed)
+        self.keep_alive = False
         self.server.shutdown()
         self.server.server_close()
+        if self.handler_pool is not None:
+            self.handler_pool.shutdown()
+        self._flush_history(connection, flushed)
+        connection.close()
 
-    def _add(self, message):
-        if not self._last_received.full():
-            self._last_received.put(message)
-        else:
-            self._last_received.get_nowait()
-            self._last_received.put(message)
+    def _flush_history(self, connection, flushed):
+        # sends the messages which were recorded since the last flush, returns the new number of flushed messages
+        if self.history is None or self.history.count == flushed:
+            return flushed
+        messages, count = self.history.messages_since(flushed)
+        connection.send(messages)
+        return count
+
+    def _stop_workers(self):
+        self._stop_event.set()
+        for process in self._processes:
+            process.join()
+        self._processes = []
+
+    def _collect(self, connections):
+        # passes the messages of all workers to the history until every worker has stopped
+        while connections:
+            for connection in multiprocessing.connection.wait(connections):
+                try:
+                    messages = connection.recv()
+                except EOFError:
+                    connections.remove(connection)
+                    connection.close()
+                    continue
+                for message in messages:
+                    self.history.append(*message)
+
+    def _add(self, message, connection=None):
+        with self._stats_lock:
+            self._stats[3 * self._worker] += 1
+            self._stats[3 * self._worker + 1] += len(message)
+        if self.history is not None:
+            self.history.append(message, connection)
+
+    def _shed(self):
+        with self._stats_lock:
+            self._stats[3 * self._worker + 2] += 1
@@ -0,0 +1,104 @@
+import socket
+
+
+class SocketOptions:
+    """Socket options which are applied to the sockets of the clients and the server
+
+    Options which are None or False are left at the default of the operating system.
+    Options which are not supported by the platform are skipped.
+
+    Attributes
+    ----------
+    nodelay : bool
+        If true, Nagle's algorithm is disabled (TCP_NODELAY), so small messages are sent immediately.
+    send_buffer : int
+        The size of the kernel send buffer (SO_SNDBUF).
+    receive_buffer : int
+        The size of the kernel receive buffer (SO_RCVBUF).
+    keepalive : bool
+        If true, keepalive probes are sent on idle connections (SO_KEEPALIVE).
+    keepalive_idle : int
+        The idle time in seconds before the first keepalive probe (TCP_KEEPIDLE).
+    keepalive_interval : int
+        The time in seconds between keepalive probes (TCP_KEEPINTVL).
+    keepalive_count : int
+        The number of unanswered probes after which the connection is dropped (TCP_KEEPCNT).
+    quickack : bool
+        If true, delayed acknowledgements are disabled (TCP_QUICKACK).
+        The kernel may enable them again, so the option only affects the start of a connection.
+    user_timeout : int
+        The time in milliseconds sent data may stay unacknowledged before the connection is dropped
+        (TCP_USER_TIMEOUT).
+    backlog : int
+        The length of the queue of pending connections of a listening socket.
+    """
+
+    def __init__(self, nodelay: bool = False, send_buffer: int = None, receive_buffer: int = None,
+                 keepalive: bool = False, keepalive_idle: int = None, keepalive_interval: int = None,
+                 keepalive_count: int = None, quickack: bool = False, user_timeout: int = None, backlog: int = None):
+        """The constructor.
+
+        Parameters
+        ----------
+        nodelay : bool, default False
+            If true, Nagle's algorithm is disabled (TCP_NODELAY).
+        send_buffer : int, default None
+            The size of the kernel send buffer (SO_SNDBUF).
+        receive_buffer : int, default None
+            The size of the kernel receive buffer (SO_RCVBUF).
+        keepalive : bool, default False
+            If true, keepalive probes are sent on idle connections (SO_KEEPALIVE).
+        keepalive_idle : int, default None
+            The idle time in seconds before the first keepalive probe (TCP_KEEPIDLE).
+        keepalive_interval : int, default None
+            The time in seconds between keepalive probes (TCP_KEEPINTVL).
+        keepalive_count : int, default None
+            The number of unanswered probes after which the connection is dropped (TCP_KEEPCNT).
+        quickack : bool, default False
+            If true, delayed acknowledgements are disabled (TCP_QUICKACK).
+        user_timeout : int, default None
+            The time in milliseconds sent data may stay unacknowledged (TCP_USER_TIMEOUT).
+        backlog : int, default None
+            The length of the queue of pending connections of a listening socket.
+        """
+        self.nodelay = nodelay
+        self.send_buffer = send_buffer
+        self.receive_buffer = receive_buffer
+        self.keepalive = keepalive
+        self.keepalive_idle = keepalive_idle
+        self.keepalive_interval = keepalive_interval
+        self.keepalive_count = keepalive_count
+        self.quickack = quickack
+        self.user_timeout = user_timeout
+        self.backlog = backlog
+
+    def apply(self, sock: socket.socket):
+        """ Sets the options on a socket.
+
+        The buffer sizes should be set before the socket is connected or listening,
+        because the TCP window scale is negotiated during the handshake.
+
+        Parameters
+        ----------
+        sock : :obj:
+            The socket to configure.
+        """
+        if self.send_buffer is not None:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.send_buffer)
+        if self.receive_buffer is not None:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.receive_buffer)
+        if self.nodelay:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        if self.keepalive:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            self._set_tcp_option(sock, "TCP_KEEPIDLE", self.keepalive_idle)
+            self._set_tcp_option(sock, "TCP_KEEPINTVL", self.keepalive_interval)
+            self._set_tcp_option(sock, "TCP_KEEPCNT", self.keepalive_count)
+        if self.quickack:
+            self._set_tcp_option(sock, "TCP_QUICKACK", 1)
+        self._set_tcp_option(sock, "TCP_USER_TIMEOUT", self.user_timeout)
+
+    @staticmethod
+    def _set_tcp_option(sock, name, value):
+        if value is not None and hasattr(socket, name):
+            sock.setsockopt(socket.IPPROTO_TCP, getattr(socket, name), value)
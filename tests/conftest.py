@@ -6,5 +6,14 @@
     Read more about conftest.py under:
     https://pytest.org/latest/plugins.html
 """
+import asyncio
+import os
 
-# import pytest
+from pyTCP.event_loop import use_uvloop
+
+# PYTCP_EVENT_LOOP=uvloop runs the test suite with the event loop of uvloop
+if os.environ.get("PYTCP_EVENT_LOOP") == "uvloop":
+    if not use_uvloop():
+        raise RuntimeError("PYTCP_EVENT_LOOP=uvloop requires uvloop to be installed")
+    # unlike the default policy, the policy of uvloop does not create a loop in asyncio.get_event_loop
+    asyncio.set_event_loop(asyncio.new_event_loop())
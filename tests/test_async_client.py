@@ -3,7 +3,8 @@ from unittest import mock
 
 import pytest
 from pyTCP.async_client import AsyncTcpClient
-from pyTCP.client_errors import ClientTimeoutError
+from pyTCP.client_errors import ClientProtocolError, ClientSocketError, ClientTimeoutError
+from pyTCP.reconnect import ReconnectPolicy
 from pyTCP.server import EchoServer
 
 
@@ -65,7 +66,7 @@ class TestAsyncTcpClient:
         await client.send(data_to_send)
         ret = await client.receive_until(delimiter=b'\n')
         assert ret == b"Test message"
-        assert client.buffer[0] == b"Hello"
+        assert await client.receive() == b"Hello"
 
     @pytest.mark.asyncio
     async def test_connect_and_receive_parts(self, setup):
@@ -74,16 +75,253 @@ class TestAsyncTcpClient:
         await client.send(data_to_send)
         ret = await client.receive_until(bytes_to_receive=1, delimiter=b'\n')
         assert ret == b"Test message"
-        assert client.buffer[0] == b""
+        assert not client.buffer
+
+    @pytest.mark.asyncio
+    async def test_receive_until_multiple_messages(self, setup):
+        client, echo_server = setup
+        await client.send(b"first\nsecond\nthird\n")
+        assert await client.receive_until(delimiter=b'\n') == b"first"
+        assert await client.receive_until(delimiter=b'\n') == b"second"
+        assert await client.receive_until(delimiter=b'\n') == b"third"
+
+    @pytest.mark.asyncio
+    async def test_receive_until_message_longer_than_limit(self, setup):
+        client, echo_server = setup
+        client.close()
+        client.limit = 16
+        await client.connect()
+        data_to_send = b"x" * 100
+        await client.send(data_to_send + b"\r\nHello\r\n")
+        assert await client.receive_until(delimiter=b'\r\n') == data_to_send
+        assert await client.receive_until(delimiter=b'\r\n') == b"Hello"
+
+    @pytest.mark.asyncio
+    async def test_send_and_receive_frames(self):
+        echo_server = EchoServer("127.0.0.1", 12345, framed=True)
+        echo_server.start_server()
+        client = AsyncTcpClient(host="127.0.0.1", port=12345)
+        await client.connect()
+
+        data_to_send = b"Test\nmessage\x00" * 100000
+        await client.send_frame(data_to_send)
+        await client.send_frame(b"Hello")
+        assert await client.receive_frame() == data_to_send
+        assert await client.receive_frame() == b"Hello"
+        # the server echoes a frame before it records it
+        while echo_server.history.count < 2:
+            await asyncio.sleep(0.01)
+        assert echo_server.history.latest().data == b"Hello"
+
+        client.close()
+        echo_server.stop_server()
+
+    @pytest.mark.asyncio
+    async def test_send_many(self, setup):
+        client, echo_server = setup
+        await client.send_many([b"Test", bytearray(b" "), memoryview(b"message\n")])
+        assert await client.receive_until(delimiter=b'\n') == b"Test message"
+
+    @pytest.mark.asyncio
+    async def test_send_waits_for_drain(self, setup):
+        client, echo_server = setup
+        client.writer.drain = mock.MagicMock()
+        await client.send(b"Test message")
+        assert client.writer.drain.called
+
+    @pytest.mark.asyncio
+    async def test_write_buffer_limits(self):
+        echo_server = EchoServer("127.0.0.1", 12345)
+        echo_server.start_server()
+        client = AsyncTcpClient(host="127.0.0.1", port=12345, high_water=4096, low_water=1024)
+        await client.connect()
+
+        assert client.writer.transport.get_write_buffer_limits() == (1024, 4096)
+
+        client.close()
+        echo_server.stop_server()
+
+    @pytest.mark.asyncio
+    async def test_coalesce(self, setup):
+        client, echo_server = setup
+        client.coalesce = True
+        client.writer.writelines = mock.MagicMock(wraps=client.writer.writelines)
+        await client.send(b"Test")
+        await client.send_many([b" ", b"message\n"])
+        assert not client.writer.writelines.called
+        await asyncio.sleep(0)
+        client.writer.writelines.assert_called_once_with([b"Test", b" ", b"message\n"])
+        assert await client.receive_until(delimiter=b'\n') == b"Test message"
+
+    @pytest.mark.asyncio
+    async def test_coalesce_size(self, setup):
+        client, echo_server = setup
+        client.coalesce = True
+        client.coalesce_size = 8
+        client.writer.writelines = mock.MagicMock(wraps=client.writer.writelines)
+        await client.send(b"Test")
+        assert not client.writer.writelines.called
+        await client.send(b" message\n")
+        client.writer.writelines.assert_called_once_with([b"Test", b" message\n"])
+
+    @pytest.mark.asyncio
+    async def test_coalesce_copies_mutable_buffers(self, setup):
+        client, echo_server = setup
+        client.coalesce = True
+        buffer = bytearray(b"Test message\n")
+        await client.send(buffer)
+        buffer[:] = b"overwritten\n"
+        await client.flush()
+        assert await client.receive_until(delimiter=b'\n') == b"Test message"
+
+    @pytest.mark.asyncio
+    async def test_flush(self, setup):
+        client, echo_server = setup
+        client.coalesce = True
+        await client.send(b"Test message\n")
+        await client.flush()
+        assert not client._pending
+        assert await client.receive_until(delimiter=b'\n') == b"Test message"
+
+    @pytest.mark.asyncio
+    async def test_receive_many(self, setup):
+        client, echo_server = setup
+        await client.send(b"first\nsecond\nthird\nrest")
+        messages = await client.receive_many(delimiter=b'\n')
+        while len(messages) < 3:
+            messages += await client.receive_many(delimiter=b'\n')
+        assert messages == [b"first", b"second", b"third"]
+        assert bytes(client.buffer) == b"rest"
+
+    @pytest.mark.asyncio
+    async def test_receive_many_max_frames(self, setup):
+        client, echo_server = setup
+        await client.send(b"first\nsecond\nthird\n")
+        assert await client.receive_many(delimiter=b'\n', max_frames=1) == [b"first"]
+        assert await client.receive_many(delimiter=b'\n', max_frames=1) == [b"second"]
+        assert await client.receive_many(delimiter=b'\n', max_frames=1) == [b"third"]
+
+    @pytest.mark.asyncio
+    async def test_receive_many_timeout(self, setup):
+        client, echo_server = setup
+        with pytest.raises(ClientTimeoutError):
+            await client.receive_many(max_wait=0.1)
+
+    @pytest.mark.asyncio
+    async def test_receive_exactly(self, setup):
+        client, echo_server = setup
+        await client.send(b"Test message")
+        assert await client.receive_exactly(4) == b"Test"
+        assert await client.receive_exactly(8) == b" message"
+
+    @pytest.mark.asyncio
+    async def test_receive_exactly_timeout(self, setup):
+        client, echo_server = setup
+        await client.send(b"Test")
+        with pytest.raises(ClientTimeoutError):
+            await client.receive_exactly(8, timeout=0.1)
+        assert await client.receive_exactly(4) == b"Test"
+
+    @pytest.mark.asyncio
+    async def test_receive_frame_too_large(self, setup):
+        client, echo_server = setup
+        await client.send(b"\x00\x00\x01\x00")
+        with pytest.raises(ClientProtocolError):
+            await client.receive_frame(max_size=255)
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests(self):
+        echo_server = EchoServer("127.0.0.1", 12345, framed=True)
+        echo_server.start_server()
+        client = AsyncTcpClient(host="127.0.0.1", port=12345)
+        await client.connect()
+
+        payloads = [b"request %d" % i for i in range(100)]
+        responses = await asyncio.gather(*(client.request(payload) for payload in payloads))
+        assert responses == payloads
+        assert not client._requests
+
+        client.close()
+        echo_server.stop_server()
+
+    @pytest.mark.asyncio
+    async def test_responses_out_of_order(self, setup):
+        client, echo_server = setup
+        client.send_many = mock.MagicMock()
+        first = asyncio.ensure_future(client.request(b"first"))
+        second = asyncio.ensure_future(client.request(b"second"))
+        await asyncio.sleep(0)
+        # the echo server returns the frames as they are, so they can be sent in reverse order
+        await client.send(b"\x00\x00\x00\x0c\x00\x00\x00\x01response")
+        await client.send(b"\x00\x00\x00\x0d\x00\x00\x00\x00response0")
+        assert await second == b"response"
+        assert await first == b"response0"
+
+    @pytest.mark.asyncio
+    async def test_request_timeout(self, setup):
+        client, echo_server = setup
+        client.send_many = mock.MagicMock()
+        with pytest.raises(ClientTimeoutError):
+            await client.request(b"Test message", timeout=0.1)
+        assert not client._requests
+
+    @pytest.mark.asyncio
+    async def test_request_cancelled(self, setup):
+        client, echo_server = setup
+        client.send_many = mock.MagicMock()
+        request = asyncio.ensure_future(client.request(b"Test message"))
+        await asyncio.sleep(0)
+        request.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await request
+        assert not client._requests
+
+    @pytest.mark.asyncio
+    async def test_request_send_failed(self, setup):
+        client, echo_server = setup
+        client.writer.writelines = mock.MagicMock(side_effect=ConnectionRefusedError)
+        client.auto_reconnect = False
+        with pytest.raises(ClientSocketError):
+            await client.request(b"Test message", timeout=5)
+        assert not client._requests
+
+    @pytest.mark.asyncio
+    async def test_eof_fails_pending_requests(self, setup):
+        client, echo_server = setup
+        client.send_many = mock.MagicMock()
+        request = asyncio.ensure_future(client.request(b"Test message", timeout=5))
+        await asyncio.sleep(0)
+        client.reader.feed_eof()
+        with pytest.raises(ClientSocketError):
+            await request
+        assert client.metrics is None or client.metrics.timeouts == 0
+
+    @pytest.mark.asyncio
+    async def test_close_fails_pending_requests(self, setup):
+        client, echo_server = setup
+        client.send_many = mock.MagicMock()
+        request = asyncio.ensure_future(client.request(b"Test message"))
+        await asyncio.sleep(0)
+        client.close()
+        with pytest.raises(ClientSocketError):
+            await request
+
+    @pytest.mark.asyncio
+    async def test_request_not_connected(self):
+        client = AsyncTcpClient("127.0.0.1", port=12345)
+        with pytest.raises(ClientSocketError):
+            await client.request(b"Test message")
 
     @pytest.mark.asyncio
     async def test_reconnect_on_send_with_socket_error(self, setup):
         client, echo_server = setup
-        client.writer.write = mock.MagicMock(side_effect=ConnectionRefusedError)
+        writer = client.writer
+        writer.write = mock.MagicMock(side_effect=ConnectionRefusedError)
         client.connect = mock.MagicMock()
         await client.send(b"Test message")
         assert not client.is_connected
         assert client.connect.called
+        assert writer.is_closing()
 
     @pytest.mark.asyncio
     async def test_no_reconnect_on_send_with_socket_error(self, setup):
@@ -118,6 +356,15 @@ class TestAsyncTcpClient:
         assert not client.is_connected
         assert not client.connect.called
 
+    @pytest.mark.asyncio
+    async def test_receive_with_connection_reset(self, setup):
+        client, echo_server = setup
+        client.reader.read = mock.MagicMock(side_effect=ConnectionResetError)
+        client.auto_reconnect = False
+
+        assert await client.receive() == b""
+        assert not client.is_connected
+
     @pytest.mark.asyncio
     async def test_receive_until_raises(self, setup):
         client, echo_server = setup
@@ -127,12 +374,24 @@ class TestAsyncTcpClient:
     @pytest.mark.asyncio
     async def test_receive_until_empty(self, setup):
         client, echo_server = setup
-        client.reader.read = mock.MagicMock(side_effect=ConnectionRefusedError)
-        data_to_send = b""
-        client.reader.read.return_value.recv.return_value = data_to_send
+        client.reader.readuntil = mock.MagicMock(side_effect=ConnectionRefusedError)
+        client.connect = mock.MagicMock()
         with pytest.raises(ClientTimeoutError):
             await client.receive_until(delimiter=b'\n', timeout=0.1)
 
+    @pytest.mark.asyncio
+    async def test_connect_max_attempts(self):
+        client = AsyncTcpClient(host="127.0.0.1", port=12346,
+                                reconnect_policy=ReconnectPolicy(initial_delay=0.01, max_attempts=3))
+        with pytest.raises(ClientSocketError):
+            await client.connect()
+
+    @pytest.mark.asyncio
+    async def test_connect_timeout(self):
+        client = AsyncTcpClient(host="127.0.0.1", port=12346)
+        with pytest.raises(ClientTimeoutError):
+            await client.connect(timeout=0.2)
+
     @pytest.mark.asyncio
     async def test_connect(self, setup):
         client, echo_server = setup
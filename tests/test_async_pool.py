@@ -0,0 +1,118 @@
+import asyncio
+
+import pytest
+from pyTCP.async_pool import AsyncTcpClientPool
+from pyTCP.client_errors import ClientError, ClientTimeoutError
+from pyTCP.server import EchoServer
+
+
+class TestAsyncTcpClientPool:
+
+    @pytest.yield_fixture
+    def event_loop(self):
+        loop = asyncio.get_event_loop()
+        loop._close = loop.close
+        loop.close = lambda: None
+        yield loop
+        loop.close = loop._close
+
+    @pytest.fixture
+    async def setup(self):
+        echo_server = EchoServer("127.0.0.1", 12345)
+        echo_server.start_server()
+        pool = AsyncTcpClientPool("127.0.0.1", 12345, min_size=1, max_size=2)
+
+        yield pool, echo_server
+        # teardown
+        pool.close()
+        echo_server.stop_server()
+
+    @pytest.mark.asyncio
+    async def test_acquire(self, setup):
+        pool, echo_server = setup
+        async with pool.acquire() as client:
+            await client.send(b"Test message\n")
+            assert await client.receive_until(delimiter=b'\n') == b"Test message"
+        assert pool.size == 1
+        assert pool.idle == 1
+
+    @pytest.mark.asyncio
+    async def test_reuses_connection(self, setup):
+        pool, echo_server = setup
+        async with pool.acquire() as client:
+            pass
+        async with pool.acquire() as other:
+            assert client is other
+
+    @pytest.mark.asyncio
+    async def test_start(self, setup):
+        pool, echo_server = setup
+        pool.min_size = 2
+        await pool.start()
+        assert pool.size == 2
+        assert pool.idle == 2
+
+    @pytest.mark.asyncio
+    async def test_acquire_timeout(self, setup):
+        pool, echo_server = setup
+        first = await pool.acquire()
+        second = await pool.acquire()
+        with pytest.raises(ClientTimeoutError):
+            await pool.acquire(timeout=0.1)
+        pool.release(first)
+        pool.release(second)
+        assert pool.idle == 2
+
+    @pytest.mark.asyncio
+    async def test_acquire_waits_for_release(self, setup):
+        pool, echo_server = setup
+        first = await pool.acquire()
+        second = await pool.acquire()
+        asyncio.get_event_loop().call_later(0.1, pool.release, first)
+        assert await pool.acquire(timeout=1) is first
+        pool.release(first)
+        pool.release(second)
+
+    @pytest.mark.asyncio
+    async def test_replaces_broken_connection(self, setup):
+        pool, echo_server = setup
+        async with pool.acquire() as client:
+            client.close()
+        assert pool.size == 0
+        async with pool.acquire() as other:
+            assert other is not client
+            assert other.is_connected
+
+    @pytest.mark.asyncio
+    async def test_closes_transport_of_lost_connection(self, setup):
+        pool, echo_server = setup
+        async with pool.acquire() as client:
+            # as after a socket error, the client is marked as disconnected but the transport is still open
+            client._connected = False
+        assert client.writer.is_closing()
+        assert pool.size == 0
+
+    @pytest.mark.asyncio
+    async def test_waiter_connects_after_broken_connection_was_released(self, setup):
+        pool, echo_server = setup
+        pool.max_size = 1
+        client = await pool.acquire()
+        waiter = asyncio.ensure_future(pool.acquire(timeout=1))
+        await asyncio.sleep(0)
+        client.close()
+        pool.release(client)
+        other = await waiter
+        assert other is not client
+        assert other.is_connected
+        pool.release(other)
+
+    @pytest.mark.asyncio
+    async def test_close(self, setup):
+        pool, echo_server = setup
+        client = await pool.acquire()
+        pool.close()
+        with pytest.raises(ClientError):
+            await pool.acquire()
+        pool.release(client)
+        assert not client.is_connected
+        assert pool.size == 0
@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+from pyTCP.async_client import AsyncTcpClient
+from pyTCP.async_server import AsyncEchoServer
+from pyTCP.client import TcpClient
+
+
+class TestAsyncEchoServer:
+
+    @pytest.yield_fixture
+    def event_loop(self):
+        loop = asyncio.get_event_loop()
+        loop._close = loop.close
+        loop.close = lambda: None
+        yield loop
+        loop.close = loop._close
+
+    @pytest.mark.timeout(2)
+    def test_start_server_in_thread(self):
+        echo_server = AsyncEchoServer("127.0.0.1", 12345)
+        echo_server.start_server()
+        client = TcpClient("127.0.0.1", port=12345)
+        client.connect()
+
+        data_to_send = b"Test message"
+        client.send(data_to_send)
+        assert client.receive() == data_to_send
+        assert echo_server.last_received == data_to_send
+
+        client.close()
+        echo_server.stop_server()
+
+    @pytest.mark.timeout(2)
+    def test_start_server_fails(self):
+        echo_server = AsyncEchoServer("127.0.0.1", 12345)
+        echo_server.start_server()
+        other = AsyncEchoServer("127.0.0.1", 12345)
+        try:
+            # reuse_address does not allow two listening sockets on the same port
+            with pytest.raises(OSError):
+                other.start_server()
+            assert not other._thread.is_alive()
+            assert other._loop.is_closed()
+        finally:
+            echo_server.stop_server()
+
+    @pytest.mark.timeout(2)
+    def test_framed(self):
+        echo_server = AsyncEchoServer("127.0.0.1", 12345, framed=True)
+        echo_server.start_server()
+        client = TcpClient("127.0.0.1", port=12345)
+        client.connect()
+
+        client.send_frame(b"Test\nmessage")
+        assert client.receive_frame() == b"Test\nmessage"
+        assert echo_server.last_received == b"Test\nmessage"
+
+        client.close()
+        echo_server.stop_server()
+
+    @pytest.mark.asyncio
+    async def test_start_in_running_loop(self):
+        echo_server = AsyncEchoServer("127.0.0.1", 12345)
+        await echo_server.start()
+        clients = [AsyncTcpClient("127.0.0.1", port=12345) for _ in range(50)]
+        await asyncio.gather(*(client.connect() for client in clients))
+
+        for i, client in enumerate(clients):
+            await client.send(b"message %d\n" % i)
+        for i, client in enumerate(clients):
+            assert await client.receive_until(delimiter=b'\n') == b"message %d" % i
+
+        await echo_server.stop()
+        for client in clients:
+            assert await client.receive() == b""
+            client.close()
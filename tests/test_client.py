@@ -5,7 +5,8 @@ from unittest import mock
 
 import pytest
 from pyTCP.client import TcpClient
-from pyTCP.client_errors import ClientTimeoutError
+from pyTCP.client_errors import ClientProtocolError, ClientSocketError, ClientTimeoutError
+from pyTCP.reconnect import ReconnectPolicy
 from pyTCP.server import EchoServer
 
 
@@ -62,7 +63,109 @@ class TcpClientTest(unittest.TestCase):
         client.send(data_to_send)
         ret = client.receive_until(bytes_to_receive=1, delimiter=b'\n')
         self.assertEqual(b"Test message", ret)
-        self.assertEqual(b"", client.buffer[0])
+        self.assertEqual(0, len(client.buffer))
+
+        echo_server.stop_server()
+        client.close()
+
+    @pytest.mark.timeout(2)
+    def test_send_and_receive_frames_with_server(self):
+        echo_server = EchoServer("127.0.0.1", 12345, framed=True)
+        echo_server.start_server()
+        client = TcpClient("127.0.0.1", port=12345)
+        client.connect()
+
+        data_to_send = b"Test\nmessage\x00" * 100000
+        client.send_frame(data_to_send)
+        client.send_frame(b"")
+        self.assertEqual(data_to_send, client.receive_frame())
+        self.assertEqual(b"", client.receive_frame())
+        # the server echoes a frame before it records it
+        while echo_server.history.count < 2:
+            time.sleep(0.01)
+        self.assertEqual(b"", echo_server.history.latest().data)
+
+        echo_server.stop_server()
+        client.close()
+
+    def test_receive_many(self):
+        self._mock_recv_into(b"first\nsecond\nthi", b"rd\n")
+        self.assertEqual([b"first", b"second"], self.client.receive_many())
+        self.assertEqual([b"third"], self.client.receive_many())
+        self.assertEqual(2, self.client.sock.recv_into.call_count)
+
+    def test_receive_many_max_frames(self):
+        self._mock_recv_into(b"first\nsecond\nthird\n")
+        self.assertEqual([b"first", b"second"], self.client.receive_many(max_frames=2))
+        self.assertEqual([b"third"], self.client.receive_many(max_frames=2))
+
+    def test_receive_many_frames(self):
+        self._mock_recv_into(b"\x00\x00\x00\x01a\x00\x00\x00\x02bc\x00")
+        self.assertEqual([b"a", b"bc"], self.client.receive_many(delimiter=None))
+
+    def test_receive_many_timeout(self):
+        self._mock_recv_into(b"first", b"")
+        with pytest.raises(ClientTimeoutError):
+            self.client.receive_many()
+
+    def test_receive_exactly(self):
+        self._mock_recv_into(b"Test", b" message", b"Hello")
+        self.assertEqual(b"Test mess", self.client.receive_exactly(9))
+        self.assertEqual(b"ageHe", self.client.receive_exactly(5))
+        self.assertEqual(b"llo", bytes(self.client.buffer))
+
+    def test_receive_frame_in_parts(self):
+        self._mock_recv_into(b"\x00\x00", b"\x00\x04Te", b"st\x00\x00")
+        self.assertEqual(b"Test", self.client.receive_frame())
+        self.assertEqual(b"\x00\x00", bytes(self.client.buffer))
+
+    def test_receive_frame_too_large(self):
+        self._mock_recv_into(b"\x00\x00\x01\x00")
+        with pytest.raises(ClientProtocolError):
+            self.client.receive_frame(max_size=255)
+
+    def test_receive_frame_timeout(self):
+        self._mock_recv_into(b"\x00\x00\x00\x04Te", b"")
+        with pytest.raises(ClientTimeoutError):
+            self.client.receive_frame()
+        self.assertEqual(6, len(self.client.buffer))
+
+    def _mock_sendmsg(self, max_bytes):
+        def sendmsg(buffers):
+            data = b''.join(buffers)[:max_bytes]
+            sent.append(data)
+            return len(data)
+        sent = []
+        self.client.sock.sendmsg.side_effect = sendmsg
+        return sent
+
+    def test_send_frame(self):
+        sent = self._mock_sendmsg(1024)
+        self.client.send_frame(b"Test")
+        self.assertEqual([b"\x00\x00\x00\x04Test"], sent)
+
+    def test_send_many(self):
+        sent = self._mock_sendmsg(1024)
+        self.client.send_many([b"Test", bytearray(b" "), memoryview(b"message")])
+        self.assertEqual([b"Test message"], sent)
+        self.assertEqual(0, self.client.sock.sendall.call_count)
+
+    def test_send_many_partial_writes(self):
+        sent = self._mock_sendmsg(3)
+        self.client.send_many([b"Test", b"", b" message"])
+        self.assertEqual(b"Test message", b''.join(sent))
+        self.assertEqual(4, self.client.sock.sendmsg.call_count)
+
+    @pytest.mark.timeout(2)
+    def test_send_many_with_server(self):
+        echo_server = EchoServer("127.0.0.1", 12345)
+        echo_server.start_server()
+        client = TcpClient("127.0.0.1", port=12345)
+        client.connect()
+
+        client.send_many([b"Test", b" ", b"message\n"] * 2000)
+        for _ in range(2000):
+            self.assertEqual(b"Test message", client.receive_until(delimiter=b'\n'))
 
         echo_server.stop_server()
         client.close()
@@ -85,12 +188,33 @@ class TcpClientTest(unittest.TestCase):
         self.client.sock.connect.assert_called_with(("127.0.0.1", 12345))
 
     def test_receive_until_empty(self):
-        data_to_send = b""
-        self.mock_socket.return_value.recv.return_value = data_to_send
+        self.mock_socket.return_value.recv_into.return_value = 0
         self.client.sock.connect.assert_called_with(("127.0.0.1", 12345))
         with pytest.raises(ClientTimeoutError):
             self.client.receive_until(delimiter=b'\n', timeout=0.1)
 
+    def _mock_recv_into(self, *chunks):
+        def recv_into(view, size):
+            chunk = next(chunks_iter)
+            view[:len(chunk)] = chunk
+            return len(chunk)
+        chunks_iter = iter(chunks)
+        self.client.sock.recv_into.side_effect = recv_into
+
+    def test_receive_until_multiple_messages_in_one_chunk(self):
+        self._mock_recv_into(b"first\nsecond\nthird\nrest")
+        self.assertEqual(b"first", self.client.receive_until(delimiter=b'\n'))
+        self.assertEqual(b"second", self.client.receive_until(delimiter=b'\n'))
+        self.assertEqual(b"third", self.client.receive_until(delimiter=b'\n'))
+        self.assertEqual(1, self.client.sock.recv_into.call_count)
+        self.assertEqual(b"rest", self.client.receive())
+
+    def test_receive_until_delimiter_split_across_chunks(self):
+        self._mock_recv_into(b"Test message\r", b"\nHello")
+        ret = self.client.receive_until(delimiter=b'\r\n')
+        self.assertEqual(b"Test message", ret)
+        self.assertEqual(b"Hello", bytes(self.client.buffer))
+
     def test_is_connected(self):
         self.assertTrue(self.client.is_connected)
         self.client.close()
@@ -148,6 +272,16 @@ class TcpClientTest(unittest.TestCase):
                 client.connect(timeout=0.6)
                 assert 2 == client.sock.connect.call_count
 
+    def test_connect_backoff(self):
+        with mock.patch('socket.socket'), mock.patch('time.sleep') as sleep:
+            client = TcpClient("127.0.0.1", port=12345,
+                               reconnect_policy=ReconnectPolicy(initial_delay=0.1, max_attempts=4, jitter=False))
+            client.sock.connect = mock.MagicMock(side_effect=socket.error)
+            with pytest.raises(ClientSocketError):
+                client.connect()
+            assert 4 == client.sock.connect.call_count
+            assert [0.1, 0.2, 0.4] == pytest.approx([call[0][0] for call in sleep.call_args_list])
+
     def test_send_returns_if_not_connected(self):
         with mock.patch('socket.socket') as _:
             client = TcpClient("127.0.0.1", port=12345)
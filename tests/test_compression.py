@@ -0,0 +1,127 @@
+import asyncio
+import zlib
+
+import pytest
+from pyTCP.async_client import AsyncTcpClient
+from pyTCP.async_server import AsyncEchoServer
+from pyTCP.client import TcpClient
+from pyTCP.client_errors import ClientProtocolError
+from pyTCP.compression import Codec, ZlibCodec
+from pyTCP.framing import encode_frame, encode_header, is_compressed, read_frame
+from pyTCP.receive_buffer import ReceiveBuffer
+from pyTCP.server import EchoServer
+
+TEXT = b"2020-01-01 00:00:00 INFO message number 1\n" * 100
+
+
+class TestZlibCodec:
+
+    def test_threshold(self):
+        codec = ZlibCodec(threshold=100)
+        assert (False, b"short") == codec.encode(b"short")
+        compressed, data = codec.encode(TEXT)
+        assert compressed
+        assert len(data) < len(TEXT)
+        assert TEXT == codec.decompress(data, len(TEXT))
+
+    def test_incompressible(self):
+        codec = ZlibCodec(threshold=0)
+        data = bytes(range(256))
+        assert (False, data) == codec.encode(data)
+
+    def test_decompressed_too_large(self):
+        codec = ZlibCodec()
+        with pytest.raises(ClientProtocolError):
+            codec.decompress(zlib.compress(b"x" * 10 ** 6), 1000)
+
+    def test_invalid(self):
+        codec = ZlibCodec()
+        with pytest.raises(ClientProtocolError):
+            codec.decompress(b"no zlib data", 1000)
+        with pytest.raises(ClientProtocolError):
+            codec.decompress(zlib.compress(TEXT)[:20], len(TEXT))
+
+    def test_trailing_data(self):
+        codec = ZlibCodec()
+        with pytest.raises(ClientProtocolError):
+            codec.decompress(zlib.compress(TEXT) + b"trailing", len(TEXT))
+
+    def test_codec_is_abstract(self):
+        with pytest.raises(TypeError):
+            Codec()
+
+    def test_read_frame(self):
+        codec = ZlibCodec()
+        header, payload = encode_frame(TEXT, codec)
+        assert is_compressed(header)
+        buffer = ReceiveBuffer()
+        buffer.extend(header + payload)
+        assert TEXT == read_frame(buffer, codec=codec)
+
+    def test_read_frame_without_codec(self):
+        buffer = ReceiveBuffer()
+        buffer.extend(encode_header(4, compressed=True) + b"Test")
+        with pytest.raises(ClientProtocolError):
+            read_frame(buffer)
+
+
+@pytest.mark.timeout(5)
+@pytest.mark.parametrize("mode", ["threaded", "selector"])
+def test_echo_server(mode):
+    echo_server = EchoServer("127.0.0.1", 12345, framed=True, mode=mode, codec=ZlibCodec(), history_size=2)
+    echo_server.start_server()
+    try:
+        client = TcpClient("127.0.0.1", port=12345, codec=ZlibCodec())
+        client.connect()
+        client.send_frame(TEXT)
+        assert TEXT == client.receive_frame()
+        client.send_frame(b"short")
+        assert b"short" == client.receive_frame()
+        # the server records the decompressed payload
+        assert TEXT == echo_server.history.messages()[0].data
+        client.close()
+    finally:
+        echo_server.stop_server()
+
+
+@pytest.mark.timeout(5)
+def test_server_without_codec_closes_connection():
+    echo_server = EchoServer("127.0.0.1", 12345, framed=True)
+    echo_server.start_server()
+    try:
+        client = TcpClient("127.0.0.1", port=12345, auto_reconnect=False, codec=ZlibCodec())
+        client.connect()
+        client.send_frame(TEXT)
+        assert b"" == client.receive()
+        client.close()
+    finally:
+        echo_server.stop_server()
+
+
+@pytest.mark.timeout(5)
+def test_async():
+    async def run():
+        server = AsyncEchoServer("127.0.0.1", 12345, framed=True, codec=ZlibCodec())
+        await server.start()
+        client = AsyncTcpClient("127.0.0.1", port=12345, codec=ZlibCodec())
+        try:
+            await client.connect()
+            await client.send_frame(TEXT)
+            first = await client.receive_frame()
+            await client.send_frame(TEXT)
+            await client.send_frame(TEXT)
+            many = await client.receive_many(delimiter=None)
+            while len(many) < 2:
+                many += await client.receive_many(delimiter=None)
+            return first, many
+        finally:
+            client.close()
+            await server.stop()
+
+    loop = asyncio.new_event_loop()
+    try:
+        first, many = loop.run_until_complete(run())
+    finally:
+        loop.close()
+    assert TEXT == first
+    assert [TEXT, TEXT] == many
@@ -0,0 +1,60 @@
+import asyncio
+import sys
+
+import pytest
+from pyTCP.event_loop import _Timeout, use_uvloop
+
+
+@pytest.fixture
+def restore_policy():
+    policy = asyncio.get_event_loop_policy()
+    yield
+    asyncio.set_event_loop_policy(policy)
+
+
+def test_use_uvloop(restore_policy):
+    uvloop = pytest.importorskip("uvloop")
+    assert use_uvloop()
+    assert isinstance(asyncio.get_event_loop_policy(), uvloop.EventLoopPolicy)
+
+
+def test_use_uvloop_not_installed(restore_policy, monkeypatch):
+    policy = asyncio.get_event_loop_policy()
+    monkeypatch.setitem(sys.modules, "uvloop", None)
+    assert not use_uvloop()
+    assert policy is asyncio.get_event_loop_policy()
+
+
+class TestTimeout:
+
+    def run(self, coroutine):
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(coroutine)
+        finally:
+            loop.close()
+
+    def test_expired(self):
+        async def wait():
+            async with _Timeout(0.01):
+                await asyncio.sleep(1)
+
+        with pytest.raises(asyncio.TimeoutError):
+            self.run(wait())
+
+    def test_not_expired(self):
+        async def wait():
+            async with _Timeout(1):
+                await asyncio.sleep(0)
+            await asyncio.sleep(0.02)
+            return True
+
+        assert self.run(wait())
+
+    def test_without_delay(self):
+        async def wait():
+            async with _Timeout(None):
+                await asyncio.sleep(0.01)
+            return True
+
+        assert self.run(wait())
@@ -0,0 +1,37 @@
+import pytest
+from pyTCP.client_errors import ClientProtocolError
+from pyTCP.framing import MAX_FRAME_SIZE, decode_header, encode_header, is_compressed, read_frame
+from pyTCP.receive_buffer import ReceiveBuffer
+
+
+class TestFraming:
+
+    def test_header_is_big_endian(self):
+        assert encode_header(258) == b"\x00\x00\x01\x02"
+        assert decode_header(b"\x00\x00\x01\x02") == 258
+
+    def test_compressed_flag(self):
+        header = encode_header(258, compressed=True)
+        assert header == b"\x80\x00\x01\x02"
+        assert decode_header(header) == 258
+        assert is_compressed(header)
+        assert not is_compressed(encode_header(MAX_FRAME_SIZE))
+
+    def test_encode_header_too_large(self):
+        with pytest.raises(ClientProtocolError):
+            encode_header(MAX_FRAME_SIZE + 1)
+
+    def test_read_frame(self):
+        buffer = ReceiveBuffer()
+        buffer.extend(encode_header(4) + b"Test" + encode_header(7) + b"mes")
+        assert read_frame(buffer) == b"Test"
+        assert read_frame(buffer) is None
+        buffer.extend(b"sage")
+        assert read_frame(buffer) == b"message"
+        assert len(buffer) == 0
+
+    def test_read_frame_too_large(self):
+        buffer = ReceiveBuffer()
+        buffer.extend(encode_header(5))
+        with pytest.raises(ClientProtocolError):
+            read_frame(buffer, max_size=4)
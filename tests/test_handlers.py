@@ -0,0 +1,142 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from pyTCP.client import TcpClient
+from pyTCP.handlers import HandlerPool
+from pyTCP.server import EchoServer
+
+
+def upper(message, address):
+    return message.upper()
+
+
+async def async_upper(message, address):
+    await asyncio.sleep(0)
+    return message.upper()
+
+
+@pytest.mark.timeout(10)
+class TestHandlerPool:
+
+    def _submit(self, pool, message):
+        done = threading.Event()
+        responses = []
+
+        def callback(response):
+            responses.append(response)
+            done.set()
+
+        assert pool.submit(message, ("127.0.0.1", 1), callback)
+        assert done.wait(5)
+        return responses[0]
+
+    def test_thread_pool(self):
+        pool = HandlerPool(upper)
+        assert b"HELLO" == self._submit(pool, b"hello")
+        pool.shutdown()
+
+    def test_process_pool(self):
+        pool = HandlerPool(upper, pool_size=1, pool="process")
+        assert b"HELLO" == self._submit(pool, b"hello")
+        pool.shutdown()
+
+    def test_coroutine_function(self):
+        pool = HandlerPool(async_upper)
+        assert b"HELLO" == self._submit(pool, b"hello")
+        pool.shutdown()
+
+    def test_shutdown_waits_for_coroutines(self):
+        async def slow_upper(message, address):
+            await asyncio.sleep(0.1)
+            return message.upper()
+
+        responses = []
+        pool = HandlerPool(slow_upper)
+        assert pool.submit(b"hello", None, responses.append)
+        pool.shutdown()
+        assert [b"HELLO"] == responses
+        assert 0 == pool.pending
+
+    def test_shed(self):
+        release = threading.Event()
+        pool = HandlerPool(lambda message, address: release.wait(), pool_size=1, queue_depth=2)
+        assert pool.submit(b"1", None, lambda response: None)
+        assert pool.submit(b"2", None, lambda response: None)
+        assert not pool.submit(b"3", None, lambda response: None)
+        assert 1 == pool.shed
+        assert 2 == pool.pending
+        release.set()
+        pool.shutdown()
+        assert 0 == pool.pending
+
+    def test_invalid_pool(self):
+        with pytest.raises(ValueError):
+            HandlerPool(upper, pool="unknown")
+        with pytest.raises(ValueError):
+            HandlerPool(async_upper, pool="process")
+
+
+@pytest.mark.timeout(10)
+@pytest.mark.parametrize("mode", ["threaded", "selector"])
+class TestServerHandler:
+
+    def _serve(self, mode, handler, **kwargs):
+        echo_server = EchoServer("127.0.0.1", 12345, mode=mode, handler=handler, **kwargs)
+        echo_server.start_server()
+        client = TcpClient("127.0.0.1", port=12345)
+        client.connect()
+        return echo_server, client
+
+    def test_response(self, mode):
+        echo_server, client = self._serve(mode, upper)
+        try:
+            client.send(b"Test message")
+            assert b"TEST MESSAGE" == client.receive()
+            assert b"Test message" == echo_server.last_received
+        finally:
+            client.close()
+            echo_server.stop_server()
+
+    def test_async_framed(self, mode):
+        echo_server, client = self._serve(mode, async_upper, framed=True)
+        try:
+            client.send_frame(b"Test\nmessage")
+            assert b"TEST\nMESSAGE" == client.receive_frame()
+        finally:
+            client.close()
+            echo_server.stop_server()
+
+    def test_no_response(self, mode):
+        echo_server, client = self._serve(mode, lambda message, address: None if message == b"skip" else message,
+                                          framed=True)
+        try:
+            client.send_frame(b"skip")
+            client.send_frame(b"Hello")
+            assert b"Hello" == client.receive_frame()
+        finally:
+            client.close()
+            echo_server.stop_server()
+
+    def test_shed(self, mode):
+        release = threading.Event()
+
+        def handler(message, address):
+            release.wait()
+            return message
+
+        echo_server, client = self._serve(mode, handler, framed=True, handler_pool_size=1, queue_depth=1)
+        try:
+            client.send_frame(b"first")
+            client.send_frame(b"second")
+            deadline = time.monotonic() + 2
+            while echo_server.stats["shed"] < 1 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert {"messages": 2, "bytes": 11, "shed": 1} == echo_server.stats
+            release.set()
+            assert b"first" == client.receive_frame()
+        finally:
+            release.set()
+            client.close()
+            echo_server.stop_server()
@@ -0,0 +1,106 @@
+import threading
+
+import pytest
+from pyTCP.client import TcpClient
+from pyTCP.history import MessageHistory
+from pyTCP.server import EchoServer
+
+
+class TestMessageHistory:
+
+    def test_empty(self):
+        history = MessageHistory(3)
+        assert 0 == len(history)
+        assert history.latest() is None
+        assert history.get(timeout=0.01) is None
+        assert [] == history.messages()
+
+    def test_ring(self):
+        history = MessageHistory(3)
+        for i in range(5):
+            history.append(b"%d" % i, ("127.0.0.1", i), timestamp=float(i))
+        assert 3 == len(history)
+        assert [b"2", b"3", b"4"] == [message.data for message in history.messages()]
+        assert (b"4", ("127.0.0.1", 4), 4.0) == history.latest()
+
+    def test_messages_since(self):
+        history = MessageHistory(3)
+        for i in range(5):
+            history.append(b"%d" % i)
+        assert 5 == history.count
+        messages, count = history.messages_since(3)
+        assert [b"3", b"4"] == [message.data for message in messages]
+        assert 5 == count
+        # the overwritten messages are skipped
+        assert [b"2", b"3", b"4"] == [message.data for message in history.messages_since(1)[0]]
+        history.append(b"5")
+        assert ([history.latest()], 6) == history.messages_since(count)
+
+    def test_get_consumes(self):
+        history = MessageHistory()
+        history.append(b"first")
+        history.append(b"second")
+        assert b"second" == history.get(timeout=0.01).data
+        assert history.get(timeout=0.01) is None
+        assert b"second" == history.latest().data
+
+    def test_get_waits(self):
+        history = MessageHistory()
+        timer = threading.Timer(0.05, history.append, (b"late",))
+        timer.start()
+        assert b"late" == history.get(timeout=2).data
+        timer.join()
+
+    def test_clear(self):
+        history = MessageHistory(2)
+        history.append(b"message")
+        history.clear()
+        assert 0 == len(history)
+        assert history.latest() is None
+
+    def test_invalid_capacity(self):
+        with pytest.raises(ValueError):
+            MessageHistory(0)
+
+
+@pytest.mark.timeout(5)
+@pytest.mark.parametrize("mode", ["threaded", "selector"])
+class TestServerHistory:
+
+    def test_connection_tag(self, mode):
+        echo_server = EchoServer("127.0.0.1", 12345, mode=mode, history_size=10)
+        echo_server.start_server()
+        client = TcpClient("127.0.0.1", port=12345)
+        client.connect()
+        try:
+            client.send(b"Test message")
+            assert b"Test message" == client.receive()
+            message = echo_server.history.get(timeout=1)
+            assert b"Test message" == message.data
+            assert client.sock.getsockname() == message.connection
+        finally:
+            client.close()
+            echo_server.stop_server()
+
+    def test_disabled(self, mode):
+        echo_server = EchoServer("127.0.0.1", 12345, mode=mode, history_size=0)
+        echo_server.start_server()
+        client = TcpClient("127.0.0.1", port=12345)
+        client.connect()
+        try:
+            client.send(b"Test message")
+            assert b"Test message" == client.receive()
+            assert echo_server.history is None
+            assert echo_server.last_received is None
+        finally:
+            client.close()
+            echo_server.stop_server()
+
+    def test_last_received_timeout(self, mode):
+        echo_server = EchoServer("127.0.0.1", 12345, mode=mode)
+        echo_server.last_received_timeout = 0.05
+        echo_server.start_server()
+        try:
+            assert echo_server.last_received is None
+        finally:
+            echo_server.stop_server()
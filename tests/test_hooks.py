@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+from pyTCP.async_client import AsyncTcpClient
+from pyTCP.async_server import AsyncEchoServer
+from pyTCP.client import TcpClient
+from pyTCP.client_errors import ClientTimeoutError
+from pyTCP.server import EchoServer
+
+
+class Recorder:
+
+    def __init__(self, client):
+        self.calls = []
+        for name in ("on_send", "on_receive", "on_connect", "on_reconnect", "on_timeout"):
+            setattr(client, name, self.hook(name))
+
+    def hook(self, name):
+        return lambda *args: self.calls.append((name,) + args)
+
+    def named(self, name):
+        return [call[1:] for call in self.calls if call[0] == name]
+
+
+@pytest.mark.timeout(5)
+class TestClientHooks:
+
+    @pytest.fixture
+    def echo_server(self):
+        echo_server = EchoServer("127.0.0.1", 12345, history_size=0)
+        echo_server.start_server()
+        yield echo_server
+        echo_server.stop_server()
+
+    def test_sync(self, echo_server):
+        client = TcpClient("127.0.0.1", port=12345)
+        recorder = Recorder(client)
+        client.connect()
+        client.send(b"Test\n")
+        assert b"Test" == client.receive_until(delimiter=b'\n')
+        client.send_frame(b"frame")
+        assert b"frame" == client.receive_frame()
+        client.close()
+
+        (duration, attempts), = recorder.named("on_connect")
+        assert duration >= 0
+        assert 1 == attempts
+        assert [5, 9] == [size for size, _ in recorder.named("on_send")]
+        assert [4, 5] == [size for size, _ in recorder.named("on_receive")]
+        assert all(duration >= 0 for _, duration in recorder.named("on_receive"))
+        assert [] == recorder.named("on_timeout")
+
+    def test_sync_reconnect(self, echo_server):
+        client = TcpClient("127.0.0.1", port=12345)
+        recorder = Recorder(client)
+        client.connect()
+        client.sock.close()
+        client.send(b"Test\n")
+        client.close()
+
+        (error,), = recorder.named("on_reconnect")
+        assert isinstance(error, OSError)
+        assert 2 == len(recorder.named("on_connect"))
+
+    def test_async(self, echo_server):
+        async def run():
+            client = AsyncTcpClient("127.0.0.1", port=12345)
+            recorder = Recorder(client)
+            await client.connect()
+            await client.send(b"Test\n")
+            assert b"Test" == await client.receive_until(delimiter=b'\n')
+            await client.send_frame(b"frame")
+            assert b"frame" == await client.receive_frame()
+            with pytest.raises(ClientTimeoutError):
+                await client.receive_until(delimiter=b'\n', timeout=0.05)
+            client.close()
+            return recorder
+
+        loop = asyncio.new_event_loop()
+        try:
+            recorder = loop.run_until_complete(run())
+        finally:
+            loop.close()
+        assert 1 == len(recorder.named("on_connect"))
+        assert [5, 9] == [size for size, _ in recorder.named("on_send")]
+        assert [4, 5] == [size for size, _ in recorder.named("on_receive")]
+        (operation, waited), = recorder.named("on_timeout")
+        assert "receive_until" == operation
+        assert waited >= 0.05
+
+
+@pytest.mark.timeout(5)
+@pytest.mark.parametrize("mode", ["threaded", "selector", "async"])
+def test_server_hooks(mode):
+    calls = []
+    if mode == "async":
+        echo_server = AsyncEchoServer("127.0.0.1", 12345, framed=True)
+    else:
+        echo_server = EchoServer("127.0.0.1", 12345, framed=True, mode=mode)
+    echo_server.on_connect = lambda address: calls.append(("connect", address))
+    echo_server.on_receive = lambda size, address: calls.append(("receive", size, address))
+    echo_server.on_send = lambda size, duration, address: calls.append(("send", size, address))
+    echo_server.start_server()
+    try:
+        client = TcpClient("127.0.0.1", port=12345)
+        client.connect()
+        client.send_frame(b"frame")
+        assert b"frame" == client.receive_frame()
+        address = client.sock.getsockname()
+        client.close()
+    finally:
+        echo_server.stop_server()
+    assert [("connect", address), ("receive", 5, address), ("send", 9, address)] == calls
@@ -0,0 +1,114 @@
+import asyncio
+
+import pytest
+from pyTCP.async_client import AsyncTcpClient
+from pyTCP.client import TcpClient
+from pyTCP.client_errors import ClientTimeoutError
+from pyTCP.metrics import ClientMetrics, Histogram
+from pyTCP.server import EchoServer
+
+
+class TestHistogram:
+
+    def test_empty(self):
+        histogram = Histogram()
+        assert 0.0 == histogram.percentile(0.5)
+        assert {"count": 0, "sum": 0.0, "mean": 0.0, "max": 0.0, "p50": 0.0, "p99": 0.0,
+                "buckets": {}} == histogram.snapshot()
+
+    def test_record(self):
+        histogram = Histogram()
+        for seconds in (0.000001, 0.000003, 0.000003, 0.001):
+            histogram.record(seconds)
+        snapshot = histogram.snapshot()
+        assert 4 == snapshot["count"]
+        assert 0.001 == snapshot["max"]
+        assert {1: 1, 3: 2, 1023: 1} == snapshot["buckets"]
+        assert 0.000003 == histogram.percentile(0.5)
+        assert 0.001 == histogram.percentile(1.0)
+
+
+class TestClientMetrics:
+
+    def test_export(self):
+        exported = []
+        metrics = ClientMetrics(exporter=exported.append)
+        metrics.sent(10)
+        metrics.received(4)
+        metrics.buffered(4)
+        metrics.buffered(2)
+        metrics.export()
+        assert 1 == len(exported)
+        assert 10 == exported[0]["bytes_sent"]
+        assert 1 == exported[0]["send_calls"]
+        assert 4 == exported[0]["bytes_received"]
+        assert 4 == exported[0]["buffer_high_water"]
+
+    def test_no_exporter(self):
+        ClientMetrics().export()
+
+
+@pytest.mark.timeout(5)
+class TestClientStats:
+
+    @pytest.fixture
+    def echo_server(self):
+        echo_server = EchoServer("127.0.0.1", 12345, history_size=0)
+        echo_server.start_server()
+        yield echo_server
+        echo_server.stop_server()
+
+    def test_without_metrics(self, echo_server):
+        client = TcpClient("127.0.0.1", port=12345)
+        assert {} == client.stats()
+
+    def test_sync(self, echo_server):
+        exported = []
+        client = TcpClient("127.0.0.1", port=12345, metrics=ClientMetrics(exporter=exported.append))
+        client.connect()
+        client.send(b"Test\n")
+        assert b"Test" == client.receive_until(delimiter=b'\n')
+        client.send_frame(b"frame")
+        assert b"frame" == client.receive_frame()
+        client.send(b"chunk")
+        assert b"chunk" == client.receive()
+        stats = client.stats()
+        assert 1 == stats["connects"]
+        assert 1 == stats["connect_time"]["count"]
+        assert 3 == stats["messages_sent"]
+        assert 19 == stats["bytes_sent"]
+        assert 2 == stats["messages_received"]
+        assert 19 == stats["bytes_received"]
+        assert stats["receive_calls"] >= 3
+        assert 1 == stats["receive_wait"]["count"]
+        assert stats["buffer_high_water"] >= 5
+        client.close()
+        assert 1 == len(exported)
+
+    def test_async(self, echo_server):
+        async def run():
+            client = AsyncTcpClient("127.0.0.1", port=12345, metrics=ClientMetrics())
+            await client.connect()
+            await client.send(b"Test\n")
+            assert b"Test" == await client.receive_until(delimiter=b'\n')
+            await client.send_frame(b"frame")
+            assert b"frame" == await client.receive_frame()
+            with pytest.raises(ClientTimeoutError):
+                await client.receive_until(delimiter=b'\n', timeout=0.05)
+            stats = client.stats()
+            client.close()
+            return stats
+
+        loop = asyncio.new_event_loop()
+        try:
+            stats = loop.run_until_complete(run())
+        finally:
+            loop.close()
+        assert 1 == stats["connects"]
+        assert 2 == stats["messages_sent"]
+        assert 14 == stats["bytes_sent"]
+        assert 2 == stats["send_calls"]
+        assert 2 == stats["messages_received"]
+        assert 14 == stats["bytes_received"]
+        assert 1 == stats["receive_wait"]["count"]
+        assert 1 == stats["timeouts"]
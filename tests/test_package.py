@@ -0,0 +1,45 @@
+import os
+import subprocess
+import sys
+
+import pyTCP
+import pytest
+
+
+def run_isolated(statement):
+    env = dict(os.environ)
+    src = os.path.dirname(os.path.dirname(os.path.abspath(pyTCP.__file__)))
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [src, env.get("PYTHONPATH")]))
+    return subprocess.run([sys.executable, "-c", statement], env=env, stdout=subprocess.PIPE,
+                          universal_newlines=True, check=True).stdout.strip()
+
+
+def test_sync_client_does_not_import_asyncio():
+    output = run_isolated("import sys\n"
+                          "from pyTCP import TcpClient\n"
+                          "print(sorted({'asyncio', 'async_timeout', 'pkg_resources'} & set(sys.modules)))")
+    assert "[]" == output
+
+
+def test_echo_server_does_not_import_asyncio():
+    output = run_isolated("import sys\n"
+                          "from pyTCP import EchoServer\n"
+                          "server = EchoServer('127.0.0.1', 0, handler=lambda message, address: message)\n"
+                          "server.handler_pool = server._create_handler_pool()\n"
+                          "server.handler_pool.shutdown()\n"
+                          "print(sorted({'asyncio', 'async_timeout', 'pkg_resources'} & set(sys.modules)))")
+    assert "[]" == output
+
+
+def test_lazy_exports():
+    assert set(pyTCP.__all__) <= set(dir(pyTCP))
+    for name in pyTCP.__all__:
+        assert getattr(pyTCP, name) is not None
+    from pyTCP.client import TcpClient
+    assert TcpClient is pyTCP.TcpClient
+    assert isinstance(pyTCP.__version__, str)
+
+
+def test_unknown_attribute():
+    with pytest.raises(AttributeError):
+        pyTCP.NoSuchName
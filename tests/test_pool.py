@@ -0,0 +1,136 @@
+import socket
+import threading
+import time
+import unittest
+
+import pytest
+from pyTCP.client_errors import ClientError, ClientTimeoutError
+from pyTCP.pool import TcpClientPool
+from pyTCP.server import EchoServer
+
+
+@pytest.mark.timeout(5)
+class TcpClientPoolTest(unittest.TestCase):
+
+    def setUp(self):
+        self.echo_server = EchoServer("127.0.0.1", 12345)
+        self.echo_server.start_server()
+        self.pool = TcpClientPool("127.0.0.1", 12345, min_size=1, max_size=2)
+
+    def tearDown(self):
+        self.pool.close()
+        self.echo_server.stop_server()
+
+    def test_connection(self):
+        with self.pool.connection() as client:
+            client.send(b"Test message\n")
+            self.assertEqual(b"Test message", client.receive_until(delimiter=b'\n'))
+        self.assertEqual(1, self.pool.size)
+        self.assertEqual(1, self.pool.idle)
+
+    def test_reuses_connection(self):
+        with self.pool.connection() as client:
+            pass
+        with self.pool.connection() as other:
+            self.assertIs(client, other)
+        self.assertEqual(1, self.pool.size)
+
+    def test_fill(self):
+        self.pool.min_size = 2
+        self.pool.fill()
+        self.assertEqual(2, self.pool.size)
+        self.assertEqual(2, self.pool.idle)
+
+    def test_acquire_timeout(self):
+        first = self.pool.acquire()
+        second = self.pool.acquire()
+        self.assertIsNot(first, second)
+        with pytest.raises(ClientTimeoutError):
+            self.pool.acquire(timeout=0.1)
+        self.pool.release(first)
+        self.assertIs(first, self.pool.acquire(timeout=0.1))
+        self.pool.release(first)
+        self.pool.release(second)
+
+    def test_acquire_waits_for_release(self):
+        first = self.pool.acquire()
+        second = self.pool.acquire()
+        threading.Timer(0.1, self.pool.release, (first,)).start()
+        self.assertIs(first, self.pool.acquire(timeout=1))
+        self.pool.release(first)
+        self.pool.release(second)
+
+    def test_replaces_broken_connection(self):
+        with self.pool.connection() as client:
+            client.close()
+        self.assertEqual(0, self.pool.size)
+        with self.pool.connection() as other:
+            self.assertIsNot(client, other)
+            self.assertTrue(other.is_connected)
+
+    def test_closes_socket_of_lost_connection(self):
+        with self.pool.connection() as client:
+            # as after a socket error, the client is marked as disconnected but the socket is still open
+            client._connected = False
+        self.assertEqual(-1, client.sock.fileno())
+        self.assertEqual(0, self.pool.size)
+
+    def test_health_check_drops_connection_with_pending_data(self):
+        with self.pool.connection() as client:
+            client.send(b"unread response")
+            time.sleep(0.1)
+        with self.pool.connection() as other:
+            self.assertIsNot(client, other)
+        self.assertFalse(client.is_connected)
+
+    def test_idle_eviction(self):
+        self.pool.idle_timeout = 0.05
+        first = self.pool.acquire()
+        second = self.pool.acquire()
+        self.pool.release(first)
+        self.pool.release(second)
+        time.sleep(0.1)
+        with self.pool.connection():
+            pass
+        self.assertEqual(1, self.pool.size)
+
+    def test_max_lifetime(self):
+        self.pool.max_lifetime = 0
+        with self.pool.connection() as client:
+            pass
+        self.assertFalse(client.is_connected)
+        self.assertEqual(0, self.pool.size)
+
+    def test_close(self):
+        client = self.pool.acquire()
+        self.pool.close()
+        with pytest.raises(ClientError):
+            self.pool.acquire()
+        self.pool.release(client)
+        self.assertFalse(client.is_connected)
+        self.assertEqual(0, self.pool.size)
+
+
+@pytest.mark.timeout(5)
+def test_health_check_with_high_file_descriptors():
+    # select only accepts file descriptors below FD_SETSIZE, usually 1024
+    resource = pytest.importorskip("resource")
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if hard != resource.RLIM_INFINITY and hard < 1200:
+        pytest.skip("the file descriptor limit is too low")
+    resource.setrlimit(resource.RLIMIT_NOFILE, (max(soft, 1200), hard))
+    fillers = [socket.socket() for _ in range(1100)]
+    echo_server = EchoServer("127.0.0.1", 12345)
+    echo_server.start_server()
+    pool = TcpClientPool("127.0.0.1", 12345)
+    try:
+        with pool.connection() as client:
+            assert client.sock.fileno() >= 1024
+        with pool.connection() as other:
+            assert other is client
+    finally:
+        pool.close()
+        echo_server.stop_server()
+        for filler in fillers:
+            filler.close()
+        resource.setrlimit(resource.RLIMIT_NOFILE, (soft, hard))
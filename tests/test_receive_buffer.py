@@ -0,0 +1,61 @@
+from pyTCP.receive_buffer import ReceiveBuffer
+
+
+class TestReceiveBuffer:
+
+    def test_extend_and_read(self):
+        buffer = ReceiveBuffer(capacity=8)
+        buffer.extend(b"Test")
+        assert len(buffer) == 4
+        assert buffer.read(2) == b"Te"
+        assert buffer.read() == b"st"
+        assert len(buffer) == 0
+
+    def test_reserve_and_commit(self):
+        buffer = ReceiveBuffer(capacity=8)
+        view = buffer.reserve(4)
+        view[:4] = b"Test"
+        buffer.commit(4)
+        assert bytes(buffer) == b"Test"
+
+    def test_grows_if_full(self):
+        buffer = ReceiveBuffer(capacity=4)
+        buffer.extend(b"Test")
+        buffer.extend(b" message")
+        assert buffer.capacity >= 12
+        assert bytes(buffer) == b"Test message"
+
+    def test_reuses_consumed_space(self):
+        buffer = ReceiveBuffer(capacity=8)
+        buffer.extend(b"abcdefg")
+        buffer.skip(6)
+        buffer.extend(b"hijklmn")
+        assert buffer.capacity == 8
+        assert bytes(buffer) == b"ghijklmn"
+
+    def test_find(self):
+        buffer = ReceiveBuffer()
+        buffer.extend(b"Test\nmessage\n")
+        assert buffer.find(b"\n") == 4
+        buffer.skip(5)
+        assert buffer.find(b"\n") == 7
+
+    def test_find_resumes_search(self):
+        buffer = ReceiveBuffer()
+        buffer.extend(b"Test message\r")
+        assert buffer.find(b"\r\n") == -1
+        buffer.extend(b"\nHello")
+        assert buffer.find(b"\r\n") == 12
+
+    def test_find_after_delimiter_changed(self):
+        buffer = ReceiveBuffer()
+        buffer.extend(b"Test;message")
+        assert buffer.find(b"\n") == -1
+        assert buffer.find(b";") == 4
+
+    def test_peek_does_not_consume(self):
+        buffer = ReceiveBuffer()
+        buffer.extend(b"Test")
+        assert bytes(buffer.peek(2)) == b"Te"
+        assert bytes(buffer.peek(10)) == b"Test"
+        assert len(buffer) == 4
@@ -0,0 +1,31 @@
+import pytest
+from pyTCP.reconnect import ReconnectPolicy
+
+
+class TestReconnectPolicy:
+
+    def test_exponential(self):
+        policy = ReconnectPolicy(initial_delay=0.1, max_delay=1.0, jitter=False)
+        assert [0.1, 0.2, 0.4, 0.8, 1.0, 1.0] == pytest.approx([policy.delay(attempt) for attempt in range(1, 7)])
+
+    def test_large_attempt(self):
+        policy = ReconnectPolicy(max_delay=5.0, jitter=False)
+        assert 5.0 == policy.delay(10000)
+
+    def test_jitter(self):
+        policy = ReconnectPolicy(initial_delay=1.0, max_delay=1.0)
+        delays = [policy.delay(1) for _ in range(100)]
+        assert all(0 <= delay <= 1.0 for delay in delays)
+        assert len(set(delays)) > 1
+
+    def test_max_attempts(self):
+        assert ReconnectPolicy().should_retry(1000)
+        policy = ReconnectPolicy(max_attempts=3)
+        assert policy.should_retry(2)
+        assert not policy.should_retry(3)
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            ReconnectPolicy(initial_delay=-1)
+        with pytest.raises(ValueError):
+            ReconnectPolicy(max_attempts=0)
@@ -0,0 +1,136 @@
+import asyncio
+import socket
+import tempfile
+from unittest import mock
+
+import pytest
+from pyTCP import event_loop
+from pyTCP.async_client import AsyncTcpClient
+from pyTCP.client import TcpClient
+from pyTCP.metrics import ClientMetrics
+from pyTCP.server import EchoServer
+
+CONTENT = bytes(range(256)) * 400
+
+
+@pytest.fixture
+def content_file():
+    with tempfile.TemporaryFile() as f:
+        f.write(CONTENT)
+        f.flush()
+        yield f
+
+
+@pytest.fixture
+def echo_server():
+    echo_server = EchoServer("127.0.0.1", 12345, receive_bytes=2 ** 16, history_size=0)
+    echo_server.start_server()
+    yield echo_server
+    echo_server.stop_server()
+
+
+@pytest.mark.timeout(5)
+class TestSendFile:
+
+    def test_sync(self, echo_server, content_file):
+        client = TcpClient("127.0.0.1", port=12345, metrics=ClientMetrics())
+        client.connect()
+        client.send(b"head")
+        assert len(CONTENT) == client.send_file(content_file)
+        assert b"head" + CONTENT == client.receive_exactly(4 + len(CONTENT))
+        assert 4 + len(CONTENT) == client.stats()["bytes_sent"]
+        client.close()
+
+    def test_sync_range(self, echo_server, content_file):
+        client = TcpClient("127.0.0.1", port=12345)
+        client.connect()
+        assert 1000 == client.send_file(content_file, offset=10, count=1000)
+        assert CONTENT[10:1010] == client.receive_exactly(1000)
+        assert 1010 == content_file.tell()
+        client.close()
+
+    def test_sync_connection_lost(self, echo_server, content_file):
+        def sendfile(sock, fileobj, offset=0, count=None):
+            fileobj.seek(offset + 1000)
+            raise ConnectionResetError
+
+        client = TcpClient("127.0.0.1", port=12345)
+        client.connect()
+        client.auto_reconnect = False
+        with mock.patch.object(socket.socket, "sendfile", sendfile):
+            assert 1000 == client.send_file(content_file, offset=10)
+        assert not client.is_connected
+
+    def test_not_connected(self, content_file):
+        client = TcpClient("127.0.0.1", port=12345)
+        assert 0 == client.send_file(content_file)
+
+    def test_async(self, echo_server, content_file):
+        async def run():
+            client = AsyncTcpClient("127.0.0.1", port=12345, coalesce=True)
+            await client.connect()
+            try:
+                await client.send(b"head")
+                sent = await client.send_file(content_file, offset=256)
+                return sent, await client.receive_exactly(4 + sent, timeout=2)
+            finally:
+                client.close()
+
+        loop = asyncio.new_event_loop()
+        try:
+            sent, data = loop.run_until_complete(run())
+        finally:
+            loop.close()
+        assert len(CONTENT) - 256 == sent
+        assert b"head" + CONTENT[256:] == data
+
+    def test_async_connection_lost(self, echo_server, content_file):
+        async def run():
+            client = AsyncTcpClient("127.0.0.1", port=12345)
+            await client.connect()
+            client.auto_reconnect = False
+            # the chunked fallback, the first chunk is written and the connection is lost on the second
+            loop = mock.MagicMock()
+            loop.sendfile = mock.AsyncMock(side_effect=NotImplementedError)
+            client.writer.write = mock.MagicMock(side_effect=[None, ConnectionResetError])
+            try:
+                with mock.patch.object(event_loop, "get_running_loop", return_value=loop):
+                    return await client.send_file(content_file), client.is_connected
+            finally:
+                client.writer.close()
+
+        loop = asyncio.new_event_loop()
+        try:
+            sent, connected = loop.run_until_complete(run())
+        finally:
+            loop.close()
+        assert 2 ** 16 == sent
+        assert 2 ** 16 == content_file.tell()
+        assert not connected
+
+    def test_async_drain_fails_before_transfer(self, echo_server, content_file):
+        async def run():
+            client = AsyncTcpClient("127.0.0.1", port=12345)
+            await client.connect()
+            client.auto_reconnect = False
+            client.writer.drain = mock.AsyncMock(side_effect=ConnectionResetError)
+            try:
+                return await client.send_file(content_file, offset=100)
+            finally:
+                client.writer.close()
+
+        content_file.seek(0)
+        loop = asyncio.new_event_loop()
+        try:
+            assert 0 == loop.run_until_complete(run())
+        finally:
+            loop.close()
+
+    def test_sync_fails_before_transfer(self, echo_server, content_file):
+        client = TcpClient("127.0.0.1", port=12345)
+        client.connect()
+        client.auto_reconnect = False
+        content_file.seek(5000)
+        with mock.patch.object(socket.socket, "sendfile", side_effect=ConnectionResetError):
+            assert 0 == client.send_file(content_file, offset=100)
+        client.sock.close()
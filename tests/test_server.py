@@ -0,0 +1,143 @@
+import socket
+import time
+import unittest
+
+import pytest
+from pyTCP.client import TcpClient
+from pyTCP.server import EchoServer
+
+
+@pytest.mark.timeout(5)
+class SelectorEchoServerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.echo_server = EchoServer("127.0.0.1", 12345, mode="selector")
+        self.echo_server.start_server()
+        self.client = TcpClient("127.0.0.1", port=12345)
+        self.client.connect()
+
+    def tearDown(self):
+        self.client.close()
+        self.echo_server.stop_server()
+
+    def test_echo(self):
+        data_to_send = b"Test message"
+        self.client.send(data_to_send)
+        self.assertEqual(data_to_send, self.client.receive())
+        self.assertEqual(data_to_send, self.echo_server.last_received)
+
+    def test_many_clients(self):
+        clients = [TcpClient("127.0.0.1", port=12345) for _ in range(50)]
+        for i, client in enumerate(clients):
+            client.connect()
+            client.send(b"message %d\n" % i)
+        for i, client in enumerate(clients):
+            self.assertEqual(b"message %d" % i, client.receive_until(delimiter=b'\n'))
+            client.close()
+
+    def test_slow_reader(self):
+        self.echo_server.server.max_pending = 16
+        data_to_send = bytes(range(256)) * 4096
+        self.client.send(data_to_send)
+        self.assertEqual(data_to_send, self.client.receive_exactly(len(data_to_send), timeout=4))
+
+    def test_client_closes_connection(self):
+        self.client.send(b"Test message")
+        self.client.receive()
+        self.client.close()
+        other = TcpClient("127.0.0.1", port=12345)
+        other.connect()
+        other.send(b"Hello")
+        self.assertEqual(b"Hello", other.receive())
+        other.close()
+        deadline = time.monotonic() + 1
+        while self.echo_server.server.connections and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(0, len(self.echo_server.server.connections))
+
+    def test_framed(self):
+        self.echo_server.framed = True
+        other = TcpClient("127.0.0.1", port=12345)
+        other.connect()
+        other.send_frame(b"Test\nmessage")
+        self.assertEqual(b"Test\nmessage", other.receive_frame())
+        other.close()
+
+    def test_unknown_mode(self):
+        with pytest.raises(ValueError):
+            EchoServer("127.0.0.1", 12346, mode="unknown")
+
+
+@pytest.mark.timeout(10)
+class WorkersEchoServerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.echo_server = EchoServer("127.0.0.1", 12345, mode="selector", workers=2)
+        self.echo_server.start_server()
+
+    def tearDown(self):
+        self.echo_server.stop_server()
+
+    def test_echo(self):
+        client = TcpClient("127.0.0.1", port=12345)
+        client.connect()
+        client.send(b"Test message")
+        self.assertEqual(b"Test message", client.receive())
+        self.assertEqual(b"Test message", self.echo_server.last_received)
+        client.close()
+
+    def test_stats(self):
+        clients = [TcpClient("127.0.0.1", port=12345) for _ in range(20)]
+        for i, client in enumerate(clients):
+            client.connect()
+            client.send(b"message %d\n" % i)
+        for i, client in enumerate(clients):
+            self.assertEqual(b"message %d" % i, client.receive_until(delimiter=b'\n'))
+            client.close()
+        deadline = time.monotonic() + 1
+        while self.echo_server.stats["messages"] < 20 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual({"messages": 20, "bytes": sum(len(b"message %d\n" % i) for i in range(20)), "shed": 0},
+                         self.echo_server.stats)
+
+    def test_port_in_use(self):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.bind(("127.0.0.1", 12346))
+        other = EchoServer("127.0.0.1", 12346, workers=2)
+        try:
+            with pytest.raises(OSError):
+                other.start_server()
+        finally:
+            sock.close()
+
+    def test_invalid_workers(self):
+        with pytest.raises(ValueError):
+            EchoServer("127.0.0.1", 12346, workers=0)
+
+
+@pytest.mark.timeout(5)
+class ThreadedEchoServerTest(unittest.TestCase):
+
+    def test_stop_with_idle_connection(self):
+        echo_server = EchoServer("127.0.0.1", 12345)
+        echo_server.start_server()
+        client = TcpClient("127.0.0.1", port=12345)
+        client.connect()
+        client.send(b"Test message")
+        self.assertEqual(b"Test message", client.receive())
+        start = time.monotonic()
+        echo_server.stop_server()
+        self.assertLess(time.monotonic() - start, 0.5)
+        client.close()
+
+    def test_client_closes_connection(self):
+        echo_server = EchoServer("127.0.0.1", 12345, history_size=10)
+        echo_server.start_server()
+        client = TcpClient("127.0.0.1", port=12345)
+        client.connect()
+        client.send(b"Test message")
+        self.assertEqual(b"Test message", client.receive())
+        client.close()
+        time.sleep(0.1)
+        self.assertEqual([b"Test message"], [message.data for message in echo_server.history.messages()])
+        echo_server.stop_server()
@@ -0,0 +1,136 @@
+import asyncio
+import socket
+
+import pytest
+from pyTCP.async_client import AsyncTcpClient
+from pyTCP.async_server import AsyncEchoServer
+from pyTCP.client import TcpClient
+from pyTCP.server import EchoServer
+from pyTCP.socket_options import SocketOptions
+
+
+def _get(sock, level, option):
+    return sock.getsockopt(level, option)
+
+
+class TestSocketOptions:
+
+    def test_apply(self):
+        options = SocketOptions(nodelay=True, receive_buffer=2 ** 16, keepalive=True, keepalive_idle=30,
+                                keepalive_interval=5, keepalive_count=3, user_timeout=1000)
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            options.apply(sock)
+            assert _get(sock, socket.IPPROTO_TCP, socket.TCP_NODELAY)
+            assert _get(sock, socket.SOL_SOCKET, socket.SO_KEEPALIVE)
+            # linux doubles the requested buffer size
+            assert _get(sock, socket.SOL_SOCKET, socket.SO_RCVBUF) >= 2 ** 16
+            if hasattr(socket, "TCP_KEEPIDLE"):
+                assert 30 == _get(sock, socket.IPPROTO_TCP, socket.TCP_KEEPIDLE)
+                assert 5 == _get(sock, socket.IPPROTO_TCP, socket.TCP_KEEPINTVL)
+                assert 3 == _get(sock, socket.IPPROTO_TCP, socket.TCP_KEEPCNT)
+            if hasattr(socket, "TCP_USER_TIMEOUT"):
+                assert 1000 == _get(sock, socket.IPPROTO_TCP, socket.TCP_USER_TIMEOUT)
+        finally:
+            sock.close()
+
+    def test_defaults_unchanged(self):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            SocketOptions().apply(sock)
+            assert not _get(sock, socket.IPPROTO_TCP, socket.TCP_NODELAY)
+            assert not _get(sock, socket.SOL_SOCKET, socket.SO_KEEPALIVE)
+        finally:
+            sock.close()
+
+
+def _record_applied(options):
+    # returns the list of the sockets the options are applied to
+    applied = []
+    apply = options.apply
+
+    def record(sock):
+        apply(sock)
+        applied.append(sock)
+
+    options.apply = record
+    return applied
+
+
+def _accepted(applied, client_address):
+    # the options are also applied to the listening socket and to the client socket before it is connected
+    for sock in applied:
+        try:
+            if sock.getpeername() == client_address:
+                return sock
+        except OSError:
+            pass
+    raise AssertionError("the options were not applied to the accepted connection")
+
+
+@pytest.mark.timeout(5)
+@pytest.mark.parametrize("mode", ["threaded", "selector"])
+def test_server_and_client(mode):
+    options = SocketOptions(nodelay=True, keepalive=True, backlog=16)
+    applied = _record_applied(options)
+    echo_server = EchoServer("127.0.0.1", 12345, mode=mode, socket_options=options)
+    echo_server.start_server()
+    client = TcpClient("127.0.0.1", port=12345, socket_options=options)
+    try:
+        client.connect()
+        assert _get(client.sock, socket.IPPROTO_TCP, socket.TCP_NODELAY)
+        assert _get(client.sock, socket.SOL_SOCKET, socket.SO_KEEPALIVE)
+        client.send(b"Test message")
+        assert b"Test message" == client.receive()
+        accepted = _accepted(applied, client.sock.getsockname())
+        assert _get(accepted, socket.IPPROTO_TCP, socket.TCP_NODELAY)
+        assert _get(accepted, socket.SOL_SOCKET, socket.SO_KEEPALIVE)
+    finally:
+        client.close()
+        echo_server.stop_server()
+
+
+@pytest.mark.timeout(5)
+class TestAsyncSocketOptions:
+
+    @pytest.yield_fixture
+    def event_loop(self):
+        loop = asyncio.get_event_loop()
+        loop._close = loop.close
+        loop.close = lambda: None
+        yield loop
+        loop.close = loop._close
+
+    @pytest.fixture
+    def echo_server(self):
+        echo_server = EchoServer("127.0.0.1", 12345)
+        echo_server.start_server()
+        yield echo_server
+        echo_server.stop_server()
+
+    @pytest.mark.asyncio
+    async def test_client(self, echo_server):
+        client = AsyncTcpClient("127.0.0.1", port=12345, socket_options=SocketOptions(keepalive=True))
+        await client.connect()
+        try:
+            assert _get(client.writer.get_extra_info('socket'), socket.SOL_SOCKET, socket.SO_KEEPALIVE)
+        finally:
+            client.close()
+
+    @pytest.mark.asyncio
+    async def test_async_server(self):
+        options = SocketOptions(nodelay=True, keepalive=True)
+        applied = _record_applied(options)
+        echo_server = AsyncEchoServer("127.0.0.1", 12345, socket_options=options)
+        await echo_server.start()
+        client = AsyncTcpClient("127.0.0.1", port=12345)
+        try:
+            await client.connect()
+            await client.send(b"Test message\n")
+            assert await client.receive_until(delimiter=b'\n') == b"Test message"
+            accepted = _accepted(applied, client.writer.get_extra_info('sockname'))
+            assert _get(accepted, socket.IPPROTO_TCP, socket.TCP_NODELAY)
+            assert _get(accepted, socket.SOL_SOCKET, socket.SO_KEEPALIVE)
+        finally:
+            client.close()
+            await echo_server.stop()
@@ -0,0 +1,114 @@
+import asyncio
+import os
+import socket
+import ssl
+
+import pytest
+from pyTCP.async_client import AsyncTcpClient
+from pyTCP.async_server import AsyncEchoServer
+from pyTCP.client import TcpClient
+from pyTCP.client_errors import ClientSocketError
+from pyTCP.pool import TcpClientPool
+from pyTCP.server import EchoServer
+
+TLS_DIR = os.path.join(os.path.dirname(__file__), "tls")
+CERT = os.path.join(TLS_DIR, "cert.pem")
+KEY = os.path.join(TLS_DIR, "key.pem")
+
+
+def server_context():
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    context.load_cert_chain(CERT, KEY)
+    return context
+
+
+def client_context():
+    return ssl.create_default_context(cafile=CERT)
+
+
+@pytest.mark.timeout(10)
+class TestTls:
+
+    @pytest.fixture
+    def echo_server(self):
+        echo_server = EchoServer("127.0.0.1", 12345, ssl_context=server_context())
+        echo_server.start_server()
+        yield echo_server
+        echo_server.stop_server()
+
+    def test_echo(self, echo_server):
+        client = TcpClient("127.0.0.1", port=12345, ssl_context=client_context())
+        client.connect()
+        client.send(b"Test\n")
+        assert b"Test" == client.receive_until(delimiter=b'\n')
+        client.send_many((b"a", b"b\n"))
+        assert b"ab" == client.receive_until(delimiter=b'\n')
+        assert not client.session_reused
+        client.close()
+
+    def test_session_resumed_on_reconnect(self, echo_server):
+        reconnects = []
+        client = TcpClient("127.0.0.1", port=12345, ssl_context=client_context())
+        client.on_reconnect = reconnects.append
+        client.connect()
+        client.send(b"Test\n")
+        assert b"Test" == client.receive_until(delimiter=b'\n')
+        # break the connection below the TLS layer, SSLSocket.shutdown would drop the session
+        socket.socket.shutdown(client.sock, socket.SHUT_RDWR)
+        client.send(b"lost\n")
+        assert 1 == len(reconnects)
+        assert client.session_reused
+        client.send(b"again\n")
+        assert b"again" == client.receive_until(delimiter=b'\n')
+        client.close()
+
+    def test_untrusted_certificate(self, echo_server):
+        client = TcpClient("127.0.0.1", port=12345, ssl_context=ssl.create_default_context())
+        with pytest.raises(ClientSocketError):
+            client.connect(timeout=1)
+
+    def test_pool(self, echo_server):
+        pool = TcpClientPool("127.0.0.1", 12345, ssl_context=client_context())
+        with pool.connection() as client:
+            client.send(b"Test\n")
+            assert b"Test" == client.receive_until(delimiter=b'\n')
+        # session tickets which arrived after the handshake do not make the connection unhealthy
+        with pool.connection() as second:
+            assert second is client
+        pool.close()
+
+    def test_async(self):
+        async def run():
+            server = AsyncEchoServer("127.0.0.1", 12345, ssl_context=server_context())
+            await server.start()
+            client = AsyncTcpClient("127.0.0.1", port=12345, ssl_context=client_context())
+            try:
+                await client.connect()
+                await client.send_frame(b"frame")
+                return await client.receive_frame()
+            finally:
+                client.close()
+                await server.stop()
+
+        loop = asyncio.new_event_loop()
+        try:
+            assert b"frame" == loop.run_until_complete(run())
+        finally:
+            loop.close()
+
+    def test_async_untrusted_certificate(self, echo_server):
+        async def run():
+            client = AsyncTcpClient("127.0.0.1", port=12345, ssl_context=ssl.create_default_context())
+            await client.connect(timeout=1)
+
+        loop = asyncio.new_event_loop()
+        try:
+            with pytest.raises(ClientSocketError):
+                loop.run_until_complete(run())
+        finally:
+            loop.close()
+
+
+def test_selector_mode_not_supported():
+    with pytest.raises(ValueError):
+        EchoServer("127.0.0.1", 12345, mode="selector", ssl_context=server_context())